@@ -1,98 +1,147 @@
 import os
 import zipfile
-import shutil 
-#import csv
+import shutil
+import argparse
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 '''
-Note : pour décommenter des blocs de code sur VSCode : CTRL+K puis CTRL+U, pour commenter des blocs de code : CTRL+K puis CTRL+C. 
-
 Script pour transformer les répertoires zippés retournés par le script 'extract_align_pepper_carrot.py' et classés par épisodes, en deux répertoires bilingues (un rép. languedocien + un rép. gascon) comprenant eux-mêmes chacun un répertoire pour chaque langue faisant l'objet d'un alignement avec le languedocien ou le gascon.
 
-Deux approches possibles : 
-    1) soit le programme prend en entrée directement les répertoires zippés retournés par le script d'extraction/alignement.
-    Choisir dans ce cas la fonction extraire_fichiers_csv() prenant en paramètre un "dossier_zip"
-    Et décommenter les lignes de code correspondantes dans la fonction main()
+Le programme prend en entrée un ou plusieurs répertoires non zippés contenant les répertoires zippés (par défaut : 'corpus_corpus'), et/ou directement des répertoires zippés :
+    python3 classify_languages.py
+    python3 classify_languages.py corpus_corpus E05_oc-lengadoc-grclass_alignements.zip
 
-    2) soit le programme prend en entrée un répertoire non zippé contenant lui-même les répertoires zippés (un choix plus intéressant dans le cas d'une grande volumétrie de répertoires zippés).
-    Choisir dans ce cas la fonction extraire_fichiers_csv() prenant en paramètre un "repertoire_zip"
-    Et commenter/décommenter les lignes de code correspondantes dans la fonction main()
+Les fichiers CSV sont copiés directement depuis les répertoires zippés vers leur emplacement final '<langue1>_bilingue/<langue2>/', sans extraction intermédiaire dans le répertoire courant.
+Les répertoires zippés sont traités en parallèle (option --taches).
+Avec l'option --zip, chaque répertoire bilingue est écrit sous la forme d'un répertoire zippé '<langue1>_bilingue.zip' contenant les répertoires '<langue2>/'.
 
 '''
-### FONCTION POUR EXTRAIRE LES CSV A PARTIR D'UN RÉPERTOIRE NON ZIPPÉ, CONTENANT LES RÉPERTOIRES ZIPPÉS
-### Approche 2
-def extraire_fichiers_csv(repertoire_zip):
+
+NB_TACHES = 4  # répertoires zippés traités simultanément
+TAILLE_BLOC = 64 * 1024  # taille des blocs copiés d'un répertoire zippé à l'autre
+
+
+### FONCTION POUR LISTER LES CSV DES RÉPERTOIRES ZIPPÉS
+def lister_fichiers_csv(entrees):
+    # Lecture du seul répertoire central de chaque zip, sans rien extraire :
+    # {langue1: [(langue2, chemin du zip, fichier csv), ...]}
     fichiers_csv = defaultdict(list)
 
-    for nom_fichier in os.listdir(repertoire_zip):
-        if nom_fichier.endswith('.zip'):
-            chemin_zip = os.path.join(repertoire_zip, nom_fichier)
-            with zipfile.ZipFile(chemin_zip, 'r') as zipf:
-                for fichier in zipf.namelist():
-                    if fichier.endswith('.csv'):
-                        zipf.extract(fichier)
-                        try:
-                            langue1, langue2, numero_episode = fichier.split('_')
-                            fichiers_csv[langue1].append((langue2, fichier))
-                        except ValueError:
-                            print(f"Nom de fichier invalide : {fichier}")
+    chemins_zip = []
+    for entree in entrees:
+        if os.path.isdir(entree):
+            chemins_zip.extend(
+                os.path.join(entree, nom_fichier)
+                for nom_fichier in sorted(os.listdir(entree))
+                if nom_fichier.endswith('.zip')
+            )
+        else:
+            chemins_zip.append(entree)
+
+    for chemin_zip in chemins_zip:
+        with zipfile.ZipFile(chemin_zip, 'r') as zipf:
+            for fichier in zipf.namelist():
+                if fichier.endswith('.csv'):
+                    try:
+                        langue1, langue2, numero_episode = fichier.split('_')
+                        fichiers_csv[langue1].append((langue2, chemin_zip, fichier))
+                    except ValueError:
+                        print(f"Nom de fichier invalide : {fichier}")
     return fichiers_csv
 
-### FONCTION POUR EXTRAIRE LES CSV DE RÉPERTOIRES ZIPPÉS
-### Approche 1 : 
-# def extraire_fichiers_csv(dossiers_zip):
-#     fichiers_csv = defaultdict(list)
-
-#     # Parcourir chaque dossier ZIP
-#     for dossier_zip in dossiers_zip:
-#         with zipfile.ZipFile(dossier_zip, 'r') as zipf:
-#             # Extraire tous les fichiers du ZIP
-#             for fichier in zipf.namelist():
-#                 if fichier.endswith('.csv'):
-#                     # Extraire le fichier CSV
-#                     zipf.extract(fichier)
-#                     # Récupérer la langue2 à partir du nom du fichier
-#                     try:
-#                         langue1, langue2, numero_episode = fichier.split('_')
-#                         fichiers_csv[langue1].append((langue2, fichier))
-#                     except ValueError:
-#                         print(f"Nom de fichier non valide : {fichier}")
-
-#     return fichiers_csv
-
-### FONCTION POUR CLASSER LES CSV PAR LANGUE 2 
-### Approches 1 et 2
-def creer_repertoires_bilingues(fichiers_csv):
-    for langue1, fichiers in fichiers_csv.items():
-        # créer un dossier pour la langue 1 (soit gascon soit languedocien)
-        dossier_bilingue = f"{langue1}_bilingue"
-        os.makedirs(dossier_bilingue, exist_ok=True)
-
-        # créer un dictionnaire pour les langues2 (langues autres que l'occitan, sauf pour le corpus bivar)
-        fichiers_par_langue2 = defaultdict(list)
-        for langue2, fichier in fichiers:
-            fichiers_par_langue2[langue2].append(fichier)
-        
-        # créer les répertoires pour chaque langue2 et y déplacer les fichiers
-        for langue2, fichiers_langue2 in fichiers_par_langue2.items():
-            dossier_langue2 = os.path.join(dossier_bilingue, langue2)
+
+### FONCTIONS POUR CLASSER LES CSV PAR LANGUE 2
+def copier_vers_repertoires(chemin_zip, fichiers, repertoire_sortie):
+    # Copie des fichiers d'un répertoire zippé [(langue1, langue2, fichier), ...] vers '<langue1>_bilingue/<langue2>/'
+    with zipfile.ZipFile(chemin_zip, 'r') as zipf:
+        for langue1, langue2, fichier in fichiers:
+            dossier_langue2 = os.path.join(repertoire_sortie, f"{langue1}_bilingue", langue2)
             os.makedirs(dossier_langue2, exist_ok=True)
+            with zipf.open(fichier) as source, open(os.path.join(dossier_langue2, fichier), 'wb') as destination:
+                shutil.copyfileobj(source, destination, TAILLE_BLOC)
 
-            for fichier in fichiers_langue2:
-                os.rename(fichier, os.path.join(dossier_langue2, fichier))
 
+def copier_vers_zip(zip_bilingue, verrou, chemin_zip, fichiers):
+    # Copie des fichiers d'un répertoire zippé vers le répertoire bilingue zippé, membre par membre et par blocs,
+    # sans charger un fichier entier en mémoire (un seul fil écrit à la fois dans une même archive)
+    with zipfile.ZipFile(chemin_zip, 'r') as zipf:
+        for langue1, langue2, fichier in fichiers:
+            with zipf.open(fichier) as source, verrou, zip_bilingue.open(f"{langue2}/{fichier}", 'w') as destination:
+                shutil.copyfileobj(source, destination, TAILLE_BLOC)
 
-def main():
-    ## Approche 1 : Liste de dossiers ZIP (à compléter ou à commenter manuellement)
-    # dossiers_zip = []
-    # fichiers_csv = extraire_fichiers_csv(dossiers_zip)
 
-    ## Approche 2 : Chemin vers le répertoire contenant les fichiers zip
-    repertoire_zip = "corpus_corpus"   
-    fichiers_csv = extraire_fichiers_csv(repertoire_zip)
+def creer_repertoires_bilingues(fichiers_csv, repertoire_sortie=".", en_zip=False, nb_taches=NB_TACHES):
+    # Regrouper les copies par répertoire zippé d'origine : chaque archive n'est ouverte qu'une fois
+    fichiers_par_zip = defaultdict(list)
+    for langue1, fichiers in fichiers_csv.items():
+        for langue2, chemin_zip, fichier in fichiers:
+            fichiers_par_zip[chemin_zip].append((langue1, langue2, fichier))
+
+    if not en_zip:
+        with ThreadPoolExecutor(max_workers=nb_taches) as executeur:
+            taches = [
+                executeur.submit(copier_vers_repertoires, chemin_zip, fichiers, repertoire_sortie)
+                for chemin_zip, fichiers in fichiers_par_zip.items()
+            ]
+            for tache in taches:
+                tache.result()  # remonter les erreurs éventuelles
+        return
+
+    # créer un répertoire zippé pour chaque langue 1 (soit gascon soit languedocien)
+    os.makedirs(repertoire_sortie, exist_ok=True)
+    zips_bilingues = {
+        langue1: zipfile.ZipFile(os.path.join(repertoire_sortie, f"{langue1}_bilingue.zip"), 'w', compression=zipfile.ZIP_DEFLATED)
+        for langue1 in fichiers_csv
+    }
+    verrous = {langue1: threading.Lock() for langue1 in fichiers_csv}
+    try:
+        with ThreadPoolExecutor(max_workers=nb_taches) as executeur:
+            taches = []
+            for chemin_zip, fichiers in fichiers_par_zip.items():
+                fichiers_par_langue1 = defaultdict(list)
+                for langue1, langue2, fichier in fichiers:
+                    fichiers_par_langue1[langue1].append((langue1, langue2, fichier))
+                for langue1, fichiers_langue1 in fichiers_par_langue1.items():
+                    taches.append(
+                        executeur.submit(copier_vers_zip, zips_bilingues[langue1], verrous[langue1], chemin_zip, fichiers_langue1)
+                    )
+            for tache in taches:
+                tache.result()  # remonter les erreurs éventuelles
+    finally:
+        for zip_bilingue in zips_bilingues.values():
+            zip_bilingue.close()
 
-    #creer_zips_par_langue(fichiers_csv)
-    creer_repertoires_bilingues(fichiers_csv)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Classement par langue des corpus alignés produits par extract_align_pepper_carrot.py (classés par épisode)."
+    )
+    parser.add_argument(
+        "entrees",
+        nargs="*",
+        default=["corpus_corpus"],
+        help="répertoires contenant les répertoires zippés, ou répertoires zippés (défaut : corpus_corpus)",
+    )
+    parser.add_argument(
+        "--sortie", default=".", help="répertoire où créer les répertoires bilingues (défaut : répertoire courant)"
+    )
+    parser.add_argument(
+        "--zip",
+        action="store_true",
+        help="écrire chaque répertoire bilingue sous la forme d'un répertoire zippé '<langue1>_bilingue.zip'",
+    )
+    parser.add_argument(
+        "--taches",
+        type=int,
+        default=NB_TACHES,
+        help=f"nombre de répertoires zippés traités simultanément (défaut : {NB_TACHES})",
+    )
+    arguments = parser.parse_args()
+
+    fichiers_csv = lister_fichiers_csv(arguments.entrees)
+    creer_repertoires_bilingues(fichiers_csv, arguments.sortie, arguments.zip, arguments.taches)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import io
+import os
+import re
+import sys
+import time
+import tracemalloc
+import zipfile
+
+from extract_align_pepper_carrot import (
+    METHODES_ALIGNEMENT,
+    PIVOTS,
+    aligner_sur_pivots,
+    correspondances,
+    extraire_texte_du_svg,
+    extraire_texte_du_svg_arbre,
+    fusionner_segments_par_langue,
+    lister_svg_par_langue,
+    resoudre_codes_langue,
+)
+
+"""
+Banc d'essai comparant les deux méthodes d'extraction du texte des pages SVG :
+    - extraire_texte_du_svg_arbre() : construction de l'arbre XML complet de chaque page (version d'origine)
+    - extraire_texte_du_svg() : lecture par évènements (expat), seuls les blocs de texte sont conservés
+puis les deux méthodes d'alignement de toutes les langues de l'épisode avec les langues pivots :
+    - "position" : alignement ligne à ligne d'origine
+    - "structure" : alignement par page, ancré sur les identifiants des blocs SVG puis d'après leur longueur
+
+Le banc d'essai prend en entrée un lang-pack téléchargé depuis Pepper&Carrot (par ex. une archive du cache) :
+    python3 benchmark_extract_align.py ep05_Preparations_lang-pack.zip
+    python3 benchmark_extract_align.py cache/objets/<empreinte>.zip --episode 5
+
+Les pages sont d'abord chargées en mémoire pour ne mesurer que l'extraction.
+Le script vérifie aussi que les deux méthodes d'extraction produisent exactement le même résultat,
+et que l'alignement structurel de tout l'épisode reste sous le seuil fixé par --seuil-alignement.
+"""
+
+
+def charger_pages(fichier_zip):
+    # Contenu de toutes les pages SVG du lang-pack : [(code_langue, nom_membre, octets), ...]
+    pages = []
+    with zipfile.ZipFile(fichier_zip, "r") as zip_ref:
+        for code_langue, membres in sorted(lister_svg_par_langue(zip_ref).items()):
+            for membre in sorted(membres):
+                pages.append((code_langue, membre, zip_ref.read(membre)))
+    return pages
+
+
+def extraire_pages(fonction, pages, numero_episode):
+    resultats = []
+    for code_langue, membre, contenu in pages:
+        fichier_svg = io.BytesIO(contenu)
+        fichier_svg.name = membre
+        resultats.append(fonction(fichier_svg, numero_episode, code_langue))
+    return resultats
+
+
+def mesurer(fonction, pages, numero_episode, repetitions):
+    # Meilleur temps sur plusieurs passages, puis pic mémoire mesuré sur un passage supplémentaire
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultats = extraire_pages(fonction, pages, numero_episode)
+        temps.append(time.perf_counter() - debut)
+
+    tracemalloc.start()
+    extraire_pages(fonction, pages, numero_episode)
+    _, pic_memoire = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(temps), pic_memoire, resultats
+
+
+def mesurer_alignement(segments_par_langue, numero_episode, methode, repetitions):
+    # Meilleur temps d'alignement de toutes les langues avec les langues pivots
+    codes_congres = resoudre_codes_langue(segments_par_langue, correspondances)
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fichiers_par_pivot, fichiers_bivariete = aligner_sur_pivots(
+            segments_par_langue, PIVOTS, codes_congres, numero_episode, methode
+        )
+        temps.append(time.perf_counter() - debut)
+    nb_fichiers = len(fichiers_bivariete) + sum(
+        len(fichiers) for fichiers in fichiers_par_pivot.values()
+    )
+    return min(temps), nb_fichiers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Comparaison des méthodes d'extraction du texte des SVG sur un lang-pack réel."
+    )
+    parser.add_argument("lang_pack", help="archive ZIP du lang-pack d'un épisode")
+    parser.add_argument(
+        "--episode",
+        help="numéro de l'épisode (déduit du nom de l'archive 'epNN_...' s'il n'est pas indiqué)",
+    )
+    parser.add_argument(
+        "--repetitions", type=int, default=5, help="nombre de passages chronométrés (défaut : 5)"
+    )
+    parser.add_argument(
+        "--seuil-alignement",
+        type=float,
+        default=1.0,
+        help="durée maximale en secondes de l'alignement structurel de tout l'épisode (défaut : 1)",
+    )
+    arguments = parser.parse_args()
+
+    numero_episode = arguments.episode
+    if not numero_episode:
+        correspondance = re.match(r"ep(\d+)_", os.path.basename(arguments.lang_pack))
+        if not correspondance:
+            parser.error("impossible de déduire le numéro de l'épisode, utilisez --episode")
+        numero_episode = correspondance.group(1)
+
+    pages = charger_pages(arguments.lang_pack)
+    taille_totale = sum(len(contenu) for _, _, contenu in pages)
+    print(
+        f"{len(pages)} pages SVG ({taille_totale / 1024 / 1024:.1f} Mo), épisode {numero_episode}, {arguments.repetitions} passages\n"
+    )
+
+    mesures = {}
+    for nom, fonction in (
+        ("arbre complet (ET.parse)", extraire_texte_du_svg_arbre),
+        ("par évènements (expat)", extraire_texte_du_svg),
+    ):
+        duree, pic_memoire, resultats = mesurer(
+            fonction, pages, numero_episode, arguments.repetitions
+        )
+        mesures[nom] = resultats
+        print(
+            f"{nom:<26} {duree:8.3f} s   {len(pages) / duree:8.1f} pages/s   pic mémoire {pic_memoire / 1024 / 1024:7.2f} Mo"
+        )
+
+    references, resultats = mesures.values()
+    if references != resultats:
+        print("\nErreur : les deux méthodes ne produisent pas le même texte.")
+        sys.exit(1)
+    print(
+        f"\nRésultats identiques ({sum(len(segments) for segments in resultats)} segments extraits)."
+    )
+
+    # Alignement : segments de chaque langue avec les repères de page et de bloc SVG
+    textes_svg = extraire_pages(
+        lambda fichier_svg, numero, code: extraire_texte_du_svg(
+            fichier_svg, numero, code, avec_identifiants=True
+        ),
+        pages,
+        numero_episode,
+    )
+    segments_par_langue = fusionner_segments_par_langue(
+        [(code_langue, membre) for code_langue, membre, _ in pages], textes_svg
+    )
+    if "oc" not in segments_par_langue:
+        print("\nPas de texte en occitan dans ce lang-pack : alignement non mesuré.")
+        return
+
+    print(f"\nAlignement de {len(segments_par_langue)} langues avec les pivots {', '.join(PIVOTS)}\n")
+    for methode in METHODES_ALIGNEMENT:
+        duree, nb_fichiers = mesurer_alignement(
+            segments_par_langue, numero_episode, methode, arguments.repetitions
+        )
+        print(f"{methode:<26} {duree:8.3f} s   {nb_fichiers} fichiers alignés")
+        if methode == "structure" and duree > arguments.seuil_alignement:
+            print(
+                f"\nErreur : l'alignement structurel dépasse le seuil de {arguments.seuil_alignement} s."
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
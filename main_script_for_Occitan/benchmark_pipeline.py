@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from extract_align_pepper_carrot import (
+    PIVOTS,
+    aligner_sur_pivots,
+    correspondances,
+    creer_zip_fichiers_alignes,
+    extraire_pages,
+    fusionner_segments_par_langue,
+    lister_svg_par_langue,
+    resoudre_codes_langue,
+)
+
+# classify_languages.py se trouve dans le répertoire des scripts additionnels
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "additional_scripts")
+)
+from classify_languages import creer_repertoires_bilingues, lister_fichiers_csv
+
+"""
+Banc d'essai de toute la chaîne de traitement sur des lang-packs synthétiques, générés hors ligne :
+N langues x P pages, pour les deux variantes des SVG de Pepper&Carrot (blocs <flowRoot> des épisodes 1 à 12,
+blocs <text> des épisodes 13 et plus) :
+    python3 benchmark_pipeline.py
+    python3 benchmark_pipeline.py --langues 70 --pages 10 --json resultats.json
+
+Chaque étape est chronométrée séparément (meilleur temps sur plusieurs passages), avec son débit
+et son pic mémoire (mesuré sur un passage supplémentaire) :
+    - extraction : extraire_texte_du_svg() sur toutes les pages du lang-pack
+    - regroupement : fusionner_segments_par_langue()
+    - codes : resoudre_codes_langue()
+    - alignement : aligner_sur_pivots()
+    - zips : creer_zip_fichiers_alignes() pour chaque langue pivot et pour le corpus bivariété
+    - classement : classify_languages.py, des zips par épisode vers les répertoires bilingues
+L'option --json écrit les résultats dans un fichier JSON, pour suivre leur évolution d'une version à l'autre.
+"""
+
+# Épisodes synthétiques : un pour chaque variante des SVG
+EPISODES_SYNTHETIQUES = {"flowRoot": "5", "text": "20"}
+SYLLABES = ("la", "pe", "ca", "rot", "mi", "nor", "a", "sor", "ci", "e", "ra", "tu", "ben", "ò", "ga")
+
+
+def langues_synthetiques(nb_langues):
+    # Les deux langues pivots, puis les autres langues de la table de concordance, puis des codes fictifs
+    codes = list(PIVOTS) + [code for code in correspondances if code not in PIVOTS]
+    codes += [f"x{rang:02d}" for rang in range(max(0, nb_langues - len(codes)))]
+    return codes[:nb_langues]
+
+
+def phrase(generateur, nb_mots):
+    return " ".join(
+        "".join(generateur.choices(SYLLABES, k=generateur.randint(1, 4)))
+        for _ in range(nb_mots)
+    )
+
+
+def svg_synthetique(variante, blocs):
+    # Page SVG avec du contenu graphique et un bloc de texte par bulle [(id, texte), ...]
+    parties = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="2481" height="3503">',
+        '<g id="layer1">',
+        '<path id="trait" d="' + "M 0 0 C 10 10 20 20 30 30 " * 40 + '"/>',
+        '<image id="dessin" xlink:href="data:image/png;base64,' + "A" * 2000 + '"/>',
+    ]
+    for identifiant, texte in blocs:
+        moitie = len(texte) // 2
+        if variante == "flowRoot":
+            parties.append(
+                f'<flowRoot id="{identifiant}"><flowRegion><rect width="300" height="200"/></flowRegion>'
+                f"<flowPara>{texte[:moitie]}</flowPara><flowPara>{texte[moitie:]}</flowPara></flowRoot>"
+            )
+        else:
+            parties.append(
+                f'<text id="{identifiant}" x="10" y="20"><tspan x="10" y="20">{texte[:moitie]}</tspan>'
+                f'<tspan x="10" y="40">{texte[moitie:]}</tspan></text>'
+            )
+    parties.append("</g></svg>")
+    return "\n".join(parties)
+
+
+def generer_lang_pack(fichier_zip, numero_episode, nb_langues, nb_pages, nb_bulles, graine=0):
+    # Lang-pack synthétique 'lang/<code>/E<NN>P<page>.svg' : les traductions partagent les ids des bulles
+    # de la page d'origine, mais certaines coupent une bulle en deux ou en omettent une, et la longueur
+    # des textes varie d'une langue à l'autre (les deux chemins de l'alignement structurel sont mesurés)
+    variante = "flowRoot" if int(numero_episode) <= 12 else "text"
+    generateur = random.Random(graine)
+    with zipfile.ZipFile(fichier_zip, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        for code_langue in langues_synthetiques(nb_langues):
+            facteur = generateur.uniform(0.7, 1.4)
+            for page in range(nb_pages):
+                blocs = []
+                for bulle in range(nb_bulles):
+                    texte = phrase(generateur, max(1, int(generateur.randint(3, 15) * facteur)))
+                    tirage = generateur.random()
+                    if tirage < 0.05:
+                        continue
+                    if tirage < 0.15:
+                        moitie = len(texte) // 2
+                        blocs.append((f"bulle{bulle}", texte[:moitie]))
+                        blocs.append((f"bulle{bulle}-suite", texte[moitie:]))
+                    else:
+                        blocs.append((f"bulle{bulle}", texte))
+                zipf.writestr(
+                    f"lang/{code_langue}/E{numero_episode.zfill(2)}P{page:02d}.svg",
+                    svg_synthetique(variante, blocs),
+                )
+    return fichier_zip
+
+
+def mesurer(fonction, repetitions):
+    # Meilleur temps sur plusieurs passages, puis pic mémoire mesuré sur un passage supplémentaire
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        temps.append(time.perf_counter() - debut)
+
+    tracemalloc.start()
+    fonction()
+    _, pic_memoire = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(temps), pic_memoire, resultat
+
+
+def mesurer_chaine(fichier_zip, numero_episode, repertoire, repetitions):
+    # Durée, débit et pic mémoire de chaque étape : {étape: {...}}
+    with zipfile.ZipFile(fichier_zip, "r") as zip_ref:
+        pages = [
+            (code_langue, membre)
+            for code_langue, membres in sorted(lister_svg_par_langue(zip_ref).items())
+            for membre in sorted(membres)
+        ]
+    repertoire_zips = os.path.join(repertoire, "corpus")
+    repertoire_classement = os.path.join(repertoire, "classement")
+    os.makedirs(repertoire_zips, exist_ok=True)
+    etapes = {}
+
+    def noter(etape, mesure, quantite, unite):
+        duree, pic_memoire, resultat = mesure
+        etapes[etape] = {
+            "duree_s": round(duree, 6),
+            "quantite": quantite,
+            "unite": unite,
+            "debit_par_s": round(quantite / duree, 1) if duree else None,
+            "pic_memoire_octets": pic_memoire,
+        }
+        return resultat
+
+    textes_svg = noter(
+        "extraction",
+        mesurer(lambda: extraire_pages(fichier_zip, pages, numero_episode), repetitions),
+        len(pages),
+        "pages",
+    )
+    segments_par_langue = noter(
+        "regroupement",
+        mesurer(lambda: fusionner_segments_par_langue(pages, textes_svg), repetitions),
+        sum(len(texte_svg) for texte_svg in textes_svg),
+        "segments",
+    )
+    codes_congres = noter(
+        "codes",
+        mesurer(
+            lambda: resoudre_codes_langue(segments_par_langue, correspondances), repetitions
+        ),
+        len(segments_par_langue),
+        "langues",
+    )
+    fichiers_par_pivot, fichiers_bivariete = noter(
+        "alignement",
+        mesurer(
+            lambda: aligner_sur_pivots(
+                segments_par_langue, PIVOTS, codes_congres, numero_episode
+            ),
+            repetitions,
+        ),
+        sum(len(segments) for segments in segments_par_langue.values()),
+        "segments",
+    )
+
+    def ecrire_zips():
+        fichiers_zip = [
+            creer_zip_fichiers_alignes(
+                os.path.join(
+                    repertoire_zips,
+                    f"E{numero_episode.zfill(2)}_{codes_congres[pivot]}_alignements.zip",
+                ),
+                fichiers_csv_alignes,
+            )
+            for pivot, fichiers_csv_alignes in fichiers_par_pivot.items()
+        ]
+        if fichiers_bivariete:
+            fichiers_zip.append(
+                creer_zip_fichiers_alignes(
+                    os.path.join(repertoire_zips, f"E{numero_episode.zfill(2)}_bivarietat_lg_ga.zip"),
+                    fichiers_bivariete,
+                )
+            )
+        return fichiers_zip
+
+    fichiers_zip = noter(
+        "zips",
+        mesurer(ecrire_zips, repetitions),
+        len(fichiers_bivariete) + sum(len(fichiers) for fichiers in fichiers_par_pivot.values()),
+        "fichiers alignés",
+    )
+    taille_csv = 0
+    for fichier_zip_final in fichiers_zip:
+        with zipfile.ZipFile(fichier_zip_final, "r") as zip_ref:
+            taille_csv += sum(info.file_size for info in zip_ref.infolist())
+    etapes["zips"]["octets_csv"] = taille_csv
+
+    noter(
+        "classement",
+        mesurer(
+            lambda: creer_repertoires_bilingues(
+                lister_fichiers_csv([repertoire_zips]), repertoire_classement
+            ),
+            repetitions,
+        ),
+        etapes["zips"]["quantite"],
+        "fichiers CSV",
+    )
+    return etapes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Banc d'essai de toute la chaîne de traitement sur des lang-packs synthétiques générés hors ligne."
+    )
+    parser.add_argument("--langues", type=int, default=20, help="nombre de langues (défaut : 20)")
+    parser.add_argument("--pages", type=int, default=8, help="nombre de pages par langue (défaut : 8)")
+    parser.add_argument("--bulles", type=int, default=6, help="nombre de bulles par page (défaut : 6)")
+    parser.add_argument(
+        "--variantes",
+        type=lambda valeur: [variante.strip() for variante in valeur.split(",") if variante.strip()],
+        default=list(EPISODES_SYNTHETIQUES),
+        help=f"variantes des SVG à mesurer, séparées par des virgules (défaut : {','.join(EPISODES_SYNTHETIQUES)})",
+    )
+    parser.add_argument(
+        "--repetitions", type=int, default=3, help="nombre de passages chronométrés (défaut : 3)"
+    )
+    parser.add_argument("--graine", type=int, default=0, help="graine du générateur des textes (défaut : 0)")
+    parser.add_argument("--json", help="fichier où écrire les résultats au format JSON ('-' : sortie standard)")
+    arguments = parser.parse_args()
+    if arguments.langues < 2:
+        parser.error("l'option --langues doit valoir au moins 2 (les deux langues pivots)")
+    for variante in arguments.variantes:
+        if variante not in EPISODES_SYNTHETIQUES:
+            parser.error(f"variante inconnue : {variante} (choix : {', '.join(EPISODES_SYNTHETIQUES)})")
+
+    resultats = {
+        "parametres": {
+            "langues": arguments.langues,
+            "pages": arguments.pages,
+            "bulles": arguments.bulles,
+            "repetitions": arguments.repetitions,
+            "graine": arguments.graine,
+        },
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "variantes": {},
+    }
+    # les résultats lisibles passent sur la sortie d'erreur si le JSON est écrit sur la sortie standard
+    sortie = sys.stderr if arguments.json == "-" else sys.stdout
+    for variante in arguments.variantes:
+        numero_episode = EPISODES_SYNTHETIQUES[variante]
+        with tempfile.TemporaryDirectory() as repertoire:
+            fichier_zip = generer_lang_pack(
+                os.path.join(repertoire, f"ep{numero_episode.zfill(2)}_synthetique_lang-pack.zip"),
+                numero_episode,
+                arguments.langues,
+                arguments.pages,
+                arguments.bulles,
+                arguments.graine,
+            )
+            print(
+                f"\nVariante <{variante}> (épisode {numero_episode}) : {arguments.langues} langues x {arguments.pages} pages, "
+                f"lang-pack de {os.path.getsize(fichier_zip) / 1024 / 1024:.1f} Mo, {arguments.repetitions} passages",
+                file=sortie,
+            )
+            etapes = mesurer_chaine(fichier_zip, numero_episode, repertoire, arguments.repetitions)
+        resultats["variantes"][variante] = {"episode": int(numero_episode), "etapes": etapes}
+        for etape, mesure in etapes.items():
+            print(
+                f"{etape:<14} {mesure['duree_s']:8.3f} s   {mesure['debit_par_s'] or 0:10.1f} {mesure['unite']}/s   "
+                f"pic mémoire {mesure['pic_memoire_octets'] / 1024 / 1024:7.2f} Mo",
+                file=sortie,
+            )
+
+    if arguments.json == "-":
+        json.dump(resultats, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif arguments.json:
+        with open(arguments.json, "w", encoding="utf-8") as fichier:
+            json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from contextlib import closing, contextmanager
+
+from extract_align_pepper_carrot import (
+    COMPRESSIONS,
+    DELAI_EXPIRATION,
+    DELAI_VERROU_INDEX,
+    FORMATS_EXPORT,
+    METHODES_ALIGNEMENT,
+    NB_TENTATIVES,
+    PIVOTS,
+    TAILLE_MAX_CACHE,
+    TAILLE_MAX_CACHE_EXTRACTION,
+    URL_BASE,
+    chercher_episode,
+    construire_selection_langues,
+    creer_groupe_processus,
+    creer_session,
+    espace_telechargement,
+    filtrer_plage,
+    lire_manifeste,
+    nettoyer_cache,
+    nettoyer_cache_extraction,
+    nettoyer_titre,
+    traiter_episode,
+)
+
+# classify_languages.py se trouve dans le répertoire des scripts additionnels
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "additional_scripts")
+)
+from classify_languages import NB_TACHES, creer_repertoires_bilingues, lister_fichiers_csv
+
+"""
+Reconstruction du corpus répartie entre plusieurs travailleurs (plusieurs processus ou plusieurs machines),
+coordonnés par une file de travaux SQLite :
+    python3 distributed_rebuild.py ajouter travaux.sqlite episodes.txt
+    python3 distributed_rebuild.py travailler travaux.sqlite --sortie corpus_corpus --index corpus_corpus/corpus.sqlite
+    python3 distributed_rebuild.py etat travaux.sqlite
+    python3 distributed_rebuild.py regrouper travaux.sqlite --sortie corpus_corpus --destination corpus_bilingue
+
+Chaque travailleur prend un épisode en attente, le télécharge, l'extrait, l'aligne et écrit ses zips dans le
+répertoire de sortie commun (chaque épisode est écrit dans son propre répertoire de travail puis renommé :
+voir espace_de_travail() dans extract_align_pepper_carrot.py).
+Un épisode pris par un travailleur lui est réservé pour la durée d'un bail, prolongé régulièrement tant que
+le travailleur est actif : si celui-ci s'arrête (panne, interruption), le bail expire et l'épisode est remis
+en attente pour un autre travailleur, dans la limite de --essais tentatives.
+Les travailleurs s'arrêtent lorsqu'il ne reste plus d'épisode en attente ni en cours.
+L'étape finale (regrouper) classe les fichiers alignés de tous les épisodes terminés dans les répertoires
+'<langue1>_bilingue/<langue2>/', comme classify_languages.py.
+
+La file de travaux est un fichier SQLite : les travailleurs doivent pouvoir la verrouiller, ce qui est
+garanti sur un disque local (plusieurs travailleurs sur une même machine) mais pas sur tous les systèmes de
+fichiers réseau.
+"""
+
+BAIL = 300  # en secondes : durée de réservation d'un épisode, prolongée tant que le travailleur est actif
+NB_ESSAIS = 3  # nombre maximal de tentatives pour un même épisode
+ATTENTE = 5  # en secondes : attente d'un travailleur inoccupé avant de consulter à nouveau la file
+
+# etat : 'attente', 'en_cours' (réservé par 'travailleur' jusqu'à 'echeance'), 'termine' ou 'echec'
+SCHEMA_FILE = """
+CREATE TABLE IF NOT EXISTS travaux (
+    numero TEXT PRIMARY KEY,
+    titre TEXT NOT NULL,
+    etat TEXT NOT NULL DEFAULT 'attente',
+    travailleur TEXT,
+    echeance REAL,
+    essais INTEGER NOT NULL DEFAULT 0,
+    fichiers TEXT,
+    erreur TEXT
+);
+"""
+
+
+################# FILE DE TRAVAUX ####################
+
+
+def ouvrir_file(fichier_file):
+    # Transactions explicites (BEGIN IMMEDIATE) : la réservation d'un épisode ne peut être faite que par
+    # un seul travailleur à la fois
+    connexion = sqlite3.connect(fichier_file, timeout=DELAI_VERROU_INDEX, isolation_level=None)
+    connexion.executescript(SCHEMA_FILE)
+    return connexion
+
+
+@contextmanager
+def transaction(connexion):
+    connexion.execute("BEGIN IMMEDIATE")
+    try:
+        yield connexion
+    except BaseException:
+        connexion.execute("ROLLBACK")
+        raise
+    connexion.execute("COMMIT")
+
+
+def ajouter_travaux(fichier_file, episodes, refaire=False):
+    # Ajout des épisodes [(numéro, titre), ...] à la file ; un épisode déjà présent n'est remis en attente
+    # qu'avec refaire=True
+    with closing(ouvrir_file(fichier_file)) as connexion, transaction(connexion):
+        for numero_episode, titre in episodes:
+            connexion.execute(
+                "INSERT OR IGNORE INTO travaux (numero, titre) VALUES (?, ?)",
+                (numero_episode.zfill(2), titre),
+            )
+            if refaire:
+                connexion.execute(
+                    "UPDATE travaux SET titre = ?, etat = 'attente', travailleur = NULL, echeance = NULL,"
+                    " essais = 0, fichiers = NULL, erreur = NULL WHERE numero = ?",
+                    (titre, numero_episode.zfill(2)),
+                )
+
+
+def prendre_travail(connexion, travailleur, bail=BAIL, nb_essais=NB_ESSAIS):
+    # Réservation du prochain épisode en attente : retourne (numéro, titre), ou None si aucun n'est disponible
+    maintenant = time.time()
+    with transaction(connexion):
+        # les épisodes dont le bail a expiré ont été abandonnés par leur travailleur
+        connexion.execute(
+            "UPDATE travaux SET etat = CASE WHEN essais >= ? THEN 'echec' ELSE 'attente' END,"
+            " erreur = 'bail expiré (travailleur ' || travailleur || ')'"
+            " WHERE etat = 'en_cours' AND echeance < ?",
+            (nb_essais, maintenant),
+        )
+        travail = connexion.execute(
+            "SELECT numero, titre FROM travaux WHERE etat = 'attente' ORDER BY numero LIMIT 1"
+        ).fetchone()
+        if travail:
+            connexion.execute(
+                "UPDATE travaux SET etat = 'en_cours', travailleur = ?, echeance = ?, essais = essais + 1"
+                " WHERE numero = ?",
+                (travailleur, maintenant + bail, travail[0]),
+            )
+    return travail
+
+
+def prolonger_bail(connexion, numero_episode, travailleur, bail=BAIL):
+    # Retourne False si l'épisode n'est plus réservé par ce travailleur (bail expiré et repris par un autre)
+    curseur = connexion.execute(
+        "UPDATE travaux SET echeance = ? WHERE numero = ? AND travailleur = ? AND etat = 'en_cours'",
+        (time.time() + bail, numero_episode, travailleur),
+    )
+    return curseur.rowcount > 0
+
+
+@contextmanager
+def bail_entretenu(fichier_file, numero_episode, travailleur, bail=BAIL):
+    # Prolongation du bail dans un fil séparé (avec sa propre connexion) pendant le traitement de l'épisode
+    arret = threading.Event()
+
+    def entretenir():
+        with closing(ouvrir_file(fichier_file)) as connexion:
+            while not arret.wait(bail / 3):
+                if not prolonger_bail(connexion, numero_episode, travailleur, bail):
+                    print(f"Attention : l'épisode {numero_episode} a été repris par un autre travailleur.")
+                    return
+
+    fil = threading.Thread(target=entretenir, daemon=True)
+    fil.start()
+    try:
+        yield
+    finally:
+        arret.set()
+        fil.join()
+
+
+def terminer_travail(connexion, numero_episode, travailleur, fichiers):
+    connexion.execute(
+        "UPDATE travaux SET etat = 'termine', echeance = NULL, fichiers = ?, erreur = NULL"
+        " WHERE numero = ? AND travailleur = ?",
+        (json.dumps(fichiers), numero_episode, travailleur),
+    )
+
+
+def abandonner_travail(
+    connexion, numero_episode, travailleur, erreur, definitif=False, nb_essais=NB_ESSAIS
+):
+    # L'épisode est remis en attente, sauf si l'erreur ne dépend pas de l'essai (pas de traduction en
+    # occitan) ou si toutes les tentatives ont échoué
+    connexion.execute(
+        "UPDATE travaux SET etat = CASE WHEN ? OR essais >= ? THEN 'echec' ELSE 'attente' END,"
+        " echeance = NULL, erreur = ? WHERE numero = ? AND travailleur = ?",
+        (definitif, nb_essais, erreur, numero_episode, travailleur),
+    )
+
+
+def travaux_restants(connexion):
+    return connexion.execute(
+        "SELECT COUNT(*) FROM travaux WHERE etat IN ('attente', 'en_cours')"
+    ).fetchone()[0]
+
+
+################# TRAVAILLEUR ####################
+
+
+def travailler(arguments):
+    # Boucle d'un travailleur : prendre un épisode, le traiter, enregistrer le résultat, jusqu'à épuisement de la file
+    travailleur = arguments.nom or f"{socket.gethostname()}-{os.getpid()}"
+    nb_traites = 0
+    with closing(ouvrir_file(arguments.file)) as connexion, creer_groupe_processus(
+        arguments.processus
+    ) as executeur, creer_session(1, arguments.tentatives) as session, espace_telechargement(
+        arguments.sortie, arguments.cache
+    ) as repertoire_telechargement:
+        while True:
+            travail = prendre_travail(connexion, travailleur, arguments.bail, arguments.essais)
+            if travail is None:
+                # des épisodes en cours chez d'autres travailleurs peuvent encore être remis en attente
+                if not travaux_restants(connexion):
+                    break
+                time.sleep(ATTENTE)
+                continue
+
+            numero_episode, titre = travail
+            print(f"\n=== [{travailleur}] Épisode {numero_episode} : {titre} ===")
+            try:
+                with bail_entretenu(arguments.file, numero_episode, travailleur, arguments.bail):
+                    fichier_zip = chercher_episode(
+                        nettoyer_titre(titre),
+                        numero_episode,
+                        session=session,
+                        delai=arguments.delai,
+                        url_base=arguments.url_base,
+                        reprise=False,
+                        repertoire_cache=arguments.cache,
+                        hors_ligne=arguments.hors_ligne,
+                        repertoire_telechargement=repertoire_telechargement,
+                    )
+                    if not fichier_zip:
+                        abandonner_travail(
+                            connexion,
+                            numero_episode,
+                            travailleur,
+                            "téléchargement impossible",
+                            nb_essais=arguments.essais,
+                        )
+                        continue
+                    try:
+                        resultat = traiter_episode(
+                            fichier_zip,
+                            numero_episode,
+                            avec_mmap=arguments.mmap,
+                            executeur=executeur,
+                            pivots=arguments.pivots,
+                            methode_alignement=arguments.alignement,
+                            repertoire_incremental=arguments.incremental,
+                            compression=COMPRESSIONS[arguments.compression],
+                            niveau_compression=arguments.niveau_compression,
+                            format_export=arguments.export,
+                            fichier_index=arguments.index,
+                            repertoire_sortie=arguments.sortie,
+                            selection_langues=arguments.selection_langues,
+                            fichier_cache_extraction=arguments.cache_extraction,
+                        )
+                    finally:
+                        # les archives en cache sont conservées pour les exécutions suivantes
+                        if not arguments.cache:
+                            os.remove(fichier_zip)
+            except Exception as e:
+                traceback.print_exc()
+                abandonner_travail(
+                    connexion, numero_episode, travailleur, repr(e), nb_essais=arguments.essais
+                )
+                continue
+
+            if resultat is None:
+                abandonner_travail(
+                    connexion,
+                    numero_episode,
+                    travailleur,
+                    "pas de traduction en occitan",
+                    definitif=True,
+                )
+                continue
+            # chemins relatifs au répertoire de sortie, qui peut être monté ailleurs sur chaque machine
+            terminer_travail(
+                connexion,
+                numero_episode,
+                travailleur,
+                [os.path.basename(fichier_zip) for fichier_zip in resultat],
+            )
+            nb_traites += 1
+
+    if arguments.cache:
+        nettoyer_cache(arguments.cache, arguments.cache_max)
+    if arguments.cache_extraction:
+        nettoyer_cache_extraction(arguments.cache_extraction, arguments.cache_extraction_max)
+    print(f"\n[{travailleur}] {nb_traites} épisode(s) traité(s), plus aucun épisode en attente.")
+
+
+################# ÉTAT ET REGROUPEMENT ####################
+
+
+def afficher_etat(arguments):
+    with closing(ouvrir_file(arguments.file)) as connexion:
+        comptes = dict(connexion.execute("SELECT etat, COUNT(*) FROM travaux GROUP BY etat"))
+        print(", ".join(f"{etat} : {comptes.get(etat, 0)}" for etat in ("attente", "en_cours", "termine", "echec")))
+        for numero_episode, titre, etat, travailleur, echeance, essais, erreur in connexion.execute(
+            "SELECT numero, titre, etat, travailleur, echeance, essais, erreur FROM travaux"
+            " WHERE etat IN ('en_cours', 'echec') OR erreur IS NOT NULL ORDER BY numero"
+        ):
+            details = f"E{numero_episode} {titre} : {etat}, {essais} essai(s)"
+            if etat == "en_cours":
+                details += f", {travailleur}, bail expirant dans {echeance - time.time():.0f} s"
+            if erreur:
+                details += f" ({erreur})"
+            print(details)
+
+
+def regrouper(arguments):
+    # Étape finale : classement des fichiers alignés des épisodes terminés dans '<langue1>_bilingue/<langue2>/'
+    with closing(ouvrir_file(arguments.file)) as connexion:
+        if travaux_restants(connexion):
+            print("Erreur : des épisodes sont encore en attente ou en cours de traitement.")
+            sys.exit(1)
+        fichiers_zip = [
+            os.path.join(arguments.sortie, nom_fichier)
+            for (fichiers,) in connexion.execute(
+                "SELECT fichiers FROM travaux WHERE etat = 'termine' ORDER BY numero"
+            )
+            for nom_fichier in json.loads(fichiers)
+        ]
+    fichiers_csv = lister_fichiers_csv(fichiers_zip)
+    creer_repertoires_bilingues(fichiers_csv, arguments.destination, arguments.zip, arguments.taches)
+    print(
+        f"{len(fichiers_zip)} zip(s) regroupé(s) en {len(fichiers_csv)} répertoire(s) bilingue(s) dans {arguments.destination}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconstruction du corpus répartie entre plusieurs travailleurs coordonnés par une file de travaux SQLite."
+    )
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    ajout = commandes.add_parser("ajouter", help="ajouter les épisodes d'un manifeste à la file de travaux")
+    ajout.add_argument("file", help="file de travaux SQLite (créée si besoin)")
+    ajout.add_argument("manifeste", help="fichier listant les épisodes, une ligne 'numéro titre anglais' par épisode")
+    ajout.add_argument("--plage", help="n'ajouter que les épisodes compris dans la plage 'début-fin' (ex. : 20-30)")
+    ajout.add_argument(
+        "--refaire",
+        action="store_true",
+        help="remettre en attente les épisodes déjà présents dans la file, même terminés",
+    )
+
+    travail = commandes.add_parser("travailler", help="traiter les épisodes de la file jusqu'à son épuisement")
+    travail.add_argument("file", help="file de travaux SQLite")
+    travail.add_argument("--sortie", default=".", help="répertoire commun des zips produits (défaut : répertoire courant)")
+    travail.add_argument("--index", help="index SQLite commun du corpus (voir l'option --index du script principal)")
+    travail.add_argument("--incremental", help="répertoire commun des états de construction incrémentale")
+    travail.add_argument("--cache", help="répertoire où conserver les lang-packs téléchargés")
+    travail.add_argument(
+        "--cache-max",
+        type=int,
+        default=TAILLE_MAX_CACHE,
+        help=f"taille maximale du cache en Mo (défaut : {TAILLE_MAX_CACHE})",
+    )
+    travail.add_argument(
+        "--cache-extraction",
+        help="cache SQLite commun du texte extrait des pages SVG (voir l'option --cache-extraction du script principal)",
+    )
+    travail.add_argument(
+        "--cache-extraction-max",
+        type=int,
+        default=TAILLE_MAX_CACHE_EXTRACTION,
+        help=f"taille maximale du cache de l'extraction en Mo (défaut : {TAILLE_MAX_CACHE_EXTRACTION})",
+    )
+    travail.add_argument(
+        "--hors-ligne", action="store_true", help="n'utiliser que les lang-packs présents dans le cache"
+    )
+    travail.add_argument("--url-base", default=URL_BASE, help="adresse du dépôt des sources Pepper&Carrot")
+    travail.add_argument(
+        "--delai",
+        type=float,
+        default=DELAI_EXPIRATION,
+        help=f"délai d'expiration de chaque requête HTTP, en secondes (défaut : {DELAI_EXPIRATION})",
+    )
+    travail.add_argument(
+        "--tentatives",
+        type=int,
+        default=NB_TENTATIVES,
+        help=f"nouvelles tentatives en cas d'erreur réseau (défaut : {NB_TENTATIVES})",
+    )
+    travail.add_argument(
+        "--processus",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="nombre de processus pour l'extraction du texte des SVG (défaut : nombre de cœurs)",
+    )
+    travail.add_argument(
+        "--pivots",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        default=list(PIVOTS),
+        help=f"langues pivots, le languedocien 'oc' étant obligatoire (défaut : {','.join(PIVOTS)})",
+    )
+    travail.add_argument(
+        "--langues",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        help="langues à aligner avec les pivots (voir l'option --langues du script principal)",
+    )
+    travail.add_argument(
+        "--exclure-langues",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        default=[],
+        help="langues à ne pas extraire ni aligner (voir l'option --exclure-langues du script principal)",
+    )
+    travail.add_argument("--alignement", choices=METHODES_ALIGNEMENT, default="structure")
+    travail.add_argument("--compression", choices=COMPRESSIONS, default="deflate")
+    travail.add_argument(
+        "--niveau-compression",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="niveau de compression deflate, uniquement avec --compression deflate (défaut : 6)",
+    )
+    travail.add_argument(
+        "--export",
+        choices=FORMATS_EXPORT,
+        help="exporter aussi les alignements de chaque épisode en colonnes (voir l'option --export du script principal) ; nécessite le module pyarrow",
+    )
+    travail.add_argument(
+        "--mmap",
+        action="store_true",
+        help="lire les lang-packs via une projection en mémoire (mmap)",
+    )
+    travail.add_argument(
+        "--bail",
+        type=float,
+        default=BAIL,
+        help=f"durée en secondes après laquelle un épisode d'un travailleur qui ne répond plus est repris par un autre (défaut : {BAIL})",
+    )
+    travail.add_argument(
+        "--essais",
+        type=int,
+        default=NB_ESSAIS,
+        help=f"nombre maximal de tentatives pour un même épisode (défaut : {NB_ESSAIS})",
+    )
+    travail.add_argument("--nom", help="nom du travailleur (défaut : machine-pid)")
+
+    etat = commandes.add_parser("etat", help="afficher l'avancement de la file de travaux")
+    etat.add_argument("file", help="file de travaux SQLite")
+
+    regroupement = commandes.add_parser(
+        "regrouper",
+        help="classer les fichiers alignés des épisodes terminés dans les répertoires '<langue1>_bilingue/<langue2>/'",
+    )
+    regroupement.add_argument("file", help="file de travaux SQLite")
+    regroupement.add_argument("--sortie", default=".", help="répertoire des zips produits par les travailleurs (défaut : répertoire courant)")
+    regroupement.add_argument("--destination", default=".", help="répertoire où créer les répertoires bilingues (défaut : répertoire courant)")
+    regroupement.add_argument(
+        "--zip", action="store_true", help="écrire chaque répertoire bilingue sous la forme d'un répertoire zippé"
+    )
+    regroupement.add_argument(
+        "--taches", type=int, default=NB_TACHES, help=f"zips traités simultanément (défaut : {NB_TACHES})"
+    )
+    arguments = parser.parse_args()
+
+    if arguments.commande == "ajouter":
+        episodes = lire_manifeste(arguments.manifeste)
+        if arguments.plage:
+            episodes = filtrer_plage(episodes, arguments.plage)
+        ajouter_travaux(arguments.file, episodes, arguments.refaire)
+        print(f"{len(episodes)} épisode(s) ajouté(s) à la file {arguments.file}")
+    elif arguments.commande == "travailler":
+        if "oc" not in arguments.pivots:
+            travail.error("l'option --pivots doit comprendre le languedocien 'oc'")
+        if arguments.hors_ligne and not arguments.cache:
+            travail.error("l'option --hors-ligne nécessite l'option --cache")
+        if arguments.niveau_compression is not None and arguments.compression != "deflate":
+            travail.error(
+                f"l'option --niveau-compression ne s'applique qu'à la compression deflate, pas à '{arguments.compression}'"
+            )
+        if arguments.export and importlib.util.find_spec("pyarrow") is None:
+            travail.error("l'option --export nécessite le module pyarrow (pip install pyarrow)")
+        # le languedocien reste le premier pivot, comme dans le script principal
+        arguments.pivots = ["oc"] + [
+            pivot for pivot in dict.fromkeys(arguments.pivots) if pivot != "oc"
+        ]
+        exclues_pivots = set(arguments.exclure_langues) & set(arguments.pivots)
+        if exclues_pivots:
+            travail.error(f"une langue pivot ne peut être exclue : {','.join(sorted(exclues_pivots))}")
+        arguments.selection_langues = construire_selection_langues(
+            arguments.langues, arguments.exclure_langues
+        )
+        travailler(arguments)
+    elif arguments.commande == "etat":
+        afficher_etat(arguments)
+    else:
+        regrouper(arguments)
+
+
+if __name__ == "__main__":
+    main()
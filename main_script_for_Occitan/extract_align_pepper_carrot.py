@@ -2,12 +2,43 @@
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import zipfile
 import csv
-import shutil
+import io
+import math
+import mmap
+from contextlib import closing, contextmanager, nullcontext
 from xml.etree import ElementTree as ET
-from itertools import zip_longest
+from xml.parsers import expat
+from itertools import zip_longest, repeat
 import sys
+import shutil
+import tempfile
+import json
+from array import array
+import re
+import sqlite3
+import time
+import hashlib
+import threading
+import argparse
+import asyncio
+import cProfile
+import importlib.util
+from datetime import datetime
+
+try:
+    import resource  # pic de mémoire résidente (absent sous Windows)
+except ImportError:
+    resource = None
+try:
+    import fcntl  # verrou de l'index du cache entre processus (msvcrt sous Windows)
+except ImportError:
+    fcntl = None
+    import msvcrt
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # Chargement de la table de correspondances entre les codes de langue utilisés par Pepper&Carrot (clés) et les codes de langue utilisés par Lo Congrès (valeurs)
 # Pour les langues construites n'ayant pas de code normalisé officiel, les valeurs correspondent au nom de la langue
@@ -90,52 +121,719 @@ def nettoyer_titre(titre: str):
     return titre.strip().replace(" ", "-").replace("'", "-")
 
 
+################# MESURES DE L'EXÉCUTION ############################
+# Durée cumulée de chaque étape et compteurs (octets téléchargés, SVG analysés, segments extraits par langue,
+# fichiers écrits...) collectés pendant toute l'exécution, puis écrits dans un rapport JSON (option --rapport).
+# Sans cette option, aucune mesure n'est activée : chronometrer() et compter() ne font qu'un test.
+# Les étapes exécutées dans plusieurs fils (téléchargements simultanés) voient leurs durées additionnées.
+
+
+class MesuresExecution:
+    def __init__(self):
+        self.debut = time.time()
+        self.verrou = threading.Lock()  # les téléchargements simultanés mesurent depuis plusieurs fils
+        self.etapes = {}  # {étape: {"duree_s": durée cumulée, "appels": nombre de passages}}
+        self.compteurs = {}  # {compteur: total} ou {compteur: {clé: total}}
+
+    def ajouter_duree(self, etape, duree):
+        with self.verrou:
+            mesure = self.etapes.setdefault(etape, {"duree_s": 0.0, "appels": 0})
+            mesure["duree_s"] += duree
+            mesure["appels"] += 1
+
+    def compter(self, compteur, quantite=1, cle=None):
+        with self.verrou:
+            if cle is None:
+                self.compteurs[compteur] = self.compteurs.get(compteur, 0) + quantite
+            else:
+                totaux = self.compteurs.setdefault(compteur, {})
+                totaux[cle] = totaux.get(cle, 0) + quantite
+
+    def rapport(self):
+        rapport = {
+            "debut": datetime.fromtimestamp(self.debut).isoformat(timespec="seconds"),
+            "duree_totale_s": round(time.time() - self.debut, 3),
+            "etapes": {
+                etape: {"duree_s": round(mesure["duree_s"], 6), "appels": mesure["appels"]}
+                for etape, mesure in self.etapes.items()
+            },
+            "compteurs": self.compteurs,
+        }
+        if resource is not None:
+            # ru_maxrss est exprimé en kilo-octets sous Linux, en octets sous macOS
+            unite = 1 if sys.platform == "darwin" else 1024
+            rapport["pic_memoire_rss_octets"] = (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unite
+            )
+            # plus gros des processus d'extraction terminés
+            rapport["pic_memoire_rss_processus_fils_octets"] = (
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unite
+            )
+        return rapport
+
+
+mesures_execution = None  # MesuresExecution si l'option --rapport est indiquée
+
+
+@contextmanager
+def chronometrer(etape):
+    if mesures_execution is None:
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        mesures_execution.ajouter_duree(etape, time.perf_counter() - debut)
+
+
+def compter(compteur, quantite=1, cle=None):
+    if mesures_execution is not None:
+        mesures_execution.compter(compteur, quantite, cle)
+
+
+def ecrire_rapport(fichier_rapport, arguments):
+    rapport = mesures_execution.rapport()
+    rapport["arguments"] = vars(arguments)
+    with open(fichier_rapport, "w", encoding="utf-8") as fichier:
+        json.dump(rapport, fichier, ensure_ascii=False, indent=2)
+    print(f"Rapport d'exécution : {fichier_rapport}")
+
+
 ################# TELECHARGEMENT DU ZIP ############################
 
 
-def chercher_episode(titre: str, numero_episode: str):
+# Paramètres réseau par défaut (modifiables en ligne de commande)
+URL_BASE = "https://peppercarrot.com/0_sources"
+DELAI_EXPIRATION = 30  # en secondes, pour chaque requête
+NB_TENTATIVES = 3  # nouvelles tentatives en cas d'erreur réseau ou serveur
+FACTEUR_ATTENTE = 1  # attente entre les tentatives : 1 s, 2 s, 4 s...
+NB_TELECHARGEMENTS = 4  # téléchargements simultanés en mode lot
+TAILLE_BLOC = 64 * 1024  # taille des blocs écrits sur le disque pendant le téléchargement
+
+
+def creer_session(
+    nb_connexions=NB_TELECHARGEMENTS,
+    tentatives=NB_TENTATIVES,
+    facteur_attente=FACTEUR_ATTENTE,
+):
+    # Session HTTP partagée : les connexions restent ouvertes (keep-alive) et sont réutilisées d'un téléchargement à l'autre
+    # Les erreurs de connexion et les erreurs serveur temporaires sont retentées avec une attente croissante
+    strategie = Retry(
+        total=tentatives,
+        backoff_factor=facteur_attente,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adaptateur = HTTPAdapter(
+        pool_connections=nb_connexions, pool_maxsize=nb_connexions, max_retries=strategie
+    )
+    session = requests.Session()
+    session.mount("https://", adaptateur)
+    session.mount("http://", adaptateur)
+    return session
+
+
+def lire_validateurs_partiel(fichier_partiel):
+    # Validateurs (ETag / Last-Modified) de la version du lang-pack dont le fichier '.part' contient le début
+    try:
+        with open(f"{fichier_partiel}.entetes", "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return {}
+
+
+def supprimer_partiel(fichier_partiel):
+    for chemin in (fichier_partiel, f"{fichier_partiel}.entetes"):
+        if os.path.exists(chemin):
+            os.remove(chemin)
+
+
+def debut_plage_recue(response):
+    # Premier octet de la plage renvoyée ('Content-Range: bytes 100-999/1000'), None si l'en-tête est illisible
+    plage = response.headers.get("Content-Range", "")
+    unite, _, reste = plage.partition(" ")
+    debut = reste.split("-")[0]
+    return int(debut) if unite == "bytes" and debut.isdigit() else None
+
+
+def telecharger_fichier(
+    client,
+    url,
+    fichier,
+    delai=DELAI_EXPIRATION,
+    reprise=False,
+    entetes_conditionnels=None,
+):
+    # Téléchargement par blocs de taille fixe : la mémoire utilisée ne dépend pas de la taille de l'archive
+    # Les données sont écrites dans un fichier '.part' renommé seulement une fois le téléchargement terminé
+    # En mode reprise, un fichier '.part' laissé par une exécution interrompue est complété (requête HTTP Range)
+    # Les validateurs de la version téléchargée (ETag / Last-Modified) sont conservés à côté du fichier '.part' et
+    # envoyés avec la reprise (If-Range) : si le lang-pack a changé entre-temps, le serveur renvoie le nouveau fichier
+    # entier et le début de l'ancienne version n'est jamais complété par la fin de la nouvelle
+    # Retourne les en-têtes de la réponse, ou None si le serveur indique que la version en cache est à jour (304)
+    fichier_partiel = f"{fichier}.part"
+    deja_recu = 0
+    validateur = None
+    if reprise and os.path.exists(fichier_partiel):
+        validateurs = lire_validateurs_partiel(fichier_partiel)
+        validateur = validateurs.get("etag") or validateurs.get("last_modified")
+        # sans validateur, rien ne garantit que le début du fichier appartienne à la version actuelle
+        deja_recu = os.path.getsize(fichier_partiel) if validateur else 0
+    if deja_recu:
+        entetes = {"Range": f"bytes={deja_recu}-", "If-Range": validateur}
+    else:
+        entetes = dict(entetes_conditionnels or {})
+
+    with client.get(url, headers=entetes, stream=True, timeout=delai) as response:
+        if response.status_code == 304:
+            return None
+        if response.status_code == 416 or (
+            response.status_code == 206 and debut_plage_recue(response) != deja_recu
+        ):
+            # plage demandée inexistante (fichier partiel invalide) ou plage renvoyée qui ne prolonge pas le
+            # fichier partiel : on repart de zéro
+            supprimer_partiel(fichier_partiel)
+            return telecharger_fichier(
+                client, url, fichier, delai, entetes_conditionnels=entetes_conditionnels
+            )
+        response.raise_for_status()
+
+        # 206 : le serveur renvoie uniquement la suite du fichier ; 200 : il renvoie le fichier entier
+        # (y compris quand If-Range indique que le lang-pack a changé depuis le début du téléchargement)
+        if response.status_code == 206:
+            mode = "ab"
+        else:
+            mode = "wb"
+            with open(f"{fichier_partiel}.entetes", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    },
+                    f,
+                )
+        with open(fichier_partiel, mode) as f:
+            for bloc in response.iter_content(chunk_size=TAILLE_BLOC):
+                f.write(bloc)
+                compter("octets_telecharges", len(bloc))
+
+    os.replace(fichier_partiel, fichier)
+    supprimer_partiel(fichier_partiel)
+    return response.headers
+
+
+################# CACHE DES LANG-PACKS ############################
+# Les archives sont rangées sous leur empreinte SHA-256 (<cache>/objets/<empreinte>.zip) :
+# deux épisodes dont le lang-pack est identique partagent le même fichier.
+# L'index (<cache>/index.json) associe à chaque épisode son empreinte, les en-têtes ETag / Last-Modified
+# nécessaires à la revalidation et la date du dernier accès (pour l'éviction des archives les moins récemment utilisées).
+
+# Plusieurs exécutions (ou travailleurs de distributed_rebuild.py) peuvent partager le même cache : l'index n'est lu
+# et modifié que sous un verrou posé sur '<cache>/index.lock', et l'éviction épargne les archives utilisées
+# récemment, qu'une autre exécution est peut-être encore en train de lire.
+
+TAILLE_MAX_CACHE = 1024  # en Mo
+DUREE_PROTECTION_CACHE = 3600  # en secondes : les archives utilisées depuis moins longtemps ne sont pas supprimées
+
+verrou_cache = threading.Lock()  # l'index est partagé par les téléchargements simultanés
+debut_execution = time.time()  # les archives utilisées pendant l'exécution en cours ne sont jamais supprimées
+
+
+@contextmanager
+def verrouiller_cache(repertoire_cache):
+    # Verrou exclusif sur l'index du cache : entre les fils d'un même processus (verrou_cache),
+    # puis entre les processus (verrou posé sur le fichier '<cache>/index.lock')
+    os.makedirs(repertoire_cache, exist_ok=True)
+    with verrou_cache, open(os.path.join(repertoire_cache, "index.lock"), "a+b") as fichier_verrou:
+        if fcntl is not None:
+            fcntl.flock(fichier_verrou, fcntl.LOCK_EX)
+        else:
+            fichier_verrou.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fichier_verrou.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK abandonne après dix secondes d'attente
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fichier_verrou, fcntl.LOCK_UN)
+            else:
+                fichier_verrou.seek(0)
+                msvcrt.locking(fichier_verrou.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def lire_index_cache(repertoire_cache):
+    chemin_index = os.path.join(repertoire_cache, "index.json")
+    if not os.path.exists(chemin_index):
+        return {}
+    with open(chemin_index, "r", encoding="utf-8") as fichier:
+        return json.load(fichier)
+
+
+def ecrire_index_cache(repertoire_cache, index):
+    # écriture dans un fichier temporaire puis renommage : l'index n'est jamais lu à moitié écrit
+    # (fichier temporaire propre au processus : plusieurs exécutions peuvent partager le même cache)
+    chemin_index = os.path.join(repertoire_cache, "index.json")
+    chemin_temporaire = f"{chemin_index}.{os.getpid()}.tmp"
+    with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
+        json.dump(index, fichier, ensure_ascii=False, indent=1)
+    os.replace(chemin_temporaire, chemin_index)
+
+
+def chemin_objet_cache(repertoire_cache, empreinte):
+    return os.path.join(repertoire_cache, "objets", f"{empreinte}.zip")
+
+
+def calculer_empreinte(fichier):
+    sha256 = hashlib.sha256()
+    with open(fichier, "rb") as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC), b""):
+            sha256.update(bloc)
+    return sha256.hexdigest()
+
+
+def consulter_cache(repertoire_cache, cle):
+    # Entrée de l'index pour un épisode, si l'archive correspondante est bien présente ; la date d'accès est mise à jour
+    with verrouiller_cache(repertoire_cache):
+        index = lire_index_cache(repertoire_cache)
+        entree = index.get(cle)
+        if not entree or not os.path.exists(
+            chemin_objet_cache(repertoire_cache, entree["empreinte"])
+        ):
+            return None
+        entree["dernier_acces"] = time.time()
+        ecrire_index_cache(repertoire_cache, index)
+    return entree
+
+
+def entetes_revalidation(entree):
+    # En-têtes de requête conditionnelle : le serveur répond 304 si le lang-pack n'a pas changé
+    entetes = {}
+    if entree and entree.get("etag"):
+        entetes["If-None-Match"] = entree["etag"]
+    if entree and entree.get("last_modified"):
+        entetes["If-Modified-Since"] = entree["last_modified"]
+    return entetes
+
+
+def ajouter_au_cache(repertoire_cache, cle, fichier_zip, entetes_reponse):
+    # Déplacement de l'archive téléchargée vers son emplacement définitif et mise à jour de l'index
+    empreinte = calculer_empreinte(fichier_zip)
+    chemin_objet = chemin_objet_cache(repertoire_cache, empreinte)
+    os.makedirs(os.path.dirname(chemin_objet), exist_ok=True)
+
+    # sous le verrou : une autre exécution ne peut pas supprimer l'archive entre son dépôt et son entrée dans l'index
+    with verrouiller_cache(repertoire_cache):
+        os.replace(fichier_zip, chemin_objet)
+        index = lire_index_cache(repertoire_cache)
+        ancienne_entree = index.get(cle)
+        index[cle] = {
+            "empreinte": empreinte,
+            "etag": entetes_reponse.get("ETag"),
+            "last_modified": entetes_reponse.get("Last-Modified"),
+            "taille": os.path.getsize(chemin_objet),
+            "dernier_acces": time.time(),
+        }
+        ecrire_index_cache(repertoire_cache, index)
+
+        # l'archive de la version précédente du lang-pack est supprimée si aucun autre épisode ne la partage
+        if ancienne_entree and ancienne_entree["empreinte"] != empreinte:
+            ancienne_empreinte = ancienne_entree["empreinte"]
+            if all(entree["empreinte"] != ancienne_empreinte for entree in index.values()):
+                ancien_objet = chemin_objet_cache(repertoire_cache, ancienne_empreinte)
+                if os.path.exists(ancien_objet):
+                    os.remove(ancien_objet)
+    return chemin_objet
+
+
+def nettoyer_cache(repertoire_cache, taille_max=TAILLE_MAX_CACHE):
+    # Éviction des archives les moins récemment utilisées jusqu'à repasser sous la taille maximale (en Mo)
+    # Les archives utilisées pendant l'exécution en cours ou depuis moins de DUREE_PROTECTION_CACHE secondes
+    # (peut-être encore lues par une autre exécution) sont conservées, même si le cache dépasse alors sa taille maximale
+    limite_protection = min(debut_execution, time.time() - DUREE_PROTECTION_CACHE)
+    with verrouiller_cache(repertoire_cache):
+        index = lire_index_cache(repertoire_cache)
+        objets = {}  # empreinte -> (dernier accès, taille)
+        for entree in index.values():
+            dernier_acces, taille = objets.get(entree["empreinte"], (0, entree["taille"]))
+            objets[entree["empreinte"]] = (max(dernier_acces, entree["dernier_acces"]), taille)
+
+        taille_totale = sum(taille for _, taille in objets.values())
+        supprimes = set()
+        for empreinte, (dernier_acces, taille) in sorted(objets.items(), key=lambda objet: objet[1][0]):
+            if taille_totale <= taille_max * 1024 * 1024 or dernier_acces >= limite_protection:
+                break
+            chemin_objet = chemin_objet_cache(repertoire_cache, empreinte)
+            if os.path.exists(chemin_objet):
+                os.remove(chemin_objet)
+            taille_totale -= taille
+            supprimes.add(empreinte)
+
+        if supprimes:
+            index = {
+                cle: entree
+                for cle, entree in index.items()
+                if entree["empreinte"] not in supprimes
+            }
+            ecrire_index_cache(repertoire_cache, index)
+            print(f"Cache : {len(supprimes)} archive(s) supprimée(s) pour respecter la taille maximale.")
+
+        # Archives absentes de l'index (laissées par une version antérieure du script ou par une exécution
+        # interrompue) : elles ne seraient jamais réutilisées ni comptées dans la taille du cache
+        repertoire_objets = os.path.join(repertoire_cache, "objets")
+        referencees = {f"{entree['empreinte']}.zip" for entree in index.values()}
+        orphelines = [
+            nom_fichier
+            for nom_fichier in (os.listdir(repertoire_objets) if os.path.isdir(repertoire_objets) else [])
+            if nom_fichier not in referencees
+        ]
+        for nom_fichier in orphelines:
+            os.remove(os.path.join(repertoire_objets, nom_fichier))
+        if orphelines:
+            print(f"Cache : {len(orphelines)} archive(s) absente(s) de l'index supprimée(s).")
+
+
+def chercher_episode(
+    titre: str,
+    numero_episode: str,
+    session=None,
+    delai=DELAI_EXPIRATION,
+    url_base=URL_BASE,
+    reprise=False,
+    repertoire_cache=None,
+    hors_ligne=False,
+    repertoire_telechargement=None,
+):
+    # repertoire_telechargement : répertoire où télécharger le lang-pack hors cache (défaut : répertoire courant)
     # Ajouter un zéro pour les numéros inférieurs à 10 si l'utilisateur ne l'a pas fait
     numero_episode = numero_episode.zfill(2)
+    cle = f"ep{numero_episode}_{titre}"
+
+    # Recherche dans le cache local, s'il est activé
+    entree = consulter_cache(repertoire_cache, cle) if repertoire_cache else None
+    if hors_ligne:
+        if entree:
+            print("Lang-pack lu dans le cache (mode hors ligne)")
+            compter("lang_packs_lus_dans_le_cache")
+            return chemin_objet_cache(repertoire_cache, entree["empreinte"])
+        print(
+            f"\nErreur : le lang-pack de l'épisode {cle} est absent du cache et le mode hors ligne est activé."
+        )
+        return None
 
     # Construction de l'URL
-    base_url = "https://peppercarrot.com/0_sources"
-    zip_url = f"{base_url}/ep{numero_episode}_{titre}/zip/ep{numero_episode}_{titre}_lang-pack.zip"
-
-    # Téléchargement du dossier ZIP
+    zip_url = f"{url_base}/{cle}/zip/{cle}_lang-pack.zip"
+
+    fichier_zip = f"{cle}_lang-pack.zip"
+    if repertoire_cache:
+        # nom propre au processus : deux exécutions partageant le cache peuvent télécharger le même épisode
+        # (sauf avec la reprise, où le téléchargement interrompu doit être retrouvé par l'exécution suivante)
+        os.makedirs(os.path.join(repertoire_cache, "telechargements"), exist_ok=True)
+        if not reprise:
+            fichier_zip = f"{os.getpid()}-{fichier_zip}"
+        fichier_zip = os.path.join(repertoire_cache, "telechargements", fichier_zip)
+    elif repertoire_telechargement:
+        fichier_zip = os.path.join(repertoire_telechargement, fichier_zip)
+
+    # Téléchargement du dossier ZIP (avec la session partagée si elle est fournie)
+    # Si l'épisode est en cache, la requête est conditionnelle et le téléchargement est évité quand rien n'a changé
+    client = session if session is not None else requests
     try:
-        response = requests.get(zip_url)
-        response.raise_for_status()
-        print("Fichier bien téléchargé")
+        with chronometrer("telechargement"):
+            entetes_reponse = telecharger_fichier(
+                client, zip_url, fichier_zip, delai, reprise, entetes_revalidation(entree)
+            )
     except requests.exceptions.RequestException as e:
         print(
             f"\nErreur lors du téléchargement de l'épisode : {e}.\nSolutions possibles :\n1) vérifiez que le titre en anglais existe bien et soit bien orthographié, \n2) vérifiez que vous ayez bien respecté les majuscules du titre original, \n3) vérifiez qu'il y ait une correspondance entre le titre et le numéro d'épisode saisi, \n4) pensez également à vérifier votre connexion internet, \n5) enfin, contactez un membre du pôle Informatique."
         )
+        if not reprise:
+            supprimer_partiel(f"{fichier_zip}.part")
         return None
 
-    fichier_zip = f"ep{numero_episode}_{titre}_lang-pack.zip"
+    if entetes_reponse is None:
+        print("Lang-pack inchangé depuis le dernier téléchargement : utilisation du cache")
+        compter("lang_packs_lus_dans_le_cache")
+        return chemin_objet_cache(repertoire_cache, entree["empreinte"])
+    print("Fichier bien téléchargé")
+    compter("lang_packs_telecharges")
+
+    # Vérification de l'archive (les SVG sont ensuite lus directement dans le ZIP, sans décompression sur le disque)
+    if not zipfile.is_zipfile(fichier_zip):
+        print("Erreur : le fichier ZIP ne peut être lu.")
+        os.remove(fichier_zip)
+        return None
 
-    with open(fichier_zip, "wb") as f:
-        f.write(response.content)
+    if repertoire_cache:
+        return ajouter_au_cache(repertoire_cache, cle, fichier_zip, entetes_reponse)
+    return fichier_zip
+
+
+################# CATALOGUE DES ÉPISODES ############################
+# Le site publie la liste de tous les épisodes (episodes.json à la racine des sources), avec pour chacun
+# son nom exact ('ep05_Preparations') et les langues dans lesquelles il est traduit :
+#     [{"name": "ep05_Preparations", "translated_languages": ["fr", "ga", "oc", ...]}, ...]
+# Le catalogue en déduit le titre exact de chaque numéro d'épisode, et permet d'écarter les épisodes sans
+# traduction en occitan avant tout téléchargement.
+
+NOM_CATALOGUE = "episodes.json"
+DUREE_CATALOGUE = 24 * 3600  # en secondes : durée de validité du catalogue conservé dans le cache
+
+
+def analyser_catalogue(donnees):
+    # {numéro sur deux chiffres: (titre, langues traduites ou None si le catalogue ne les indique pas)}
+    catalogue = {}
+    for entree in donnees:
+        if isinstance(entree, str):
+            entree = {"name": entree}
+        prefixe, _, titre = entree.get("name", "").partition("_")
+        if not prefixe.startswith("ep") or not prefixe[2:].isdigit() or not titre:
+            continue
+        langues = entree.get("translated_languages")
+        catalogue[prefixe[2:].zfill(2)] = (titre, set(langues) if langues is not None else None)
+    return catalogue
+
+
+def charger_catalogue(
+    fichier_catalogue=None,
+    session=None,
+    delai=DELAI_EXPIRATION,
+    url_base=URL_BASE,
+    repertoire_cache=None,
+    hors_ligne=False,
+):
+    # fichier_catalogue : catalogue local au format du site (tests hors ligne) ; sinon, le catalogue est téléchargé
+    # depuis le site et conservé dans le cache s'il est activé (DUREE_CATALOGUE)
+    # Retourne le catalogue (voir analyser_catalogue()), ou None s'il n'a pu être obtenu
+    if fichier_catalogue:
+        with open(fichier_catalogue, "r", encoding="utf-8") as fichier:
+            return analyser_catalogue(json.load(fichier))
+
+    chemin_cache = os.path.join(repertoire_cache, "catalogue.json") if repertoire_cache else None
+    en_cache = chemin_cache is not None and os.path.exists(chemin_cache)
+    if en_cache and (hors_ligne or time.time() - os.path.getmtime(chemin_cache) < DUREE_CATALOGUE):
+        with open(chemin_cache, "r", encoding="utf-8") as fichier:
+            return analyser_catalogue(json.load(fichier))
+    if hors_ligne:
+        print("\nErreur : le catalogue des épisodes est absent du cache et le mode hors ligne est activé.")
+        return None
 
-    # Décompression du dossier ZIP
+    client = session if session is not None else requests
     try:
+        with chronometrer("telechargement"):
+            response = client.get(f"{url_base}/{NOM_CATALOGUE}", timeout=delai)
+            response.raise_for_status()
+            donnees = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"\nErreur lors du téléchargement du catalogue des épisodes : {e}.")
+        if not en_cache:
+            return None
+        # un catalogue périmé vaut mieux que pas de catalogue
+        print("Utilisation du catalogue conservé dans le cache.")
+        with open(chemin_cache, "r", encoding="utf-8") as fichier:
+            return analyser_catalogue(json.load(fichier))
+
+    if chemin_cache:
+        os.makedirs(repertoire_cache, exist_ok=True)
+        chemin_temporaire = f"{chemin_cache}.{os.getpid()}.tmp"
+        with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(donnees, fichier, ensure_ascii=False)
+        os.replace(chemin_temporaire, chemin_cache)
+    return analyser_catalogue(donnees)
+
+
+def resoudre_episodes(episodes, catalogue):
+    # Titre exact de chaque épisode [(numéro, titre ou None), ...] d'après le catalogue (le titre indiqué,
+    # s'il y en a un, ne sert que pour un épisode absent du catalogue)
+    # Les épisodes sans traduction en occitan sont écartés avant tout téléchargement
+    retenus = []
+    for numero_episode, titre in episodes:
+        entree = catalogue.get(numero_episode.zfill(2))
+        if entree is None:
+            if titre:
+                print(f"Épisode {numero_episode} absent du catalogue : titre indiqué utilisé ({titre}).")
+                retenus.append((numero_episode, titre))
+            else:
+                print(f"Épisode {numero_episode} absent du catalogue : ignoré.")
+            continue
+        titre_catalogue, langues = entree
+        if titre and nettoyer_titre(titre) != titre_catalogue:
+            print(f"Épisode {numero_episode} : titre corrigé d'après le catalogue ({titre_catalogue}).")
+        if langues is not None and "oc" not in langues:
+            print(f"Épisode {numero_episode} ignoré : pas de traduction en occitan d'après le catalogue.")
+            continue
+        if langues is not None and "ga" not in langues:
+            print(f"Épisode {numero_episode} : pas de traduction en gascon d'après le catalogue.")
+        retenus.append((numero_episode, titre_catalogue))
+    return retenus
+
+
+################# LECTURE DES SVG DANS L'ARCHIVE ############################
+
+
+class ArchiveMmap(mmap.mmap):
+    # zipfile a besoin d'un objet fichier 'seekable()', méthode que mmap ne fournit pas avant Python 3.13
+    def seekable(self):
+        return True
+
+
+@contextmanager
+def ouvrir_lang_pack(fichier_zip, avec_mmap=False):
+    # Ouverture du lang-pack en lecture ; en mode mmap, l'archive est projetée en mémoire
+    # et les lectures des membres se font sans appel système (utile pour une archive lue de nombreuses fois)
+    if not avec_mmap:
         with zipfile.ZipFile(fichier_zip, "r") as zip_ref:
-            zip_ref.extractall(f"ep{numero_episode}_{titre}_lang-pack")
-    except zipfile.BadZipFile:
-        print("Erreur : le fichier ZIP ne peut être lu.")
-        return None
+            yield zip_ref
+        return
+
+    with open(fichier_zip, "rb") as f, ArchiveMmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as memoire, zipfile.ZipFile(memoire, "r") as zip_ref:
+        yield zip_ref
+
+
+def lister_svg_par_langue(zip_ref):
+    # Membres 'lang/<code>/<fichier>.svg' de l'archive, regroupés par code de langue
+    svg_par_langue = {}
+    for nom_membre in zip_ref.namelist():
+        morceaux = nom_membre.split("/")
+        if len(morceaux) == 3 and morceaux[0] == "lang" and morceaux[2].endswith(".svg"):
+            svg_par_langue.setdefault(morceaux[1], []).append(nom_membre)
+    return svg_par_langue
 
-    os.remove(fichier_zip)  # Supprimer l'archive ZIP après extraction
-    return f"ep{numero_episode}_{titre}_lang-pack"
+
+def construire_selection_langues(langues=None, exclure_langues=()):
+    # Sélection des options --langues / --exclure-langues, enregistrée telle quelle dans l'état incrémental :
+    # listes triées, sans doublon (None : toutes les langues)
+    if langues is None and not exclure_langues:
+        return None
+    return {
+        "inclure": sorted(set(langues)) if langues is not None else None,
+        "exclure": sorted(set(exclure_langues)),
+    }
+
+
+def selectionner_langues(codes_langue, pivots, selection_langues=None):
+    # Langues de l'archive à traiter : les langues pivots, et les autres selon la sélection
+    # {"inclure": [codes] ou None (toutes), "exclure": [codes]} (None : toutes les langues)
+    if not selection_langues:
+        return list(codes_langue)
+    inclure = selection_langues.get("inclure")
+    exclure = set(selection_langues.get("exclure") or ())
+    return [
+        langue_code
+        for langue_code in codes_langue
+        if langue_code in pivots
+        or ((inclure is None or langue_code in inclure) and langue_code not in exclure)
+    ]
 
 
 ################# TRAITEMENT DU SVG ############################
 
 
-def extraire_texte_du_svg(path_fichier_svg, numero_episode, code_langue):
+NAMESPACE_SVG = "http://www.w3.org/2000/svg"
+
+
+class CollecteurTexteSvg:
+    # Gestionnaire d'évènements du parseur expat (à la manière d'un gestionnaire SAX) :
+    # seul le texte des balises à extraire est conservé, aucun arbre XML n'est construit
+    # Le texte de chaque balise est découpé en morceaux comme avec Element.itertext() (texte et queues des sous-éléments)
+
+    def __init__(self, balise):
+        self.balise = balise
+        self.textes = []  # morceaux de texte de chaque balise à extraire, dans l'ordre du document
+        self.identifiants = []  # attribut 'id' de chaque balise à extraire (None s'il est absent)
+        self.ouvertes = []  # indices (dans self.textes) des balises à extraire actuellement ouvertes
+        self.tampon = []  # texte reçu depuis la dernière balise ouvrante ou fermante
+
+    def vider_tampon(self):
+        # Le texte situé entre deux balises forme un morceau, ajouté à toutes les balises à extraire qui l'englobent
+        morceau = "".join(self.tampon)
+        self.tampon = []
+        if morceau:
+            for indice in self.ouvertes:
+                self.textes[indice].append(morceau)
+
+    def debut_element(self, balise, attributs):
+        if self.ouvertes:
+            self.vider_tampon()
+        if balise == self.balise:
+            self.ouvertes.append(len(self.textes))
+            self.textes.append([])
+            self.identifiants.append(attributs.get("id"))
+
+    def fin_element(self, balise):
+        if self.ouvertes:
+            self.vider_tampon()
+            if balise == self.balise:
+                self.ouvertes.pop()
+
+    def donnees(self, texte):
+        if self.ouvertes:
+            self.tampon.append(texte)
+
+
+def extraire_texte_du_svg(
+    path_fichier_svg, numero_episode, code_langue, avec_identifiants=False
+):
+    # Lecture du SVG par évènements (expat) : seuls les blocs <flowRoot> ou <text> sont conservés,
+    # les tracés et images intégrées sont parcourus sans être stockés
+    # Résultat identique à extraire_texte_du_svg_arbre(), qui construit l'arbre XML complet de la page
+    # path_fichier_svg : chemin du fichier ou fichier déjà ouvert (membre de l'archive ZIP par exemple)
+    # avec_identifiants : rendre des paires (id du bloc SVG, texte sur une seule ligne) pour le regroupement
+    # dans SegmentsLangue, sans le code de langue que le format "texte§code" obligerait à retirer ensuite
+    nom_fichier_svg = getattr(path_fichier_svg, "name", path_fichier_svg)
+    # pour contraindre le programme à ne traiter que des fichiers SVG (et pas les fichiers Markdown ou Json !)
+    if not nom_fichier_svg.lower().endswith(".svg"):
+        print(f"Le fichier {nom_fichier_svg} n'est pas un fichier SVG et sera ignoré.")
+        return []
+
+    # <flowRoot> pour les épisodes 1 à 12, <text> pour les épisodes 13 et plus
+    if int(numero_episode) <= 12:
+        collecteur = CollecteurTexteSvg(f"{NAMESPACE_SVG}}}flowRoot")
+    else:
+        collecteur = CollecteurTexteSvg(f"{NAMESPACE_SVG}}}text")
+
+    parseur = expat.ParserCreate(namespace_separator="}")
+    parseur.StartElementHandler = collecteur.debut_element
+    parseur.EndElementHandler = collecteur.fin_element
+    parseur.CharacterDataHandler = collecteur.donnees
+
+    # La page est transmise en une seule fois : expat relit son tampon à chaque envoi
+    # tant qu'un attribut (tracé, image en base64...) n'est pas complet, ce qui pénalise les envois par petits blocs
+    try:
+        if hasattr(path_fichier_svg, "read"):
+            parseur.Parse(path_fichier_svg.read(), True)
+        else:
+            with open(path_fichier_svg, "rb") as fichier_svg:
+                parseur.Parse(fichier_svg.read(), True)
+    except expat.ExpatError as e:
+        print(f"Erreur lors du parsing du fichier SVG {nom_fichier_svg} : {e}")
+        return []
+
+    elements_texte = []
+    for identifiant, morceaux in zip(collecteur.identifiants, collecteur.textes):
+        texte = " ".join(morceaux).strip()  # Ajouter un espace pour éviter les mots collés
+        if texte:
+            if avec_identifiants:
+                elements_texte.append((identifiant, mettre_sur_une_ligne(texte)))
+            else:
+                elements_texte.append(f"{texte}§{code_langue}\n")
+
+    return elements_texte
+
+
+def extraire_texte_du_svg_arbre(path_fichier_svg, numero_episode, code_langue):
+    # Version d'origine (arbre XML complet), conservée comme référence pour le banc d'essai
+    # path_fichier_svg : chemin du fichier ou fichier déjà ouvert (membre de l'archive ZIP par exemple)
+    nom_fichier_svg = getattr(path_fichier_svg, "name", path_fichier_svg)
     # pour contraindre le programme à ne traiter que des fichiers SVG (et pas les fichiers Markdown ou Json !)
-    if not path_fichier_svg.lower().endswith(".svg"):
-        print(f"Le fichier {path_fichier_svg} n'est pas un fichier SVG et sera ignoré.")
+    if not nom_fichier_svg.lower().endswith(".svg"):
+        print(f"Le fichier {nom_fichier_svg} n'est pas un fichier SVG et sera ignoré.")
         return []
 
     # Ouvrir le fichier SVG et lire son contenu
@@ -143,7 +841,7 @@ def extraire_texte_du_svg(path_fichier_svg, numero_episode, code_langue):
         tree = ET.parse(path_fichier_svg)
         root = tree.getroot()
     except ET.ParseError as e:
-        print(f"Erreur lors du parsing du fichier SVG {path_fichier_svg} : {e}")
+        print(f"Erreur lors du parsing du fichier SVG {nom_fichier_svg} : {e}")
         return []
 
     elements_texte = []
@@ -176,437 +874,2102 @@ def extraire_texte_du_svg(path_fichier_svg, numero_episode, code_langue):
     return elements_texte
 
 
-################# ECRITURE DE NOUVEAUX CSV AVEC LE TEXTE SVG ##############
+################# EXTRACTION EN PARALLÈLE ############################
 
+PAGES_PAR_LOT = 8  # pages extraites par tâche : chaque tâche ouvre l'archive une seule fois
 
-def creer_csv_avec_svg_data(langue_code, numero_episode, numero_page, texte_svg):
-    nv_fichier_csv = (
-        f"{langue_code}_E{numero_episode.zfill(2)}P{numero_page.zfill(2)}.csv"
-    )
-    with open(nv_fichier_csv, "w", newline="", encoding="utf-8") as fichier_csv:
-        writer = csv.writer(fichier_csv)
-        for row in texte_svg:
-            writer.writerow([row])
-
-    return nv_fichier_csv
 
+def extraire_lot_de_pages(
+    fichier_zip, avec_mmap, numero_episode, pages, fichier_cache_extraction=None
+):
+    # Extraction du texte d'une série de pages [(code_langue, membre_svg), ...] du lang-pack
+    # Fonction de premier niveau : elle peut être exécutée dans un autre processus
+    # fichier_cache_extraction : si indiqué, les pages déjà analysées sont lues dans ce cache (voir plus bas)
+    # Rend (textes des pages, nombre de pages lues dans le cache, nombre de SVG analysés) : les compteurs sont
+    # cumulés par le processus principal, les mesures n'étant pas collectées dans les autres processus
+    textes_svg = []
+    with ouvrir_lang_pack(fichier_zip, avec_mmap) as zip_ref:
+        if fichier_cache_extraction:
+            return extraire_pages_avec_cache(
+                zip_ref, numero_episode, pages, fichier_cache_extraction
+            )
+        for code_langue, membre_svg in pages:
+            with zip_ref.open(membre_svg) as fichier_svg:
+                textes_svg.append(
+                    extraire_texte_du_svg(
+                        fichier_svg, numero_episode, code_langue, avec_identifiants=True
+                    )
+                )
+    return textes_svg, 0, len(textes_svg)
+
+
+def extraire_pages(
+    fichier_zip,
+    pages,
+    numero_episode,
+    avec_mmap=False,
+    executeur=None,
+    fichier_cache_extraction=None,
+):
+    # Texte de chaque page [(code_langue, membre_svg), ...], rendu dans le même ordre que les pages,
+    # sous forme de paires (id du bloc SVG, texte)
+    # Avec un groupe de processus, les pages sont réparties par lots sur tous les cœurs
+    if executeur is None:
+        resultats = [
+            extraire_lot_de_pages(
+                fichier_zip, avec_mmap, numero_episode, pages, fichier_cache_extraction
+            )
+        ]
+    else:
+        lots = [
+            pages[debut : debut + PAGES_PAR_LOT]
+            for debut in range(0, len(pages), PAGES_PAR_LOT)
+        ]
+        resultats = executeur.map(
+            extraire_lot_de_pages,
+            repeat(fichier_zip),
+            repeat(avec_mmap),
+            repeat(numero_episode),
+            lots,
+            repeat(fichier_cache_extraction),
+        )
 
-################# FUSION DES CSV DE PAGES EN UN SEUL CSV PAR LANGUE ########
+    textes_svg = []
+    for textes_lot, nb_lues_dans_le_cache, nb_analyses in resultats:
+        textes_svg.extend(textes_lot)
+        compter("pages_lues_dans_le_cache", nb_lues_dans_le_cache)
+        compter("svg_analyses", nb_analyses)
+    return textes_svg
+
+
+################# CACHE DE L'EXTRACTION ##############
+# Texte extrait de chaque page, conservé d'une exécution à l'autre dans une base SQLite partagée par les
+# processus d'extraction, sous l'empreinte SHA-256 du contenu du SVG et le mode d'extraction (<flowRoot> ou
+# <text>) : une page identique d'une version du lang-pack à l'autre, ou reprise telle quelle dans un autre
+# épisode, n'est plus analysée. Le texte extrait ne dépend pas du code de langue, absent de la clé.
+
+TAILLE_MAX_CACHE_EXTRACTION = 256  # en Mo
+
+SCHEMA_CACHE_EXTRACTION = """
+CREATE TABLE IF NOT EXISTS pages (
+    empreinte TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    segments TEXT NOT NULL,
+    taille INTEGER NOT NULL,
+    dernier_acces REAL NOT NULL,
+    PRIMARY KEY (empreinte, mode)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pages_acces ON pages (dernier_acces);
+"""
+
+
+def ouvrir_cache_extraction(fichier_cache_extraction):
+    connexion = sqlite3.connect(fichier_cache_extraction, timeout=DELAI_VERROU_INDEX)
+    # journal WAL : les processus d'extraction lisent le cache pendant qu'un autre y écrit
+    connexion.execute("PRAGMA journal_mode=WAL")
+    connexion.executescript(SCHEMA_CACHE_EXTRACTION)
+    return connexion
+
+
+def lire_cache_extraction(connexion, empreintes, mode):
+    # {empreinte: [(id du bloc SVG, texte), ...]} des pages déjà présentes dans le cache, dont la date d'accès
+    # est mise à jour (pour l'éviction des pages les moins récemment utilisées)
+    connues = {}
+    for empreinte in set(empreintes):
+        ligne = connexion.execute(
+            "SELECT segments FROM pages WHERE empreinte = ? AND mode = ?", (empreinte, mode)
+        ).fetchone()
+        if ligne:
+            connues[empreinte] = [tuple(segment) for segment in json.loads(ligne[0])]
+    if connues:
+        maintenant = time.time()
+        with connexion:
+            connexion.executemany(
+                "UPDATE pages SET dernier_acces = ? WHERE empreinte = ? AND mode = ?",
+                [(maintenant, empreinte, mode) for empreinte in connues],
+            )
+    return connues
+
+
+def ecrire_cache_extraction(connexion, textes_par_empreinte, mode):
+    maintenant = time.time()
+    lignes = []
+    for empreinte, texte_svg in textes_par_empreinte.items():
+        segments = json.dumps(texte_svg, ensure_ascii=False)
+        lignes.append((empreinte, mode, segments, len(segments.encode("utf-8")), maintenant))
+    with connexion:
+        connexion.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", lignes)
+
+
+def extraire_pages_avec_cache(zip_ref, numero_episode, pages, fichier_cache_extraction):
+    # Texte des pages [(code_langue, membre_svg), ...] : les pages déjà analysées sont lues dans le cache,
+    # les autres sont analysées puis ajoutées au cache
+    # Rend (textes des pages, nombre de pages lues dans le cache, nombre de SVG analysés)
+    mode = "flowRoot" if int(numero_episode) <= 12 else "text"  # comme extraire_texte_du_svg()
+    contenus = [zip_ref.read(membre_svg) for _, membre_svg in pages]
+    empreintes = [hashlib.sha256(contenu).hexdigest() for contenu in contenus]
+    with closing(ouvrir_cache_extraction(fichier_cache_extraction)) as connexion:
+        connues = lire_cache_extraction(connexion, empreintes, mode)
+        nouvelles = {}
+        textes_svg = []
+        for (code_langue, membre_svg), contenu, empreinte in zip(pages, contenus, empreintes):
+            if empreinte not in connues and empreinte not in nouvelles:
+                fichier_svg = io.BytesIO(contenu)
+                fichier_svg.name = membre_svg  # extraire_texte_du_svg() vérifie l'extension
+                nouvelles[empreinte] = extraire_texte_du_svg(
+                    fichier_svg, numero_episode, code_langue, avec_identifiants=True
+                )
+            textes_svg.append(connues[empreinte] if empreinte in connues else nouvelles[empreinte])
+        if nouvelles:
+            ecrire_cache_extraction(connexion, nouvelles, mode)
+    nb_lues_dans_le_cache = sum(empreinte in connues for empreinte in empreintes)
+    return textes_svg, nb_lues_dans_le_cache, len(nouvelles)
+
+
+def nettoyer_cache_extraction(
+    fichier_cache_extraction, taille_max=TAILLE_MAX_CACHE_EXTRACTION
+):
+    # Éviction des pages les moins récemment utilisées jusqu'à repasser sous la taille maximale (en Mo)
+    with closing(ouvrir_cache_extraction(fichier_cache_extraction)) as connexion:
+        taille_totale = connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM pages").fetchone()[0]
+        supprimees = []
+        for empreinte, mode, taille in connexion.execute(
+            "SELECT empreinte, mode, taille FROM pages ORDER BY dernier_acces"
+        ):
+            if taille_totale <= taille_max * 1024 * 1024:
+                break
+            supprimees.append((empreinte, mode))
+            taille_totale -= taille
+        if supprimees:
+            with connexion:
+                connexion.executemany(
+                    "DELETE FROM pages WHERE empreinte = ? AND mode = ?", supprimees
+                )
+            print(
+                f"Cache de l'extraction : {len(supprimees)} page(s) supprimée(s) pour respecter la taille maximale."
+            )
 
 
-def fusionner_csv_par_langue(langue_code, numero_episode, fichiers_csv_temp):
-    # Fusionner tous les fichiers CSV temporaires pour une langue donnée (fusionner les CSV traitant des pages)
-    nom_fichier_fusionne = f"{langue_code}_E{numero_episode.zfill(2)}.csv"
-    with open(
-        nom_fichier_fusionne, "w", newline="", encoding="utf-8"
-    ) as fichier_fusionne:
-        writer = csv.writer(fichier_fusionne)
-        for fichier_csv in sorted(fichiers_csv_temp):
-            with open(fichier_csv, "r", encoding="utf-8") as fichier_temporaire:
-                reader = csv.reader(fichier_temporaire)
-                for row in reader:
-                    writer.writerow(row)
-            os.remove(
-                fichier_csv
-            )  # Supprimer le fichier CSV temporaire de traitement des pages pour éviter l'encombrement
+################# REGROUPEMENT DES SEGMENTS PAR LANGUE ##############
+
+
+class SegmentsLangue:
+    # Segments d'une langue pour un épisode, rangés de façon compacte plutôt qu'en liste de chaînes "texte§code" :
+    # - texte : textes de tous les segments (chacun sur une seule ligne) mis bout à bout dans une seule chaîne
+    # - fins : position de fin de chaque segment dans ce texte (le segment suivant commence à cette position)
+    # - pages : numéro de page de chaque segment
+    # - identifiants : id du bloc SVG de chaque segment (chaînes internées, partagées par toutes les langues)
+    # Les aligneurs et l'écriture des fichiers alignés désignent les segments par leur indice
+    __slots__ = ("code", "texte", "fins", "pages", "identifiants")
+
+    def __init__(self, code, segments=()):
+        # segments : [(numéro de page, id du bloc SVG, texte sur une seule ligne), ...] dans l'ordre des pages
+        self.code = sys.intern(code)
+        self.fins = array("L")
+        self.pages = array("H")
+        self.identifiants = []
+        textes = []
+        fin = 0
+        for numero_page, identifiant, texte in segments:
+            fin += len(texte)
+            textes.append(texte)
+            self.fins.append(fin)
+            self.pages.append(int(numero_page))
+            self.identifiants.append(
+                sys.intern(identifiant) if identifiant is not None else None
+            )
+        self.texte = "".join(textes)
+
+    def __len__(self):
+        return len(self.fins)
+
+    def debut_segment(self, indice):
+        return self.fins[indice - 1] if indice else 0
+
+    def texte_segment(self, indice):
+        return self.texte[self.debut_segment(indice) : self.fins[indice]]
+
+    def longueur_segment(self, indice):
+        # longueur du texte d'un segment, sans en extraire le texte
+        return self.fins[indice] - self.debut_segment(indice)
+
+    def vers_etat(self):
+        # Forme enregistrée dans l'état d'un épisode (construction incrémentale)
+        return {
+            "texte": self.texte,
+            "fins": self.fins.tolist(),
+            "pages": self.pages.tolist(),
+            "identifiants": self.identifiants,
+        }
+
+    @classmethod
+    def depuis_etat(cls, code, etat):
+        segments = cls(code)
+        segments.texte = etat["texte"]
+        segments.fins = array("L", etat["fins"])
+        segments.pages = array("H", etat["pages"])
+        segments.identifiants = [
+            sys.intern(identifiant) if identifiant is not None else None
+            for identifiant in etat["identifiants"]
+        ]
+        return segments
+
+
+def fusionner_segments_par_langue(pages, textes_svg):
+    # Regrouper en mémoire les segments extraits de chaque page [(code_langue, membre_svg), ...] :
+    # {code de langue: SegmentsLangue}, dans l'ordre des pages (seules les langues ayant du texte sont conservées)
+    # Chaque segment garde ses repères pour l'alignement structurel : numéro de page et id du bloc SVG
+    textes_par_langue = {}
+    for (langue_code, membre_svg), texte_svg in zip(pages, textes_svg):
+        if texte_svg:
+            numero_page = membre_svg.split("P")[-1].split(".")[0]
+            textes_par_langue.setdefault(langue_code, []).append(
+                (int(numero_page), texte_svg)
+            )
 
-    return nom_fichier_fusionne
+    segments_par_langue = {}
+    for langue_code, textes_pages in textes_par_langue.items():
+        textes_pages.sort(key=lambda texte_page: texte_page[0])
+        segments_par_langue[langue_code] = SegmentsLangue(
+            langue_code,
+            (
+                (numero_page, identifiant, texte)
+                for numero_page, texte_svg in textes_pages
+                for identifiant, texte in texte_svg
+            ),
+        )
+    return segments_par_langue
 
 
-################## ALIGNEMENT GASCON / AUTRES LANGUES ##################
+def ecrire_csv_intermediaires(repertoire, numero_episode, segments_par_langue):
+    # Copie sur le disque des segments de chaque langue (un CSV par langue, lignes "texte§code"), pour le débogage uniquement
+    os.makedirs(repertoire, exist_ok=True)
+    for langue_code, segments in segments_par_langue.items():
+        nom_fichier = os.path.join(
+            repertoire, f"{langue_code}_E{numero_episode.zfill(2)}.csv"
+        )
+        with open(nom_fichier, "w", newline="", encoding="utf-8") as fichier_csv:
+            writer = csv.writer(fichier_csv)
+            for indice in range(len(segments)):
+                writer.writerow([f"{segments.texte_segment(indice)}§{langue_code}\n"])
 
 
-# Produire un corpus aligné avec le gascon
-def aligner_corpus_avec_gascon(csv_gascon, csv_langue_tierce, gascon_code="ga"):
-    numero_episode = csv_gascon.split("_")[1][1:].zfill(2)
-    fichier_aligne_ga = (
-        f"{gascon_code}-{csv_langue_tierce.split('_')[0]}_E{numero_episode}.csv"
-    )
+def mettre_sur_une_ligne(segment):
+    # supprimer les retours à la ligne (y compris '\r', que la relecture des anciens CSV temporaires convertissait en '\n')
+    return segment.replace("\r\n", "\n").replace("\r", "\n").replace("\n", " ").strip()
 
-    with open(csv_gascon, "r", encoding="utf-8") as fichier_ga, open(
-        csv_langue_tierce, "r", encoding="utf-8"
-    ) as fichier_autre, open(
-        fichier_aligne_ga, "w", newline="", encoding="utf-8"
-    ) as fichier_aligne_2:
 
-        ga_reader = csv.reader(fichier_ga)
-        other_reader = csv.reader(fichier_autre)
-        writer = csv.writer(
-            fichier_aligne_2, delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE
-        )
+################# GESTION DES CODES DE LANGUE ###########################
 
-        for ligne_oc, ligne_autre in zip_longest(
-            ga_reader, other_reader, fillvalue=[""]
-        ):
-            if ligne_oc and ligne_oc[0].strip():
-                # supprimer les retours à la ligne
-                texte_oc = ligne_oc[0].replace("\n", " ").strip()
-                # Eviter les doublons de '§oc'
-                if f"§{gascon_code}" not in texte_oc:
-                    ligne_oc_avec_lang = f"{texte_oc}§{gascon_code}"
-                else:
-                    ligne_oc_avec_lang = texte_oc
-            else:
-                ligne_oc_avec_lang = ""
 
-            if ligne_autre and ligne_autre[0].strip():
-                texte_autre_langue = ligne_autre[0].replace("\n", " ").strip()
-                langue_code = csv_langue_tierce.split("_")[0]
-                if f"§{langue_code}" not in texte_autre_langue:
-                    autre_ligne_autre_texte = f"{texte_autre_langue}§{langue_code}"
-                else:
-                    autre_ligne_autre_texte = texte_autre_langue
-            else:
-                autre_ligne_autre_texte = ""
+# Codes de langue du Congrès selon la table de concordance fournie plus haut, résolus une seule fois par épisode
+def resoudre_codes_langue(codes_langue, correspondances):
+    return {code: correspondances.get(code, code) for code in codes_langue}
 
-            if ligne_oc_avec_lang or autre_ligne_autre_texte:
-                writer.writerow([ligne_oc_avec_lang, autre_ligne_autre_texte])
 
-    return fichier_aligne_ga
+def nommer_fichier_csv(langue_pivot, langue_tierce, numero_episode):
+    # Nom du fichier aligné à partir des codes de langue du Congrès
+    return f"{langue_pivot}_{langue_tierce}_E{numero_episode.zfill(2)}.csv"
 
 
-################## ALIGNEMENT LANGUEDOCIEN / AUTRES LANGUES ##############
+# Échappement appliqué autrefois par la première écriture des lignes "texte§code" (escapechar ' ')
+ECHAPPEMENT_TEXTE = str.maketrans({" ": "  ", '"': ' "', "§": " §"})
 
 
-# Produire un corpus aligné avec le languedocien
-def aligner_corpus_avec_languedocien(csv_occitan, csv_langue_tierce, occitan_code="oc"):
-    # Aligner le CSV occitan avec un autre fichier CSV de langue
-    numero_episode = csv_occitan.split("_")[1][1:].zfill(2)
-    fichier_aligne = (
-        f"{occitan_code}-{csv_langue_tierce.split('_')[0]}_E{numero_episode}.csv"
+def formater_champ(segments, blocs):
+    # Champ de texte d'un côté d'une ligne alignée (blocs : indices des segments) : le format historique est
+    # conservé à l'identique, chaque texte gardant l'échappement de l'ancienne première écriture suivi d'une espace
+    return " ".join(
+        segments.texte_segment(indice).translate(ECHAPPEMENT_TEXTE) + " "
+        for indice in blocs
     )
 
-    with open(csv_occitan, "r", encoding="utf-8") as fichier_oc, open(
-        csv_langue_tierce, "r", encoding="utf-8"
-    ) as fichier_autre, open(
-        fichier_aligne, "w", newline="", encoding="utf-8"
-    ) as fichier_aligne_2:
 
-        oc_reader = csv.reader(fichier_oc)
-        other_reader = csv.reader(fichier_autre)
-        writer = csv.writer(
-            fichier_aligne_2, delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE
-        )  # le quote_none est nécessaire ici pour éviter les guillemets autour des chaînes de caractères
+def texte_blocs(segments, blocs):
+    # Texte brut d'un côté d'une ligne alignée (sans échappement)
+    return " ".join(segments.texte_segment(indice) for indice in blocs)
 
-        for ligne_oc, ligne_autre in zip_longest(
-            oc_reader, other_reader, fillvalue=[""]
-        ):
-            if ligne_oc and ligne_oc[0].strip():
-                # supprimer les retours à la ligne
-                texte_oc = ligne_oc[0].replace("\n", " ").strip()
-                # Eviter les doublons de '§oc'
-                if f"§{occitan_code}" not in texte_oc:
-                    ligne_oc_avec_lang = f"{texte_oc}§{occitan_code}"
-                else:
-                    ligne_oc_avec_lang = texte_oc
-            else:
-                ligne_oc_avec_lang = ""
 
-            if ligne_autre and ligne_autre[0].strip():
-                texte_autre_langue = ligne_autre[0].replace("\n", " ").strip()
-                langue_code = csv_langue_tierce.split("_")[0]
-                if f"§{langue_code}" not in texte_autre_langue:
-                    autre_ligne_autre_texte = f"{texte_autre_langue}§{langue_code}"
-                else:
-                    autre_ligne_autre_texte = texte_autre_langue
-            else:
-                autre_ligne_autre_texte = ""
+def page_appariement(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers):
+    # Numéro de page d'une ligne alignée : celui de son premier bloc pivot, à défaut de son premier bloc tiers
+    if blocs_pivot:
+        return segments_pivot.pages[blocs_pivot[0]]
+    return segments_tiers.pages[blocs_tiers[0]]
+
+
+def formater_ligne_alignee(champ_pivot, langue_pivot, champ_tiers, langue_tierce):
+    # Ligne finale d'un fichier aligné, avec les codes du Congrès : [texte, code, texte, code]
+    # (un côté vide ne donne qu'un seul champ vide, comme dans le format historique)
+    ligne = [champ_pivot, langue_pivot] if champ_pivot else [""]
+    ligne += [champ_tiers, langue_tierce] if champ_tiers else [""]
+    return ligne
 
-            if ligne_oc_avec_lang or autre_ligne_autre_texte:
-                writer.writerow([ligne_oc_avec_lang, autre_ligne_autre_texte])
 
-    return fichier_aligne
+def lire_champ(champ):
+    # Texte d'origine d'un champ lu dans un fichier aligné (opération inverse de formater_champ()) :
+    # espace finale retirée et échappement de l'ancienne première écriture annulé
+    return re.sub(" (.)", r"\1", champ[:-1])
 
 
-################# ALIGNEMENT LANGUEDOCIEN / GASCON ########################
-def creer_repertoire_alignement_bivariete(numero_episode, fichiers_csv_alignes):
-    # création répertoire temporaire pour les alignements languedocien-gascon
-    rep_alignement_lg_ga = f"E{numero_episode.zfill(2)}_bivarietat_lg_ga"
-    os.makedirs(rep_alignement_lg_ga, exist_ok=True)
+def lire_ligne_alignee(ligne):
+    # (texte pivot, texte tiers) d'une ligne d'un fichier aligné, chaîne vide pour un côté sans segment
+    champs = next(
+        csv.reader([ligne], delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE)
+    )
+    if len(champs) == 4:
+        return lire_champ(champs[0]), lire_champ(champs[2])
+    if len(champs) == 3:
+        if champs[0]:
+            return lire_champ(champs[0]), ""
+        return "", lire_champ(champs[1])
+    return "", ""
+
+
+def lignes_alignees(langue_pivot, langue_tierce, segments_pivot, segments_tiers, appariements):
+    # Lignes d'un fichier aligné, produites au fil de l'écriture à partir des blocs appariés
+    for blocs_pivot, blocs_tiers in appariements:
+        yield formater_ligne_alignee(
+            formater_champ(segments_pivot, blocs_pivot),
+            langue_pivot,
+            formater_champ(segments_tiers, blocs_tiers),
+            langue_tierce,
+        )
 
-    fichiers_a_deplacer = []
 
-    # parcourir les fichiers alignés pour sélectionner les bons fichiers à déplacer et supprimer
-    for fichier in fichiers_csv_alignes:
-        if "oc-lengadoc-grclass_oc-gascon-grclass" in fichier:
-            # déplacer les fichiers de ce type vers notre répertoire
-            nouveau_chemin = os.path.join(
-                rep_alignement_lg_ga, os.path.basename(fichier)
+def ecrire_fichier_aligne(zipf, nom_fichier, alignement):
+    # Les lignes sont écrites au fil de l'eau dans le membre de l'archive (compressé à la volée),
+    # sans fichier sur le disque ni contenu complet en mémoire
+    # alignement : (code pivot, code tiers, segments pivots, segments tiers, blocs appariés),
+    # tel que produit par aligner_sur_pivots()
+    with io.TextIOWrapper(
+        zipf.open(nom_fichier, "w"), encoding="utf-8", newline=""
+    ) as fichier_csv:
+        writer = csv.writer(
+            fichier_csv, delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE
+        )
+        writer.writerows(lignes_alignees(*alignement))
+    compter("fichiers_alignes_ecrits")
+
+
+def positions_lignes(alignement):
+    # Position de chaque ligne dans le fichier aligné tel qu'écrit par ecrire_fichier_aligne(), sans l'écrire :
+    # [(numéro de page, début et longueur de la ligne en octets, texte pivot brut), ...]
+    _, _, segments_pivot, segments_tiers, appariements = alignement
+    tampon = io.StringIO()
+    writer = csv.writer(tampon, delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE)
+    positions = []
+    debut = 0
+    for (blocs_pivot, blocs_tiers), ligne in zip(
+        appariements, lignes_alignees(*alignement)
+    ):
+        writer.writerow(ligne)
+        longueur = len(tampon.getvalue().encode("utf-8"))
+        tampon.seek(0)
+        tampon.truncate()
+        positions.append(
+            (
+                page_appariement(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers),
+                debut,
+                longueur,
+                texte_blocs(segments_pivot, blocs_pivot),
             )
-            shutil.move(fichier, nouveau_chemin)
-            fichiers_a_deplacer.append(nouveau_chemin)
+        )
+        debut += longueur
+    return positions
+
+
+################## ALIGNEMENT STRUCTUREL ##################
+# Les segments sont d'abord regroupés par page : un bloc ajouté ou fusionné par un traducteur ne décale plus
+# que la page concernée. Dans une page, les blocs portant le même id SVG (les traductions étant faites
+# à partir d'une copie du SVG d'origine) servent d'ancres ; entre deux ancres, les blocs restants sont appariés
+# par position s'ils sont aussi nombreux des deux côtés, sinon d'après leur longueur, par programmation
+# dynamique (méthode de Gale et Church)
+
+# Probabilités a priori de chaque type d'appariement (blocs pivots, blocs tiers), d'après Gale et Church
+PROBABILITES_APPARIEMENTS = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099,
+    (0, 1): 0.0099,
+    (2, 1): 0.089,
+    (1, 2): 0.089,
+    (2, 2): 0.011,
+}
+COUTS_APPARIEMENTS = {
+    appariement: -math.log(probabilite)
+    for appariement, probabilite in PROBABILITES_APPARIEMENTS.items()
+}
+VARIANCE_LONGUEURS = 6.8  # variance du rapport des longueurs (Gale et Church)
 
-    if not fichiers_a_deplacer:
-        # print("Aucun fichier correspondant n'a été trouvé. Arrêt de la fonction.")
-        os.rmdir(rep_alignement_lg_ga)  # supprimer le répertoire temporaire vide
-        return  # return vide pour sortir de la fonction
 
-    # création d'un fichier zip pour les alignements languedocien-gascon
-    fichier_zip_alignement_lg_ga = f"E{numero_episode.zfill(2)}_bivarietat_lg_ga.zip"
-    with zipfile.ZipFile(fichier_zip_alignement_lg_ga, "w") as zipf:
-        for fichier_csv in fichiers_a_deplacer:
-            zipf.write(fichier_csv, arcname=os.path.basename(fichier_csv))
-            os.remove(
-                fichier_csv
-            )  # supprimer les fichiers "temporaires" pour éviter l'encombrement
-            os.rmdir(rep_alignement_lg_ga)  # supprimer le répertoire temporaire vide
+def cout_appariement(longueur_pivot, longueur_tiers, ratio, cout_a_priori):
+    # Coût (-log de la probabilité) d'apparier des blocs de ces longueurs totales, en caractères
+    # ratio : rapport moyen des longueurs tierce / pivot sur l'épisode
+    moyenne = (longueur_pivot + longueur_tiers / ratio) / 2
+    if not moyenne:
+        return cout_a_priori
+    ecart = abs(longueur_pivot * ratio - longueur_tiers) / math.sqrt(
+        VARIANCE_LONGUEURS * moyenne
+    )
+    probabilite = math.erfc(ecart / math.sqrt(2))  # test bilatéral de la loi normale
+    return cout_a_priori - math.log(max(probabilite, 1e-300))
+
+
+def aligner_longueurs(longueurs_pivot, longueurs_tiers, ratio):
+    # Programmation dynamique de Gale et Church : suite d'appariements (nb blocs pivots, nb blocs tiers)
+    # de coût total minimal couvrant les deux listes
+    nb_pivot, nb_tiers = len(longueurs_pivot), len(longueurs_tiers)
+    # sommes cumulées : longueur totale de n'importe quelle suite de blocs en une soustraction
+    cumul_pivot, cumul_tiers = [0], [0]
+    for longueur in longueurs_pivot:
+        cumul_pivot.append(cumul_pivot[-1] + longueur)
+    for longueur in longueurs_tiers:
+        cumul_tiers.append(cumul_tiers[-1] + longueur)
+
+    couts = [[math.inf] * (nb_tiers + 1) for _ in range(nb_pivot + 1)]
+    precedents = [[None] * (nb_tiers + 1) for _ in range(nb_pivot + 1)]
+    couts[0][0] = 0
+    for i in range(nb_pivot + 1):
+        for j in range(nb_tiers + 1):
+            for (di, dj), cout_a_priori in COUTS_APPARIEMENTS.items():
+                if di > i or dj > j:
+                    continue
+                cout = couts[i - di][j - dj] + cout_appariement(
+                    cumul_pivot[i] - cumul_pivot[i - di],
+                    cumul_tiers[j] - cumul_tiers[j - dj],
+                    ratio,
+                    cout_a_priori,
+                )
+                if cout < couts[i][j]:
+                    couts[i][j] = cout
+                    precedents[i][j] = (di, dj)
+
+    appariements = []
+    i, j = nb_pivot, nb_tiers
+    while i or j:
+        di, dj = precedents[i][j]
+        appariements.append((di, dj))
+        i, j = i - di, j - dj
+    appariements.reverse()
+    return appariements
+
+
+def ancres_identifiants(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers):
+    # Paires de positions (pivot, tiers) des blocs de la page portant le même id SVG, unique de chaque côté ;
+    # seule la plus longue suite d'ancres dans le même ordre des deux côtés est conservée
+    def positions_uniques(segments, blocs):
+        positions = {}
+        for position, indice in enumerate(blocs):
+            identifiant = segments.identifiants[indice]
+            if identifiant is not None:
+                positions[identifiant] = None if identifiant in positions else position
+        return positions
+
+    positions_tiers = positions_uniques(segments_tiers, blocs_tiers)
+    candidats = sorted(
+        (i, positions_tiers[identifiant])
+        for identifiant, i in positions_uniques(segments_pivot, blocs_pivot).items()
+        if i is not None and positions_tiers.get(identifiant) is not None
+    )
 
-    return fichier_zip_alignement_lg_ga
+    # plus longue sous-suite croissante des positions tierces (quelques dizaines de blocs par page au plus)
+    suites = []
+    for i, j in candidats:
+        precedente = max(
+            (suite for suite in suites if suite[-1][1] < j), key=len, default=[]
+        )
+        suites.append(precedente + [(i, j)])
+    return max(suites, key=len, default=[])
 
 
-################# GESTION DES CODES DE LANGUE ###########################
+def aligner_intervalle(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers, ratio):
+    # Blocs appariés [(blocs pivots, blocs tiers), ...] entre deux ancres
+    if not blocs_pivot or not blocs_tiers:
+        return [([indice], []) for indice in blocs_pivot] + [
+            ([], [indice]) for indice in blocs_tiers
+        ]
+    # autant de blocs de chaque côté : appariement par position, sans programmation dynamique
+    if len(blocs_pivot) == len(blocs_tiers):
+        return [([pivot], [tiers]) for pivot, tiers in zip(blocs_pivot, blocs_tiers)]
+    # sinon, d'après la longueur des blocs
+    appariements = aligner_longueurs(
+        [segments_pivot.longueur_segment(indice) for indice in blocs_pivot],
+        [segments_tiers.longueur_segment(indice) for indice in blocs_tiers],
+        ratio,
+    )
+    blocs = []
+    i = j = 0
+    for di, dj in appariements:
+        blocs.append((blocs_pivot[i : i + di], blocs_tiers[j : j + dj]))
+        i, j = i + di, j + dj
+    return blocs
+
+
+def aligner_page(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers, ratio):
+    # Blocs appariés d'une page : ancres sur les id SVG, alignement par longueur entre les ancres
+    blocs = []
+    debut_pivot = debut_tiers = 0
+    for i, j in ancres_identifiants(
+        segments_pivot, segments_tiers, blocs_pivot, blocs_tiers
+    ) + [(len(blocs_pivot), len(blocs_tiers))]:
+        blocs.extend(
+            aligner_intervalle(
+                segments_pivot,
+                segments_tiers,
+                blocs_pivot[debut_pivot:i],
+                blocs_tiers[debut_tiers:j],
+                ratio,
+            )
+        )
+        if i < len(blocs_pivot):
+            blocs.append(([blocs_pivot[i]], [blocs_tiers[j]]))
+        debut_pivot, debut_tiers = i + 1, j + 1
+    return blocs
+
+
+def aligner_structure(segments_pivot, segments_tiers):
+    # Blocs appariés [(indices des blocs pivots, indices des blocs tiers), ...] page par page ; des blocs appariés
+    # ensemble (bulle coupée ou fusionnée par un traducteur) sont ensuite réunis dans une même ligne
+    longueur_pivot = len(segments_pivot.texte)
+    longueur_tiers = len(segments_tiers.texte)
+    ratio = longueur_tiers / longueur_pivot if longueur_pivot and longueur_tiers else 1
+
+    pages_pivot, pages_tiers = {}, {}
+    for segments, pages in ((segments_pivot, pages_pivot), (segments_tiers, pages_tiers)):
+        for indice, numero_page in enumerate(segments.pages):
+            pages.setdefault(numero_page, []).append(indice)
+
+    appariements = []
+    for numero_page in sorted(pages_pivot.keys() | pages_tiers.keys()):
+        appariements.extend(
+            aligner_page(
+                segments_pivot,
+                segments_tiers,
+                pages_pivot.get(numero_page, []),
+                pages_tiers.get(numero_page, []),
+                ratio,
+            )
+        )
+    return appariements
+
+
+################## ALIGNEMENT SUR LES LANGUES PIVOTS ##################
+
+# Méthodes d'alignement : par page et par bloc SVG (défaut) ou ligne à ligne (méthode d'origine)
+METHODES_ALIGNEMENT = ("structure", "position")
+# Langues pivots par défaut : le languedocien (toujours le premier pivot), puis le gascon
+PIVOTS = ("oc", "ga")
+# La paire languedocien/gascon forme le corpus bivariété, placé dans son propre fichier zip
+PAIRE_BIVARIETE = ("oc", "ga")
+# Désignation des langues pivots dans les messages (à défaut : leur code du Congrès)
+NOMS_PIVOTS = {"oc": "le languedocien", "ga": "le gascon"}
+
+
+# Produire un corpus aligné entre une langue pivot et une langue tierce (SegmentsLangue) :
+# blocs appariés [(indices des blocs pivots, indices des blocs tiers), ...]
+def aligner_corpus(segments_pivot, segments_tiers, methode="structure"):
+    if methode == "position":
+        # méthode d'origine : les segments sont appariés ligne à ligne sur tout l'épisode
+        return [
+            (
+                [indice_pivot] if indice_pivot is not None else [],
+                [indice_tiers] if indice_tiers is not None else [],
+            )
+            for indice_pivot, indice_tiers in zip_longest(
+                range(len(segments_pivot)), range(len(segments_tiers))
+            )
+        ]
+    return aligner_structure(segments_pivot, segments_tiers)
+
+
+def aligner_sur_pivots(
+    segments_par_langue,
+    pivots,
+    codes_congres,
+    numero_episode,
+    methode="structure",
+    langues_modifiees=None,
+):
+    # Alignement de chaque langue pivot présente avec toutes les autres langues, en un seul passage
+    # La paire formée par deux pivots n'est produite qu'une fois, avec le premier des deux dans la liste ;
+    # la paire languedocien/gascon est rangée à part pour le corpus bivariété
+    # langues_modifiees : si indiqué, seules les paires comprenant l'une de ces langues sont alignées,
+    # les autres fichiers étant marqués inchangés (None) depuis la construction précédente
+    # Retourne ({pivot: {nom du fichier: alignement}}, {nom du fichier: alignement} du corpus bivariété),
+    # chaque alignement étant (code pivot, code tiers, segments pivots, segments tiers, blocs appariés)
+    # avec les codes du Congrès, les blocs étant désignés par leur indice dans les segments (SegmentsLangue)
+    pivots_presents = [pivot for pivot in pivots if pivot in segments_par_langue]
+
+    fichiers_par_pivot = {}
+    fichiers_bivariete = {}
+    for rang, pivot in enumerate(pivots_presents):
+        fichiers_par_pivot[pivot] = {}
+        for langue_code in segments_par_langue:
+            if langue_code == pivot or langue_code in pivots_presents[:rang]:
+                continue
+            nom_fichier = nommer_fichier_csv(
+                codes_congres[pivot], codes_congres[langue_code], numero_episode
+            )
+            if (
+                langues_modifiees is not None
+                and pivot not in langues_modifiees
+                and langue_code not in langues_modifiees
+            ):
+                alignement = None
+            else:
+                alignement = (
+                    codes_congres[pivot],
+                    codes_congres[langue_code],
+                    segments_par_langue[pivot],
+                    segments_par_langue[langue_code],
+                    aligner_corpus(
+                        segments_par_langue[pivot],
+                        segments_par_langue[langue_code],
+                        methode,
+                    ),
+                )
+            if (pivot, langue_code) == PAIRE_BIVARIETE:
+                fichiers_bivariete[nom_fichier] = alignement
+            else:
+                fichiers_par_pivot[pivot][nom_fichier] = alignement
 
+    return fichiers_par_pivot, fichiers_bivariete
 
-# Modifier les fichiers csv et leurs noms pour correspondre aux codes de langues du Congrès selon la table de concordance fournie plus haut
-def modifier_contenu_csv(fichier_csv, correspondances):
-    lignes_modifiees = []
 
-    with open(fichier_csv, "r", encoding="utf-8") as fichier:
-        reader = csv.reader(fichier, delimiter="§")
-        for ligne in reader:
-            if len(ligne) > 1:
-                if ligne[1] in correspondances:
-                    ligne[1] = correspondances[ligne[1]]
-                if len(ligne) > 3 and ligne[3] in correspondances:
-                    ligne[3] = correspondances[ligne[3]]
-            lignes_modifiees.append(ligne)
+################ GENERATION DES ZIPS ##########################
+# Les fichiers produits sont d'abord écrits dans un répertoire de travail propre à l'épisode, créé dans
+# le répertoire de sortie (même système de fichiers), puis déplacés à leur emplacement final par un renommage
+# atomique : plusieurs exécutions simultanées peuvent partager le même répertoire de sortie sans qu'aucune
+# ne lise ou n'écrase un fichier à moitié écrit par une autre
 
-    with open(fichier_csv, "w", newline="", encoding="utf-8") as fichier:
-        writer = csv.writer(
-            fichier, delimiter="§", escapechar=" ", quoting=csv.QUOTE_NONE
-        )
-        writer.writerows(lignes_modifiees)
-    return fichier_csv
 
+@contextmanager
+def espace_de_travail(repertoire_sortie, prefixe):
+    # Répertoire temporaire '<sortie>/<prefixe>XXXXXXXX', supprimé avec son contenu à la sortie du bloc
+    os.makedirs(repertoire_sortie, exist_ok=True)
+    repertoire_travail = tempfile.mkdtemp(prefix=prefixe, dir=repertoire_sortie)
+    try:
+        yield repertoire_travail
+    finally:
+        shutil.rmtree(repertoire_travail, ignore_errors=True)
+
+
+@contextmanager
+def espace_telechargement(repertoire_sortie, repertoire_cache=None, reprise=False):
+    # Répertoire où télécharger les lang-packs hors cache, propre à l'exécution (None : répertoire courant)
+    # Avec la reprise, les téléchargements interrompus (.part) doivent être retrouvés d'une exécution à l'autre :
+    # ils restent dans le répertoire courant
+    if repertoire_cache or reprise:
+        yield None
+        return
+    with espace_de_travail(repertoire_sortie, ".telechargements-") as repertoire_telechargement:
+        yield repertoire_telechargement
 
-def renommer_fichiers_csv(fichier_csv, correspondances, numero_episode):
-    # Extraire la valeur de la deuxième et de la quatrième colonne du premier élément pour créer le nouveau nom
-    with open(fichier_csv, "r", encoding="utf-8") as fichier:
-        reader = csv.reader(fichier, delimiter="§")
-        premiere_ligne = next(reader)
 
-        if len(premiere_ligne) > 1:
-            langue_2_col = premiere_ligne[1]
-            langue_4_col = premiere_ligne[3] if len(premiere_ligne) > 3 else None
+def chemin_sortie(repertoire_sortie, nom_fichier):
+    # Chemin d'un fichier produit ('E05_alignements.arrow' et non './E05_alignements.arrow' dans le répertoire
+    # courant : les chemins enregistrés dans l'état incrémental restent ceux des versions précédentes)
+    return os.path.normpath(os.path.join(repertoire_sortie, nom_fichier))
 
-            if langue_2_col in correspondances:
-                langue_2_col = correspondances[langue_2_col]
-            if langue_4_col in correspondances:
-                langue_4_col = correspondances[langue_4_col]
 
-    nouveau_nom = f"{langue_2_col}_{langue_4_col}_E{numero_episode.zfill(2)}.csv"
-    nouveau_chemin = os.path.join(os.path.dirname(fichier_csv), nouveau_nom)
-    os.rename(fichier_csv, nouveau_chemin)
+def chemin_de_travail(fichier, repertoire_travail):
+    # Emplacement où écrire un fichier avant de le renommer : dans le répertoire de travail s'il est indiqué,
+    # sinon à côté du fichier final
+    if repertoire_travail:
+        return os.path.join(repertoire_travail, os.path.basename(fichier))
+    return f"{fichier}.tmp"
 
-    return nouveau_chemin
 
+# Méthodes de compression des zips produits ; le niveau de compression s'applique à deflate (0 à 9),
+# zipfile ne permettant pas de régler celui de lzma
+COMPRESSIONS = {
+    "stockage": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "lzma": zipfile.ZIP_LZMA,
+}
 
-################ GENERATION DES ZIPS ##########################
-# il serait possible d'optimiser les deux fonctions suivantes en les fusionnant et en allant chercher la valeur de la variable de langue
-
-
-# Générer un fichier zip pour le languedocien
-def creer_zip_fichiers_alignes_lg(numero_episode, fichiers_csv_alignes):
-    fichier_zip_lg = f"E{numero_episode.zfill(2)}_oc-lengadoc-grclass_alignements.zip"
-    with zipfile.ZipFile(fichier_zip_lg, "w") as zipf:
-        for fichier_csv in fichiers_csv_alignes:
-            nom_fichier_correct = fichier_csv.replace(
-                ".csv.csv", ".csv"
-            )  # éviter la double extension '.csv.csv'
-            zipf.write(fichier_csv, arcname=nom_fichier_correct)
-            os.remove(
-                fichier_csv
-            )  # Supprimer le fichier CSV d'origine une fois placé dans le fichier compressé
-    return fichier_zip_lg
-
-
-# Générer un fichier zip pour le gascon
-def creer_zip_fichiers_alignes_ga(numero_episode, fichiers_csv_alignes_ga):
-    fichier_zip_ga = f"E{numero_episode.zfill(2)}_oc-gascon-grclass_alignements.zip"
-    with zipfile.ZipFile(fichier_zip_ga, "w") as zipf:
-        for fichier_csv in fichiers_csv_alignes_ga:
-            nom_fichier_correct = fichier_csv.replace(
-                ".csv.csv", ".csv"
-            )  # éviter la double extension '.csv.csv'
-            zipf.write(fichier_csv, arcname=nom_fichier_correct)
-            os.remove(
-                fichier_csv
-            )  # Supprimer le fichier CSV d'origine une fois placé dans le fichier compressé
-    return fichier_zip_ga
 
+def creer_zip_fichiers_alignes(
+    fichier_zip,
+    fichiers_csv_alignes,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    repertoire_travail=None,
+):
+    # Générer un fichier zip à partir des fichiers alignés {nom: alignement}
+    # (écrit dans le répertoire de travail s'il est indiqué, puis renommé)
+    fichier_ecrit = (
+        chemin_de_travail(fichier_zip, repertoire_travail) if repertoire_travail else fichier_zip
+    )
+    with zipfile.ZipFile(
+        fichier_ecrit, "w", compression=compression, compresslevel=niveau_compression
+    ) as zipf:
+        for nom_fichier, alignement in fichiers_csv_alignes.items():
+            # les fichiers alignés ne sont écrits que dans le fichier compressé
+            ecrire_fichier_aligne(zipf, nom_fichier, alignement)
+    if fichier_ecrit != fichier_zip:
+        os.replace(fichier_ecrit, fichier_zip)
+    compter("zips_ecrits")
+    compter("octets_zips_ecrits", os.path.getsize(fichier_zip))
+    return fichier_zip
+
+
+def mettre_a_jour_zip(
+    fichier_zip,
+    fichiers_csv_alignes,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    repertoire_travail=None,
+):
+    # Mise à jour d'un fichier zip d'une construction précédente {nom: alignement, ou None si le fichier est inchangé} :
+    # seuls les fichiers alignés à nouveau sont réécrits, les autres sont recopiés tels quels depuis l'ancienne archive
+    # et ceux qui ne sont plus produits sont retirés ; l'archive n'est pas modifiée si rien n'a changé
+    if not os.path.exists(fichier_zip):
+        return creer_zip_fichiers_alignes(
+            fichier_zip,
+            fichiers_csv_alignes,
+            compression,
+            niveau_compression,
+            repertoire_travail,
+        )
 
-################### FONCTION MAIN() ###########################
+    with zipfile.ZipFile(fichier_zip, "r") as ancien_zip:
+        if ancien_zip.namelist() == list(fichiers_csv_alignes) and all(
+            alignement is None for alignement in fichiers_csv_alignes.values()
+        ):
+            return fichier_zip
+
+        fichier_ecrit = chemin_de_travail(fichier_zip, repertoire_travail)
+        with zipfile.ZipFile(
+            fichier_ecrit,
+            "w",
+            compression=compression,
+            compresslevel=niveau_compression,
+        ) as zipf:
+            for nom_fichier, alignement in fichiers_csv_alignes.items():
+                if alignement is None:
+                    zipf.writestr(
+                        ancien_zip.getinfo(nom_fichier), ancien_zip.read(nom_fichier)
+                    )
+                else:
+                    ecrire_fichier_aligne(zipf, nom_fichier, alignement)
+    os.replace(fichier_ecrit, fichier_zip)
+    compter("zips_ecrits")
+    compter("octets_zips_ecrits", os.path.getsize(fichier_zip))
+    return fichier_zip
+
+
+################# EXPORT EN COLONNES ##########################
+# Export de tous les alignements d'un épisode dans un seul fichier, une ligne par paire de segments :
+# épisode, page, code pivot, code tiers, texte pivot, texte tiers (textes bruts, sans échappement ; None si
+# un côté est vide). Les colonnes de codes de langue sont encodées par dictionnaire.
+# Le format Arrow (IPC) se relit sans copie par projection en mémoire :
+#     pyarrow.ipc.open_file(pyarrow.memory_map("E05_alignements.arrow")).read_all()
+# Le format Parquet est plus compact mais doit être décodé à la lecture.
+# Nécessite le module pyarrow (dépendance optionnelle, importée seulement lors d'un export)
+
+FORMATS_EXPORT = ("arrow", "parquet")  # également l'extension du fichier exporté
+
+
+def exporter_colonnes(
+    fichier_export, numero_episode, alignements, format_export="arrow", repertoire_travail=None
+):
+    # alignements : (code pivot, code tiers, segments pivots, segments tiers, blocs appariés)
+    # de tous les fichiers alignés de l'épisode
+    import pyarrow as pa
+
+    pages, langues_pivots, langues_tierces, textes_pivots, textes_tiers = [], [], [], [], []
+    for langue_pivot, langue_tierce, segments_pivot, segments_tiers, appariements in alignements:
+        for blocs_pivot, blocs_tiers in appariements:
+            pages.append(
+                page_appariement(segments_pivot, segments_tiers, blocs_pivot, blocs_tiers)
+            )
+            langues_pivots.append(langue_pivot)
+            langues_tierces.append(langue_tierce)
+            textes_pivots.append(texte_blocs(segments_pivot, blocs_pivot) or None)
+            textes_tiers.append(texte_blocs(segments_tiers, blocs_tiers) or None)
+
+    table = pa.table(
+        {
+            "episode": pa.array([int(numero_episode)] * len(pages), pa.int16()),
+            "page": pa.array(pages, pa.int16()),
+            "langue_pivot": pa.array(langues_pivots, pa.string()).dictionary_encode(),
+            "langue_tierce": pa.array(langues_tierces, pa.string()).dictionary_encode(),
+            "texte_pivot": pa.array(textes_pivots, pa.string()),
+            "texte_tiers": pa.array(textes_tiers, pa.string()),
+        }
+    )
 
+    # écriture dans un fichier temporaire puis renommage : le fichier n'est jamais lu à moitié écrit
+    fichier_ecrit = chemin_de_travail(fichier_export, repertoire_travail)
+    if format_export == "parquet":
+        import pyarrow.parquet as pq
 
-def main():
+        pq.write_table(table, fichier_ecrit)
+    else:
+        with pa.OSFile(fichier_ecrit, "wb") as sortie, pa.ipc.new_file(
+            sortie, table.schema
+        ) as writer:
+            writer.write_table(table)
+    os.replace(fichier_ecrit, fichier_export)
+    return fichier_export
+
+
+def marquer_inchanges(fichiers_csv_alignes, langues_modifiees):
+    # Fichiers alignés dont aucune des deux langues (codes du Congrès) n'a changé marqués inchangés (None)
+    return {
+        nom_fichier: alignement
+        if alignement[0] in langues_modifiees or alignement[1] in langues_modifiees
+        else None
+        for nom_fichier, alignement in fichiers_csv_alignes.items()
+    }
+
+
+################# INDEX DU CORPUS ##########################
+# Index SQLite commun à tous les épisodes traités (option --index), mis à jour à chaque épisode :
+# - segments : une ligne par ligne des fichiers alignés, repérée par (code pivot, code tiers, épisode, page)
+#   et par sa position (début et longueur en octets) dans le fichier aligné du zip produit
+# - textes, jetons : textes pivots de chaque épisode (une seule fois par langue pivot, quel que soit
+#   le nombre de langues tierces) et index inversé de leurs mots
+# Les chemins des zips sont relatifs au répertoire de l'index. Interrogation : query_corpus_index.py
+
+SCHEMA_INDEX = """
+CREATE TABLE IF NOT EXISTS textes (
+    id INTEGER PRIMARY KEY,
+    episode INTEGER NOT NULL,
+    langue TEXT NOT NULL,
+    texte TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    langue_pivot TEXT NOT NULL,
+    langue_tierce TEXT NOT NULL,
+    episode INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    fichier_zip TEXT NOT NULL,
+    fichier_csv TEXT NOT NULL,
+    debut INTEGER NOT NULL,
+    longueur INTEGER NOT NULL,
+    texte_pivot INTEGER REFERENCES textes (id)
+);
+CREATE TABLE IF NOT EXISTS jetons (
+    jeton TEXT NOT NULL,
+    texte INTEGER NOT NULL REFERENCES textes (id),
+    PRIMARY KEY (jeton, texte)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS segments_paires ON segments (langue_pivot, langue_tierce, episode, page);
+CREATE INDEX IF NOT EXISTS segments_episodes ON segments (episode);
+CREATE INDEX IF NOT EXISTS segments_textes ON segments (texte_pivot);
+CREATE INDEX IF NOT EXISTS textes_episodes ON textes (episode);
+"""
+
+
+DELAI_VERROU_INDEX = 60  # en secondes : attente de l'index pendant qu'une autre exécution y écrit
+
+
+def ouvrir_index(fichier_index):
+    connexion = sqlite3.connect(fichier_index, timeout=DELAI_VERROU_INDEX)
+    connexion.executescript(SCHEMA_INDEX)
+    return connexion
+
+
+def decouper_jetons(texte):
+    # Mots d'un texte, sans distinction de casse (l'apostrophe sépare deux mots : "l'aiga" -> "l", "aiga")
+    return re.findall(r"\w+", texte.casefold())
+
+
+def episode_indexe(fichier_index, numero_episode):
+    if not os.path.exists(fichier_index):
+        return False
+    with closing(ouvrir_index(fichier_index)) as connexion:
+        return (
+            connexion.execute(
+                "SELECT 1 FROM segments WHERE episode = ? LIMIT 1", (int(numero_episode),)
+            ).fetchone()
+            is not None
+        )
 
-    #################### APPEL AUX FONCTIONS COMMUNES ######################
 
-    # Formulaire destiné à l'utilisateur
-    titre = input(
-        "Entrez le titre de l'épisode en anglais en respectant strictement la casse : "
-    )
-    numero_episode = input("Entrez le numéro de l'épisode : ")
+def indexer_episode(fichier_index, numero_episode, contenus_zips):
+    # Remplacement des entrées de l'épisode dans l'index, en une seule transaction
+    # contenus_zips : [(fichier zip produit, {nom du fichier aligné: alignement}), ...], tous les alignements
+    # de l'épisode étant fournis (y compris ceux des fichiers inchangés en construction incrémentale)
+    episode = int(numero_episode)
+    repertoire_index = os.path.dirname(os.path.abspath(fichier_index))
+    with closing(ouvrir_index(fichier_index)) as connexion, connexion:
+        connexion.execute(
+            "DELETE FROM jetons WHERE texte IN (SELECT id FROM textes WHERE episode = ?)",
+            (episode,),
+        )
+        connexion.execute("DELETE FROM segments WHERE episode = ?", (episode,))
+        connexion.execute("DELETE FROM textes WHERE episode = ?", (episode,))
+
+        ids_textes = {}
+        lignes = []
+        for fichier_zip, fichiers_csv_alignes in contenus_zips:
+            chemin_zip = os.path.relpath(os.path.abspath(fichier_zip), repertoire_index)
+            for nom_fichier, alignement in fichiers_csv_alignes.items():
+                langue_pivot, langue_tierce = alignement[:2]
+                for page, debut, longueur, texte_pivot in positions_lignes(alignement):
+                    id_texte = None
+                    if texte_pivot:
+                        if (langue_pivot, texte_pivot) not in ids_textes:
+                            id_texte = connexion.execute(
+                                "INSERT INTO textes (episode, langue, texte) VALUES (?, ?, ?)",
+                                (episode, langue_pivot, texte_pivot),
+                            ).lastrowid
+                            connexion.executemany(
+                                "INSERT OR IGNORE INTO jetons (jeton, texte) VALUES (?, ?)",
+                                [(jeton, id_texte) for jeton in set(decouper_jetons(texte_pivot))],
+                            )
+                            ids_textes[(langue_pivot, texte_pivot)] = id_texte
+                        id_texte = ids_textes[(langue_pivot, texte_pivot)]
+                    lignes.append(
+                        (
+                            langue_pivot,
+                            langue_tierce,
+                            episode,
+                            page,
+                            chemin_zip,
+                            nom_fichier,
+                            debut,
+                            longueur,
+                            id_texte,
+                        )
+                    )
+        connexion.executemany(
+            "INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", lignes
+        )
+    return fichier_index
+
+
+def interroger_index(
+    fichier_index,
+    langue_pivot=None,
+    langue_tierce=None,
+    episodes=None,
+    page=None,
+    mots=(),
+):
+    # Lignes alignées répondant à tous les critères indiqués (codes du Congrès ; episodes : (début, fin) inclus ;
+    # mots : mots présents dans le texte pivot, sans distinction de casse)
+    # Retourne [(code pivot, code tiers, épisode, page, fichier zip, fichier aligné, début, longueur), ...]
+    conditions = []
+    valeurs = []
+    if langue_pivot:
+        conditions.append("langue_pivot = ?")
+        valeurs.append(langue_pivot)
+    if langue_tierce:
+        conditions.append("langue_tierce = ?")
+        valeurs.append(langue_tierce)
+    if episodes:
+        conditions.append("episode BETWEEN ? AND ?")
+        valeurs.extend(episodes)
+    if page is not None:
+        conditions.append("page = ?")
+        valeurs.append(page)
+    for mot in mots:
+        for jeton in decouper_jetons(mot):
+            conditions.append("texte_pivot IN (SELECT texte FROM jetons WHERE jeton = ?)")
+            valeurs.append(jeton)
+
+    requete = "SELECT langue_pivot, langue_tierce, episode, page, fichier_zip, fichier_csv, debut, longueur FROM segments"
+    if conditions:
+        requete += " WHERE " + " AND ".join(conditions)
+    requete += " ORDER BY episode, fichier_zip, fichier_csv, debut"
+    with closing(sqlite3.connect(fichier_index)) as connexion:
+        return connexion.execute(requete, valeurs).fetchall()
+
+
+def lire_lignes_indexees(fichier_index, resultats):
+    # Textes (pivot, tiers) de chaque résultat de interroger_index(), lus à leur position dans les zips produits ;
+    # chaque fichier aligné n'est décompressé qu'une fois pour des résultats consécutifs
+    repertoire_index = os.path.dirname(os.path.abspath(fichier_index))
+    membre_courant, contenu = None, b""
+    for resultat in resultats:
+        fichier_zip, fichier_csv, debut, longueur = resultat[4:]
+        if (fichier_zip, fichier_csv) != membre_courant:
+            with zipfile.ZipFile(os.path.join(repertoire_index, fichier_zip), "r") as zipf:
+                contenu = zipf.read(fichier_csv)
+            membre_courant = (fichier_zip, fichier_csv)
+        yield resultat, lire_ligne_alignee(
+            contenu[debut : debut + longueur].decode("utf-8")
+        )
 
-    # Nettoyer le titre si besoin
-    titre = nettoyer_titre(titre)
 
-    # Téléchargement et extraction des fichiers
-    dossier_extrait = chercher_episode(titre, numero_episode)
-    # Gestion erreur
-    if not dossier_extrait:
-        print("Erreur : impossible de télécharger ou d'extraire les fichiers.")
-        return
+################# CONSTRUCTION INCRÉMENTALE ##########################
+# Un fichier d'état par épisode (E05.json...) dans le répertoire indiqué par --incremental : empreinte des
+# pages SVG de chaque langue, segments extraits et leur empreinte, fichiers alignés de chaque zip produit.
+# À la construction suivante, seules les langues dont les pages ont changé sont extraites à nouveau,
+# et seuls les fichiers alignés concernant une langue dont les segments ont changé sont réécrits dans les zips
 
-    # Variables pour suivre les fichiers temporaires et finaux
-    fichiers_csv_temp = []
-    fichiers_csv_finaux = []
 
-    # Parcourir les fichiers SVG dans chaque dossier de langue
-    for dossier_langues in os.listdir(f"{dossier_extrait}/lang/"):
-        path_dossier_lang = os.path.join(dossier_extrait, "lang", dossier_langues)
+def empreintes_pages(zip_ref, membres_svg):
+    # Empreinte de chaque page SVG lue dans le répertoire central de l'archive (CRC-32 et taille), sans décompression
+    empreintes = {}
+    for membre_svg in sorted(membres_svg):
+        info = zip_ref.getinfo(membre_svg)
+        empreintes[membre_svg] = f"{info.CRC:08x}-{info.file_size}"
+    return empreintes
 
-        if os.path.isdir(path_dossier_lang):
-            fichiers_csv_lang_temp = []
-            svg_files = [f for f in os.listdir(path_dossier_lang) if f.endswith(".svg")]
 
+def empreinte_segments(segments):
+    return hashlib.sha256(
+        json.dumps(segments.vers_etat(), ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def chemin_etat_episode(repertoire_incremental, numero_episode):
+    return os.path.join(repertoire_incremental, f"E{numero_episode.zfill(2)}.json")
+
+
+def lire_etat_episode(repertoire_incremental, numero_episode, parametres):
+    # État de la construction précédente de l'épisode, s'il peut servir : mêmes paramètres et fichiers zip
+    # toujours présents avec les mêmes fichiers alignés ; sinon None (l'épisode est entièrement traité)
+    chemin_etat = chemin_etat_episode(repertoire_incremental, numero_episode)
+    if not os.path.exists(chemin_etat):
+        return None
+    with open(chemin_etat, "r", encoding="utf-8") as fichier:
+        etat = json.load(fichier)
+    if etat.get("parametres") != parametres:
+        return None
+    for fichier_zip, noms_fichiers in etat["fichiers_zip"].items():
+        if not zipfile.is_zipfile(fichier_zip):
+            return None
+        with zipfile.ZipFile(fichier_zip, "r") as zip_ref:
+            if zip_ref.namelist() != noms_fichiers:
+                return None
+    return etat
+
+
+def ecrire_etat_episode(repertoire_incremental, numero_episode, etat):
+    # écriture dans un fichier temporaire puis renommage : l'état n'est jamais lu à moitié écrit
+    # (fichier temporaire propre au processus : deux travailleurs peuvent écrire l'état du même épisode)
+    os.makedirs(repertoire_incremental, exist_ok=True)
+    chemin_etat = chemin_etat_episode(repertoire_incremental, numero_episode)
+    chemin_temporaire = f"{chemin_etat}.{os.getpid()}.tmp"
+    with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
+        json.dump(etat, fichier, ensure_ascii=False)
+    os.replace(chemin_temporaire, chemin_etat)
+
+
+def reprendre_segments_inchanges(etat, empreintes_svg, segments_extraits):
+    # Segments de toutes les langues : ceux qui viennent d'être extraits, et ceux de la construction précédente
+    # pour les langues dont les pages n'ont pas changé
+    # Retourne aussi les langues dont les segments ont changé (langues ajoutées, modifiées ou supprimées)
+    segments_par_langue = {}
+    langues_modifiees = set()
+    for langue_code in sorted(empreintes_svg):
+        precedent = etat["langues"].get(langue_code)
+        if precedent and precedent["svg"] == empreintes_svg[langue_code]:
+            segments = SegmentsLangue.depuis_etat(langue_code, precedent["segments"])
+        else:
+            segments = segments_extraits.get(langue_code) or SegmentsLangue(langue_code)
+            # une page modifiée sans changement de texte (dessin, mise en page) ne change aucun alignement
+            if (
+                not precedent
+                or precedent["empreinte_segments"] != empreinte_segments(segments)
+            ):
+                langues_modifiees.add(langue_code)
+        if segments:
+            segments_par_langue[langue_code] = segments
+    langues_modifiees.update(
+        langue_code for langue_code in etat["langues"] if langue_code not in empreintes_svg
+    )
+    return segments_par_langue, langues_modifiees
+
+
+################### TRAITEMENT D'UN ÉPISODE ###########################
+
+
+def parametres_construction(pivots, methode_alignement, selection_langues=None):
+    # Paramètres enregistrés dans l'état d'un épisode : l'état n'est repris que s'ils n'ont pas changé
+    # (format_segments : les états enregistrés avant SegmentsLangue ne sont pas repris ; la sélection de langues
+    # n'est enregistrée que si elle est indiquée, si bien que les états sans sélection restent valables)
+    parametres = {
+        "pivots": list(pivots),
+        "methode_alignement": methode_alignement,
+        "format_segments": 2,
+    }
+    if selection_langues:
+        parametres["langues"] = selection_langues
+    return parametres
+
+
+def extraire_episode(
+    fichier_zip,
+    numero_episode,
+    avec_mmap=False,
+    executeur=None,
+    repertoire_intermediaires=None,
+    pivots=PIVOTS,
+    methode_alignement="structure",
+    repertoire_incremental=None,
+    selection_langues=None,
+    fichier_cache_extraction=None,
+):
+    # Première partie du traitement d'un épisode : lecture du lang-pack et extraction du texte des SVG
+    # (seule partie qui lit le lang-pack, l'archive peut être supprimée ensuite)
+    # selection_langues : langues à traiter en plus des pivots (voir selectionner_langues()), les autres
+    # dossiers de l'archive n'étant pas lus
+    # fichier_cache_extraction : cache SQLite du texte extrait des pages (voir extraire_pages_avec_cache())
+    # Retourne (segments par langue, langues modifiées ou None, état de la construction précédente ou None,
+    # empreintes des pages SVG), à passer à aligner_episode()
+
+    # Liste des pages SVG à traiter pour chaque dossier de langue, directement dans l'archive
+    pages = []
+    empreintes_svg = {}
+    with chronometrer("lecture_archive"), ouvrir_lang_pack(fichier_zip, avec_mmap) as zip_ref:
+        svg_par_langue = lister_svg_par_langue(zip_ref)
+        # sans dossier languedocien, rien n'est lu : aligner_episode() signale l'absence de traduction en occitan
+        if "oc" not in svg_par_langue:
+            return {}, None, None, {}
+        for dossier_langues in sorted(
+            selectionner_langues(svg_par_langue, pivots, selection_langues)
+        ):
+            svg_files = svg_par_langue[dossier_langues]
+            empreintes_svg[dossier_langues] = empreintes_pages(zip_ref, svg_files)
             # Trouver le fichier avec le numéro de page le plus élevé et l'ignorer (la dernière page des épisodes ne comprenant pas le texte de l'épisode)
-            max_page = max([int(f.split("P")[1].split(".")[0]) for f in svg_files])
+            max_page = max([int(f.split("P")[-1].split(".")[0]) for f in svg_files])
             svg_files = [
-                f for f in svg_files if int(f.split("P")[1].split(".")[0]) != max_page
+                f for f in svg_files if int(f.split("P")[-1].split(".")[0]) != max_page
             ]
+            pages.extend((dossier_langues, membre_svg) for membre_svg in svg_files)
+
+    # Construction incrémentale : seules les langues dont les pages SVG ont changé sont extraites à nouveau
+    parametres = parametres_construction(pivots, methode_alignement, selection_langues)
+    etat = None
+    if repertoire_incremental:
+        etat = lire_etat_episode(repertoire_incremental, numero_episode, parametres)
+    if etat:
+        pages_a_extraire = [
+            (dossier_langues, membre_svg)
+            for dossier_langues, membre_svg in pages
+            if etat["langues"].get(dossier_langues, {}).get("svg")
+            != empreintes_svg[dossier_langues]
+        ]
+    else:
+        pages_a_extraire = pages
+
+    # Appeler la fonction d'extraction du texte (en parallèle si un groupe de processus est fourni)
+    with chronometrer("extraction"):
+        textes_svg = extraire_pages(
+            fichier_zip,
+            pages_a_extraire,
+            numero_episode,
+            avec_mmap,
+            executeur,
+            fichier_cache_extraction,
+        )
 
-            # Appeler la fonction d'extraction du texte
-            for fichier_svg in svg_files:
-                numero_page = fichier_svg.split("P")[1].split(".")[0]
-                path_fichier_svg = os.path.join(path_dossier_lang, fichier_svg)
-
-                # Extraction du texte du fichier SVG
-                texte_svg = extraire_texte_du_svg(
-                    path_fichier_svg, numero_episode, dossier_langues
-                )
-
-                # Création du fichier CSV temporaire pour la page
-                if texte_svg:
-                    fichier_csv = creer_csv_avec_svg_data(
-                        dossier_langues, numero_episode, numero_page, texte_svg
-                    )
-                    fichiers_csv_lang_temp.append(fichier_csv)
+    # Regrouper les segments par langue
+    with chronometrer("regroupement"):
+        segments_par_langue = fusionner_segments_par_langue(pages_a_extraire, textes_svg)
+    for langue_code, segments in segments_par_langue.items():
+        compter("segments_extraits", len(segments), langue_code)
+    langues_modifiees = None  # None : toutes les langues sont alignées
+    if etat:
+        segments_par_langue, langues_modifiees = reprendre_segments_inchanges(
+            etat, empreintes_svg, segments_par_langue
+        )
+        print(
+            f"Construction incrémentale : {len(langues_modifiees)} langue(s) modifiée(s) depuis la construction précédente"
+            + (f" ({', '.join(sorted(langues_modifiees))})" if langues_modifiees else "")
+        )
+    elif repertoire_incremental:
+        print("Construction incrémentale : pas de construction précédente utilisable, traitement complet de l'épisode")
+    if repertoire_intermediaires:
+        ecrire_csv_intermediaires(
+            repertoire_intermediaires, numero_episode, segments_par_langue
+        )
 
-            # Fusionner les fichiers CSV par langue
-            if fichiers_csv_lang_temp:
-                fichier_csv_lang_fusionne = fusionner_csv_par_langue(
-                    dossier_langues, numero_episode, fichiers_csv_lang_temp
-                )
-                fichiers_csv_finaux.append(fichier_csv_lang_fusionne)
+    return segments_par_langue, langues_modifiees, etat, empreintes_svg
+
+
+def aligner_episode(
+    numero_episode,
+    extraction,
+    pivots=PIVOTS,
+    methode_alignement="structure",
+    repertoire_incremental=None,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    format_export=None,
+    fichier_index=None,
+    repertoire_sortie=".",
+    repertoire_travail=None,
+    selection_langues=None,
+):
+    # Seconde partie du traitement d'un épisode, à partir du résultat de extraire_episode() :
+    # alignement, génération des zips, export en colonnes, index et état de la construction incrémentale
+    # repertoire_sortie : répertoire des fichiers produits ; repertoire_travail : répertoire où ils sont écrits
+    # avant d'être renommés (voir espace_de_travail())
+    # Retourne la liste des fichiers zip produits, ou None s'il n'existe pas de traduction en occitan
+    segments_par_langue, langues_modifiees, etat, empreintes_svg = extraction
+    parametres = parametres_construction(pivots, methode_alignement, selection_langues)
+    # Méthode et niveau de compression des zips : s'ils ont changé depuis la construction précédente, tous les
+    # fichiers alignés sont réécrits (les fichiers recopiés depuis les anciens zips garderaient leur compression)
+    compression_zips = [compression, niveau_compression]
+    if etat and etat.get("compression_zips") != compression_zips:
+        langues_modifiees = None
 
     ############ APPEL AUX FONCTIONS SPÉCIFIQUES POUR CHAQUE TYPE D'ALIGNEMENT ################
 
-    # listes pour recueillir les fichiers alignés en languedocien et en gascon
-    fichiers_csv_alignes = []
-    fichiers_csv_alignes_ga = []
-
     # Gestion de l'erreur liée à l'absence de fichier occitan pour un épisode donné
-    try:
-        csv_occitan = [f for f in fichiers_csv_finaux if f.startswith("oc_")][0]
-    except IndexError:
+    if "oc" not in segments_par_langue:
         print(
             "\nErreur : il n'y a pas encore de traduction en occitan disponible pour cet épisode. \nLe script va être interrompu et ne va pas retourner de résultats.\n"
         )
-        for fichier_csv in fichiers_csv_finaux:
-            if os.path.exists(fichier_csv):
-                os.remove(
-                    fichier_csv
-                )  # supprimer les fichiers produits précédemment (éviter l'encombrement)
-        shutil.rmtree(
-            dossier_extrait
-        )  # suppression du dossier lang-pack téléchargé au début du script
-        sys.exit(1)  # arrêt du script si aucun fichier languedocien trouvé
+        return None  # l'appelant décide d'arrêter le script (mode interactif) ou de passer à l'épisode suivant (mode lot)
+
+    # Codes de langue du Congrès, résolus une fois pour toutes : les lignes et les noms des fichiers
+    # alignés sont produits directement avec ces codes
+    codes_congres = resoudre_codes_langue(segments_par_langue, correspondances)
+
+    # L'export en colonnes et l'index couvrent toutes les paires : en construction incrémentale, elles sont
+    # alors toutes alignées à nouveau si une langue a changé, mais seules celles concernant une langue modifiée
+    # sont réécrites dans les zips
+    fichier_export = None
+    if format_export:
+        fichier_export = chemin_sortie(
+            repertoire_sortie, f"E{numero_episode.zfill(2)}_alignements.{format_export}"
+        )
+    exporter = fichier_export and (
+        langues_modifiees is None
+        or langues_modifiees
+        or not os.path.exists(fichier_export)
+    )
+    indexer = fichier_index and (
+        langues_modifiees is None
+        or langues_modifiees
+        or not episode_indexe(fichier_index, numero_episode)
+    )
 
-    #### Appel aux fonctions de traitement des corpus languedociens :
-    # Alignement du fichier occitan avec le fichier de langue tierce
-    for fichier_csv in fichiers_csv_finaux:
-        if not fichier_csv.startswith("oc_"):
-            fichier_aligne_lg = aligner_corpus_avec_languedocien(
-                csv_occitan, fichier_csv
-            )
-            fichiers_csv_alignes.append(fichier_aligne_lg)
-    # Modification des fichiers et de leurs noms pour correspondre aux codes de langues du Congrès
-    fichiers_csv_alignes_modifies_lg = []
-    for fichier_csv in fichiers_csv_alignes:
-        fichier_modifie_lg = modifier_contenu_csv(fichier_csv, correspondances)
-        fichier_renomme_lg = renommer_fichiers_csv(
-            fichier_modifie_lg, correspondances, numero_episode
+    # Alignement de toutes les langues pivots en un seul passage (le corpus bivariété est produit directement)
+    with chronometrer("alignement"):
+        fichiers_par_pivot, fichiers_bivariete = aligner_sur_pivots(
+            segments_par_langue,
+            pivots,
+            codes_congres,
+            numero_episode,
+            methode_alignement,
+            None if exporter or indexer else langues_modifiees,
         )
-        fichiers_csv_alignes_modifies_lg.append(fichier_renomme_lg)
+    tous_fichiers_par_pivot, tous_fichiers_bivariete = fichiers_par_pivot, fichiers_bivariete
+
+    if exporter:
+        with chronometrer("export_colonnes"):
+            exporter_colonnes(
+                fichier_export,
+                numero_episode,
+                [
+                    alignement
+                    for fichiers in [*fichiers_par_pivot.values(), fichiers_bivariete]
+                    for alignement in fichiers.values()
+                ],
+                format_export,
+                repertoire_travail,
+            )
+    if (exporter or indexer) and langues_modifiees is not None:
+        codes_modifies = {
+            correspondances.get(langue_code, langue_code)
+            for langue_code in langues_modifiees
+        }
+        fichiers_par_pivot = {
+            pivot: marquer_inchanges(fichiers, codes_modifies)
+            for pivot, fichiers in fichiers_par_pivot.items()
+        }
+        fichiers_bivariete = marquer_inchanges(fichiers_bivariete, codes_modifies)
+
+    for pivot in pivots:
+        if pivot in fichiers_par_pivot:
+            continue
+        if pivot == "ga":
+            print(
+                "\nErreur : il n'y a pas encore de traduction en gascon disponible pour cet épisode. \nLe script ne retournera pas de corpus aligné bilingue pour le gascon, ni de corpus bivariété pour le gascon et le languedocien."
+            )
+        else:
+            print(
+                f"\nErreur : il n'y a pas de traduction en '{pivot}' disponible pour cet épisode. \nLe script ne retournera pas de corpus aligné bilingue pour cette langue pivot."
+            )
 
-    fichier_zip_final_bivar = creer_repertoire_alignement_bivariete(
-        numero_episode, fichiers_csv_alignes_modifies_lg
-    )
-    # éviter le FileNotFound pour le dossier languedocien (puisqu'il est amputé du fichier languedocien-gascon après l'appel à creer_repertoire() ci-dessus)
-    fichiers_valides_lg = [
-        f for f in fichiers_csv_alignes_modifies_lg if os.path.exists(f)
-    ]
-    # Créer un fichier ZIP avec tous les fichiers alignés
-    fichier_zip_final_lg = creer_zip_fichiers_alignes_lg(
-        numero_episode, fichiers_valides_lg
+    # Créer un fichier ZIP par langue pivot avec tous les fichiers alignés, puis celui du corpus bivariété
+    # (en construction incrémentale, les zips de la construction précédente sont mis à jour)
+    ecrire_zip = mettre_a_jour_zip if etat else creer_zip_fichiers_alignes
+    fichiers_zip = []
+    noms_par_zip = {}
+    contenus_zips = []
+    bilan = []
+    with chronometrer("ecriture_zips"):
+        for pivot, fichiers_csv_alignes in fichiers_par_pivot.items():
+            fichier_zip_final = ecrire_zip(
+                chemin_sortie(
+                    repertoire_sortie,
+                    f"E{numero_episode.zfill(2)}_{codes_congres[pivot]}_alignements.zip",
+                ),
+                fichiers_csv_alignes,
+                compression,
+                niveau_compression,
+                repertoire_travail,
+            )
+            fichiers_zip.append(fichier_zip_final)
+            noms_par_zip[fichier_zip_final] = list(fichiers_csv_alignes)
+            contenus_zips.append((fichier_zip_final, tous_fichiers_par_pivot[pivot]))
+            bilan.append(
+                f"- Fichier contenant les alignements avec {NOMS_PIVOTS.get(pivot, codes_congres[pivot])} : \n{fichier_zip_final}"
+            )
+        if fichiers_bivariete:
+            fichier_zip_final_bivar = ecrire_zip(
+                chemin_sortie(repertoire_sortie, f"E{numero_episode.zfill(2)}_bivarietat_lg_ga.zip"),
+                fichiers_bivariete,
+                compression,
+                niveau_compression,
+                repertoire_travail,
+            )
+            fichiers_zip.append(fichier_zip_final_bivar)
+            noms_par_zip[fichier_zip_final_bivar] = list(fichiers_bivariete)
+            contenus_zips.append((fichier_zip_final_bivar, tous_fichiers_bivariete))
+            bilan.append(
+                f"- Fichier contenant les alignements languedocien/gascon : \n{fichier_zip_final_bivar}"
+            )
+    if fichier_export:
+        bilan.append(f"- Export en colonnes de tous les alignements : \n{fichier_export}")
+    if indexer:
+        with chronometrer("index"):
+            indexer_episode(fichier_index, numero_episode, contenus_zips)
+    if fichier_index:
+        bilan.append(f"- Index du corpus : \n{fichier_index}")
+
+    if repertoire_incremental:
+        # (une langue sans texte est enregistrée avec des segments vides)
+        segments_langues = {
+            langue_code: segments_par_langue.get(langue_code) or SegmentsLangue(langue_code)
+            for langue_code in empreintes_svg
+        }
+        ecrire_etat_episode(
+            repertoire_incremental,
+            numero_episode,
+            {
+                "parametres": parametres,
+                "compression_zips": compression_zips,
+                "langues": {
+                    langue_code: {
+                        "svg": empreintes,
+                        "segments": segments_langues[langue_code].vers_etat(),
+                        "empreinte_segments": empreinte_segments(
+                            segments_langues[langue_code]
+                        ),
+                    }
+                    for langue_code, empreintes in empreintes_svg.items()
+                },
+                "fichiers_zip": noms_par_zip,
+            },
+        )
+
+    ############### PREPARATION SORTIE DE SCRIPT #################
+
+    compter("episodes_traites")
+    entete = "Fichiers ZIP finaux:" if len(fichiers_zip) > 1 else "Fichier ZIP final :"
+    print(f"\nSUCCÈS DU PROGRAMME \n{entete} \n" + "\n".join(bilan) + "\n")
+    return fichiers_zip
+
+
+def traiter_episode(
+    fichier_zip,
+    numero_episode,
+    avec_mmap=False,
+    executeur=None,
+    repertoire_intermediaires=None,
+    pivots=PIVOTS,
+    methode_alignement="structure",
+    repertoire_incremental=None,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    format_export=None,
+    fichier_index=None,
+    repertoire_sortie=".",
+    selection_langues=None,
+    fichier_cache_extraction=None,
+):
+    # Extraction, alignement et génération des zips pour un lang-pack déjà téléchargé
+    # Les segments restent en mémoire de l'extraction jusqu'à l'écriture des zips finaux
+    # executeur : groupe de processus pour l'extraction du texte des SVG (None : extraction dans le processus courant)
+    # repertoire_intermediaires : si indiqué, les segments de chaque langue y sont aussi écrits en CSV (débogage)
+    # pivots : langues pivots (codes Pepper&Carrot), un fichier zip d'alignements étant produit pour chacune
+    # methode_alignement : "structure" (par page et par bloc SVG) ou "position" (ligne à ligne, méthode d'origine)
+    # repertoire_incremental : si indiqué, seules les langues modifiées depuis la construction précédente
+    # sont extraites et alignées à nouveau, et les zips existants sont mis à jour
+    # compression, niveau_compression : méthode (zipfile.ZIP_DEFLATED...) et niveau de compression des zips produits
+    # format_export : si indiqué ("arrow" ou "parquet"), tous les alignements sont aussi exportés en colonnes
+    # fichier_index : si indiqué, les lignes alignées de l'épisode sont enregistrées dans cet index SQLite du corpus
+    # repertoire_sortie : répertoire des fichiers produits, écrits dans un répertoire de travail propre à l'épisode
+    # puis renommés
+    # selection_langues : si indiquée, seules ces langues sont extraites et alignées avec les pivots
+    # (voir selectionner_langues())
+    # fichier_cache_extraction : si indiqué, les pages déjà analysées lors d'une exécution précédente (même contenu)
+    # sont lues dans ce cache SQLite au lieu d'être analysées à nouveau
+    # Retourne la liste des fichiers zip produits, ou None s'il n'existe pas de traduction en occitan
+
+    extraction = extraire_episode(
+        fichier_zip,
+        numero_episode,
+        avec_mmap=avec_mmap,
+        executeur=executeur,
+        repertoire_intermediaires=repertoire_intermediaires,
+        pivots=pivots,
+        methode_alignement=methode_alignement,
+        repertoire_incremental=repertoire_incremental,
+        selection_langues=selection_langues,
+        fichier_cache_extraction=fichier_cache_extraction,
     )
+    with espace_de_travail(
+        repertoire_sortie, f".travail-E{numero_episode.zfill(2)}-"
+    ) as repertoire_travail:
+        return aligner_episode(
+            numero_episode,
+            extraction,
+            pivots=pivots,
+            methode_alignement=methode_alignement,
+            repertoire_incremental=repertoire_incremental,
+            compression=compression,
+            niveau_compression=niveau_compression,
+            format_export=format_export,
+            fichier_index=fichier_index,
+            repertoire_sortie=repertoire_sortie,
+            repertoire_travail=repertoire_travail,
+            selection_langues=selection_langues,
+        )
 
-    ### Appel conditionnel (plus de chances d'avoir des corpus languedociens sans gascon que l'inverse) aux fonctions de traitement des corpus gascons :
-    fichiers_gascon = [
-        fichier for fichier in fichiers_csv_finaux if fichier.startswith("ga_")
+
+################### MODE LOT (PLUSIEURS ÉPISODES) ###########################
+
+
+def lire_manifeste(fichier_manifeste, titre_obligatoire=True):
+    # Lecture d'un manifeste d'épisodes : une ligne par épisode, "numéro titre anglais" (ex. : "5 Preparations")
+    # Les lignes vides et les lignes commençant par '#' sont ignorées
+    # Sans titre_obligatoire (titres lus dans le catalogue), une ligne peut ne contenir que le numéro : titre None
+    episodes = []
+    with open(fichier_manifeste, "r", encoding="utf-8") as fichier:
+        for ligne in fichier:
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith("#"):
+                continue
+            numero_episode, *titre = ligne.split(maxsplit=1)
+            titre = titre[0] if titre else None
+            if not numero_episode.isdigit() or (titre_obligatoire and not titre):
+                print(f"Ligne de manifeste invalide, ignorée : {ligne}")
+                continue
+            episodes.append((numero_episode, titre))
+    return episodes
+
+
+def filtrer_plage(episodes, plage):
+    # Ne conserver que les épisodes dont le numéro est compris dans la plage "début-fin" (bornes incluses)
+    debut, _, fin = plage.partition("-")
+    debut = int(debut)
+    fin = int(fin) if fin else debut
+    return [
+        (numero, titre) for numero, titre in episodes if debut <= int(numero) <= fin
     ]
-    if fichiers_gascon:
-        csv_gascon = [f for f in fichiers_csv_finaux if f.startswith("ga_")][0]
-        # Alignement du fichier gascon avec le fichier de langue tierce
-        for fichier_csv in fichiers_csv_finaux:
-            if not fichier_csv.startswith("ga_"):
-                fichier_aligne_ga = aligner_corpus_avec_gascon(csv_gascon, fichier_csv)
-                fichiers_csv_alignes_ga.append(fichier_aligne_ga)
-        # Modification des fichiers et de leurs noms pour correspondre aux codes de langues du Congrès
-        fichiers_csv_alignes_modifies_ga = []
-        for fichier_csv in fichiers_csv_alignes_ga:
-            fichier_modifie_ga = modifier_contenu_csv(fichier_csv, correspondances)
-            fichier_renomme_ga = renommer_fichiers_csv(
-                fichier_modifie_ga, correspondances, numero_episode
-            )
-            fichiers_csv_alignes_modifies_ga.append(fichier_renomme_ga)
-        # Suppression du fichier gascon-languedocien (car on a déjà un fichier languedocien-gascon !)
-        for fichier in fichiers_csv_alignes_modifies_ga:
-            if "oc-gascon-grclass_oc-lengadoc-grclass" in fichier:
-                os.remove(fichier)
-            break  # arrêt de la boucle dès que le fichier est trouvé une fois
-        # Pour résoudre le bug (fichier gascon supprimé auquel la fonction creer_zip() voulait accéder, et qui provoquait un File Not Found error):
-        # il s'agit de vérifier que les fichiers à traiter par creer_zip() existent bien avant d'appeler la fonction
-        fichiers_valides_ga = [
-            f for f in fichiers_csv_alignes_modifies_ga if os.path.exists(f)
+
+
+def telecharger_episodes(
+    episodes,
+    nb_telechargements=NB_TELECHARGEMENTS,
+    delai=DELAI_EXPIRATION,
+    tentatives=NB_TENTATIVES,
+    url_base=URL_BASE,
+    reprise=False,
+    repertoire_cache=None,
+    hors_ligne=False,
+    repertoire_telechargement=None,
+):
+    # Téléchargement simultané des lang-packs d'une liste d'épisodes [(numéro, titre), ...] avec une session commune
+    # Les archives téléchargées sont rendues dans l'ordre de la liste, dès que chacune est disponible
+    session = creer_session(nb_telechargements, tentatives)
+    with session, ThreadPoolExecutor(max_workers=nb_telechargements) as executeur:
+        telechargements = [
+            executeur.submit(
+                chercher_episode,
+                nettoyer_titre(titre),
+                numero,
+                session=session,
+                delai=delai,
+                url_base=url_base,
+                reprise=reprise,
+                repertoire_cache=repertoire_cache,
+                hors_ligne=hors_ligne,
+                repertoire_telechargement=repertoire_telechargement,
+            )
+            for numero, titre in episodes
         ]
-        # Créer un fichier ZIP avec tous les fichiers alignés
-        fichier_zip_final_ga = creer_zip_fichiers_alignes_ga(
-            numero_episode, fichiers_valides_ga
-        )
-    else:
-        print(
-            "\nErreur : il n'y a pas encore de traduction en gascon disponible pour cet épisode. \nLe script ne retournera pas de corpus aligné bilingue pour le gascon, ni de corpus bivariété pour le gascon et le languedocien."
+        for (numero_episode, titre), telechargement in zip(episodes, telechargements):
+            yield numero_episode, titre, telechargement.result()
+
+
+def creer_groupe_processus(nb_processus):
+    # Groupe de processus pour l'extraction des SVG ; avec un seul processus, l'extraction reste dans le processus courant
+    if nb_processus > 1:
+        executeur = ProcessPoolExecutor(max_workers=nb_processus)
+        # les processus sont créés (fork) dès maintenant, avant les autres fils (téléchargements, bail des
+        # travailleurs...) : un processus créé pendant qu'un autre fil ouvre une base SQLite hériterait d'un
+        # verrou jamais libéré, et resterait bloqué à sa première utilisation du cache de l'extraction
+        executeur.submit(int).result()
+        return executeur
+    return nullcontext()
+
+
+def traiter_lot(
+    episodes,
+    avec_mmap=False,
+    nb_processus=1,
+    repertoire_intermediaires=None,
+    pivots=PIVOTS,
+    methode_alignement="structure",
+    repertoire_incremental=None,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    format_export=None,
+    fichier_index=None,
+    repertoire_sortie=".",
+    selection_langues=None,
+    fichier_cache_extraction=None,
+    **options_telechargement,
+):
+    # Traitement non interactif d'une liste d'épisodes [(numéro, titre), ...] dans une seule exécution
+    # Les lang-packs sont téléchargés en parallèle pendant le traitement des épisodes précédents
+    # Le même groupe de processus d'extraction sert pour tous les épisodes
+    resultats = {}
+    with creer_groupe_processus(nb_processus) as executeur, espace_telechargement(
+        repertoire_sortie,
+        options_telechargement.get("repertoire_cache"),
+        options_telechargement.get("reprise"),
+    ) as repertoire_telechargement:
+        for numero_episode, titre, fichier_zip in telecharger_episodes(
+            episodes, repertoire_telechargement=repertoire_telechargement, **options_telechargement
+        ):
+            print(f"\n=== Épisode {numero_episode} : {titre} ===")
+            if not fichier_zip:
+                print("Erreur : impossible de télécharger ou de lire les fichiers.")
+                resultats[numero_episode] = None
+                continue
+            resultats[numero_episode] = traiter_episode(
+                fichier_zip,
+                numero_episode,
+                avec_mmap=avec_mmap,
+                executeur=executeur,
+                repertoire_intermediaires=repertoire_intermediaires,
+                pivots=pivots,
+                methode_alignement=methode_alignement,
+                repertoire_incremental=repertoire_incremental,
+                compression=compression,
+                niveau_compression=niveau_compression,
+                format_export=format_export,
+                fichier_index=fichier_index,
+                repertoire_sortie=repertoire_sortie,
+                selection_langues=selection_langues,
+                fichier_cache_extraction=fichier_cache_extraction,
+            )
+            # les archives en cache sont conservées pour les exécutions suivantes
+            if not options_telechargement.get("repertoire_cache"):
+                os.remove(fichier_zip)
+
+    afficher_bilan_lot(resultats)
+    return resultats
+
+
+def afficher_bilan_lot(resultats):
+    echecs = [numero for numero, zips in resultats.items() if not zips]
+    print(
+        f"\nBILAN DU LOT : {len(resultats) - len(echecs)} épisode(s) traité(s) sur {len(resultats)}."
+    )
+    if echecs:
+        print(f"Épisodes sans résultat : {', '.join(echecs)}")
+
+
+PROFONDEUR_FILE = 2  # lang-packs téléchargés en attente d'extraction (mode asynchrone)
+
+
+async def traiter_lot_asynchrone(
+    episodes,
+    avec_mmap=False,
+    nb_processus=1,
+    repertoire_intermediaires=None,
+    pivots=PIVOTS,
+    methode_alignement="structure",
+    repertoire_incremental=None,
+    compression=zipfile.ZIP_DEFLATED,
+    niveau_compression=None,
+    format_export=None,
+    fichier_index=None,
+    repertoire_sortie=".",
+    selection_langues=None,
+    fichier_cache_extraction=None,
+    profondeur_file=PROFONDEUR_FILE,
+    nb_telechargements=NB_TELECHARGEMENTS,
+    delai=DELAI_EXPIRATION,
+    tentatives=NB_TENTATIVES,
+    url_base=URL_BASE,
+    reprise=False,
+    repertoire_cache=None,
+    hors_ligne=False,
+):
+    # Traitement en lot en trois étapes simultanées, reliées par des files d'attente bornées :
+    # téléchargement des lang-packs -> extraction du texte des SVG (groupe de processus) -> alignement et zips
+    # L'épisode N+1 est ainsi téléchargé et extrait pendant l'alignement de l'épisode N
+    # Les files bornées limitent le nombre de lang-packs sur le disque (profondeur_file en attente, plus les
+    # téléchargements en cours) et les segments en mémoire (un seul épisode extrait en attente d'alignement)
+    # Les étapes bloquantes (requests, zipfile, groupe de processus) s'exécutent dans des fils :
+    # la boucle asyncio ne fait que les coordonner
+    file_archives = asyncio.Queue(maxsize=profondeur_file)
+    file_extractions = asyncio.Queue(maxsize=1)
+    limite_telechargements = asyncio.Semaphore(nb_telechargements)
+    resultats = {}
+
+    async def telecharger(session, numero_episode, titre, repertoire_telechargement):
+        # le téléchargement suivant ne commence que lorsque l'archive a trouvé sa place dans la file
+        async with limite_telechargements:
+            fichier_zip = await asyncio.to_thread(
+                chercher_episode,
+                nettoyer_titre(titre),
+                numero_episode,
+                session=session,
+                delai=delai,
+                url_base=url_base,
+                reprise=reprise,
+                repertoire_cache=repertoire_cache,
+                hors_ligne=hors_ligne,
+                repertoire_telechargement=repertoire_telechargement,
+            )
+            await file_archives.put((numero_episode, titre, fichier_zip))
+
+    async def etape_telechargement(repertoire_telechargement):
+        try:
+            with creer_session(nb_telechargements, tentatives) as session:
+                await asyncio.gather(
+                    *(
+                        telecharger(session, numero, titre, repertoire_telechargement)
+                        for numero, titre in episodes
+                    )
+                )
+        finally:
+            await file_archives.put(None)  # fin des téléchargements
+
+    async def etape_extraction(executeur):
+        try:
+            while True:
+                element = await file_archives.get()
+                if element is None:
+                    break
+                numero_episode, titre, fichier_zip = element
+                extraction = None
+                if fichier_zip:
+                    extraction = await asyncio.to_thread(
+                        extraire_episode,
+                        fichier_zip,
+                        numero_episode,
+                        avec_mmap=avec_mmap,
+                        executeur=executeur,
+                        repertoire_intermediaires=repertoire_intermediaires,
+                        pivots=pivots,
+                        methode_alignement=methode_alignement,
+                        repertoire_incremental=repertoire_incremental,
+                        selection_langues=selection_langues,
+                        fichier_cache_extraction=fichier_cache_extraction,
+                    )
+                    # le lang-pack n'est plus lu après l'extraction ; les archives en cache sont conservées
+                    if not repertoire_cache:
+                        os.remove(fichier_zip)
+                await file_extractions.put((numero_episode, titre, extraction))
+        finally:
+            await file_extractions.put(None)  # fin des extractions
+
+    async def etape_alignement():
+        while True:
+            element = await file_extractions.get()
+            if element is None:
+                break
+            numero_episode, titre, extraction = element
+            print(f"\n=== Épisode {numero_episode} : {titre} ===")
+            if extraction is None:
+                print("Erreur : impossible de télécharger ou de lire les fichiers.")
+                resultats[numero_episode] = None
+                continue
+            with espace_de_travail(
+                repertoire_sortie, f".travail-E{numero_episode.zfill(2)}-"
+            ) as repertoire_travail:
+                resultats[numero_episode] = await asyncio.to_thread(
+                    aligner_episode,
+                    numero_episode,
+                    extraction,
+                    pivots=pivots,
+                    methode_alignement=methode_alignement,
+                    repertoire_incremental=repertoire_incremental,
+                    compression=compression,
+                    niveau_compression=niveau_compression,
+                    format_export=format_export,
+                    fichier_index=fichier_index,
+                    repertoire_sortie=repertoire_sortie,
+                    repertoire_travail=repertoire_travail,
+                    selection_langues=selection_langues,
+                )
+
+    with creer_groupe_processus(nb_processus) as executeur, espace_telechargement(
+        repertoire_sortie, repertoire_cache, reprise
+    ) as repertoire_telechargement:
+        await asyncio.gather(
+            etape_telechargement(repertoire_telechargement),
+            etape_extraction(executeur),
+            etape_alignement(),
         )
 
-    ############### PREPARATION SORTIE DE SCRIPT #################
+    afficher_bilan_lot(resultats)
+    return resultats
 
-    # Suppression des fichiers temporaires
-    for fichier_csv in fichiers_csv_finaux:
-        os.remove(fichier_csv)
 
-    # Suppression du dossier extrait
-    shutil.rmtree(dossier_extrait)
+################### FONCTION MAIN() ###########################
 
-    if fichiers_gascon:
-        print(
-            f"\nSUCCÈS DU PROGRAMME \nFichiers ZIP finaux: \n- Fichier contenant les alignements avec le languedocien : \n{fichier_zip_final_lg}\n- Fichier contenant les alignements avec le gascon : \n{fichier_zip_final_ga}\n- Fichier contenant les alignements languedocien/gascon : \n{fichier_zip_final_bivar}\n"
+
+def analyser_arguments():
+    parser = argparse.ArgumentParser(
+        description="Extraction et alignement de corpus bilingues occitan/autres langues depuis Pepper&Carrot. Sans argument, le titre et le numéro de l'épisode sont demandés à l'utilisateur."
+    )
+    parser.add_argument(
+        "--manifeste",
+        help="fichier listant les épisodes à traiter en lot, une ligne 'numéro titre anglais' par épisode",
+    )
+    parser.add_argument(
+        "--plage",
+        help="ne traiter que les épisodes du manifeste compris dans la plage 'début-fin' (ex. : 20-30)",
+    )
+    parser.add_argument(
+        "--telechargements",
+        type=int,
+        default=NB_TELECHARGEMENTS,
+        help=f"nombre maximal de téléchargements simultanés en mode lot (défaut : {NB_TELECHARGEMENTS})",
+    )
+    parser.add_argument(
+        "--delai",
+        type=float,
+        default=DELAI_EXPIRATION,
+        help=f"délai d'expiration de chaque requête HTTP, en secondes (défaut : {DELAI_EXPIRATION})",
+    )
+    parser.add_argument(
+        "--tentatives",
+        type=int,
+        default=NB_TENTATIVES,
+        help=f"nombre de nouvelles tentatives en cas d'erreur réseau (défaut : {NB_TENTATIVES})",
+    )
+    parser.add_argument(
+        "--url-base",
+        default=URL_BASE,
+        help="adresse du dépôt des sources Pepper&Carrot (utile pour tester avec un serveur local)",
+    )
+    parser.add_argument(
+        "--reprise",
+        action="store_true",
+        help="reprendre les téléchargements interrompus lors d'une exécution précédente au lieu de les recommencer",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="lire les lang-packs via une projection en mémoire (mmap) plutôt que par des lectures successives",
+    )
+    parser.add_argument(
+        "--cache",
+        help="répertoire où conserver les lang-packs téléchargés ; ils ne sont téléchargés à nouveau que s'ils ont changé",
+    )
+    parser.add_argument(
+        "--cache-max",
+        type=int,
+        default=TAILLE_MAX_CACHE,
+        help=f"taille maximale du cache en Mo, les archives les moins récemment utilisées étant supprimées au-delà (défaut : {TAILLE_MAX_CACHE})",
+    )
+    parser.add_argument(
+        "--hors-ligne",
+        action="store_true",
+        help="n'utiliser que les lang-packs présents dans le cache, sans accès au réseau (nécessite --cache)",
+    )
+    parser.add_argument(
+        "--cache-extraction",
+        help="fichier SQLite où conserver le texte extrait de chaque page SVG, sous l'empreinte de son contenu : les pages inchangées d'une exécution à l'autre ne sont plus analysées",
+    )
+    parser.add_argument(
+        "--cache-extraction-max",
+        type=int,
+        default=TAILLE_MAX_CACHE_EXTRACTION,
+        help=f"taille maximale du cache de l'extraction en Mo, les pages les moins récemment utilisées étant supprimées au-delà (défaut : {TAILLE_MAX_CACHE_EXTRACTION})",
+    )
+    parser.add_argument(
+        "--catalogue",
+        nargs="?",
+        const="",
+        metavar="FICHIER",
+        help="lire le titre exact des épisodes dans le catalogue du site (conservé dans le cache) ou dans le FICHIER indiqué : seul le numéro des épisodes est alors demandé, et les épisodes sans traduction en occitan sont écartés avant le téléchargement",
+    )
+    parser.add_argument(
+        "--processus",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="nombre de processus pour l'extraction du texte des SVG, 1 pour tout traiter dans le processus principal (défaut : nombre de cœurs)",
+    )
+    parser.add_argument(
+        "--intermediaires",
+        help="répertoire où écrire aussi les segments extraits de chaque langue (un CSV par langue), pour le débogage",
+    )
+    parser.add_argument(
+        "--pivots",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        default=list(PIVOTS),
+        help=f"langues pivots (codes Pepper&Carrot séparés par des virgules), chacune étant alignée avec toutes les autres langues ; le languedocien 'oc' est obligatoire (défaut : {','.join(PIVOTS)})",
+    )
+    parser.add_argument(
+        "--langues",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        help="langues à aligner avec les pivots (codes Pepper&Carrot séparés par des virgules, ex. : fr,en,es,ca) ; les dossiers des autres langues ne sont pas lus (défaut : toutes)",
+    )
+    parser.add_argument(
+        "--exclure-langues",
+        type=lambda valeur: [code.strip() for code in valeur.split(",") if code.strip()],
+        default=[],
+        help="langues à ne pas extraire ni aligner (codes Pepper&Carrot séparés par des virgules)",
+    )
+    parser.add_argument(
+        "--alignement",
+        choices=METHODES_ALIGNEMENT,
+        default="structure",
+        help="'structure' : segments alignés page par page, ancrés sur les identifiants des blocs SVG puis d'après leur longueur ; 'position' : alignement ligne à ligne d'origine (défaut : structure)",
+    )
+    parser.add_argument(
+        "--incremental",
+        help="répertoire où conserver l'état de chaque épisode construit : aux exécutions suivantes, seules les langues dont les pages SVG ont changé sont traitées à nouveau et les zips existants sont mis à jour",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSIONS,
+        default="deflate",
+        help="méthode de compression des zips produits (défaut : deflate)",
+    )
+    parser.add_argument(
+        "--niveau-compression",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="niveau de compression deflate, de 0 (le plus rapide) à 9 (le plus compact), uniquement avec --compression deflate (défaut : 6)",
+    )
+    parser.add_argument(
+        "--export",
+        choices=FORMATS_EXPORT,
+        help="exporter aussi tous les alignements de chaque épisode en colonnes, au format Arrow (lecture sans copie par projection en mémoire) ou Parquet ; nécessite le module pyarrow",
+    )
+    parser.add_argument(
+        "--index",
+        help="fichier SQLite où indexer les lignes alignées de tous les épisodes traités (par paire de langues, épisode, page et mot du texte pivot), à interroger avec query_corpus_index.py",
+    )
+    parser.add_argument(
+        "--sortie",
+        default=".",
+        help="répertoire des zips produits, où chaque épisode est d'abord écrit dans un répertoire de travail propre puis renommé : plusieurs exécutions peuvent y écrire simultanément (défaut : répertoire courant)",
+    )
+    parser.add_argument(
+        "--asynchrone",
+        action="store_true",
+        help="mode lot : téléchargement, extraction et alignement des épisodes successifs menés simultanément, reliés par des files d'attente bornées",
+    )
+    parser.add_argument(
+        "--file-attente",
+        type=int,
+        default=PROFONDEUR_FILE,
+        help=f"mode asynchrone : nombre maximal de lang-packs téléchargés en attente d'extraction (défaut : {PROFONDEUR_FILE})",
+    )
+    parser.add_argument(
+        "--rapport",
+        help="fichier JSON où écrire en fin d'exécution la durée de chaque étape et les compteurs (octets téléchargés, SVG analysés, segments par langue, fichiers écrits, pic mémoire)",
+    )
+    parser.add_argument(
+        "--profil",
+        help="fichier où écrire le profil cProfile de l'exécution (à lire avec 'python3 -m pstats FICHIER')",
+    )
+    arguments = parser.parse_args()
+    if arguments.export and importlib.util.find_spec("pyarrow") is None:
+        parser.error("l'option --export nécessite le module pyarrow (pip install pyarrow)")
+    if arguments.niveau_compression is not None and arguments.compression != "deflate":
+        parser.error(
+            f"l'option --niveau-compression ne s'applique qu'à la compression deflate, pas à '{arguments.compression}'"
+        )
+    if "oc" not in arguments.pivots:
+        parser.error("l'option --pivots doit comprendre le languedocien 'oc'")
+    # le languedocien reste le premier pivot, les autres gardent l'ordre indiqué
+    arguments.pivots = ["oc"] + [
+        pivot for pivot in dict.fromkeys(arguments.pivots) if pivot != "oc"
+    ]
+    exclues_pivots = set(arguments.exclure_langues) & set(arguments.pivots)
+    if exclues_pivots:
+        parser.error(f"une langue pivot ne peut être exclue : {','.join(sorted(exclues_pivots))}")
+    arguments.selection_langues = construire_selection_langues(
+        arguments.langues, arguments.exclure_langues
+    )
+    if arguments.asynchrone and not arguments.manifeste and not (
+        arguments.catalogue is not None and arguments.plage
+    ):
+        parser.error("l'option --asynchrone nécessite l'option --manifeste (ou --catalogue et --plage)")
+    if arguments.file_attente < 1:
+        parser.error("l'option --file-attente doit valoir au moins 1")
+    if arguments.hors_ligne and not arguments.cache:
+        parser.error("l'option --hors-ligne nécessite l'option --cache")
+    return arguments
+
+
+def executer(arguments):
+    catalogue = None
+    if arguments.catalogue is not None:
+        with creer_session(1, arguments.tentatives) as session:
+            catalogue = charger_catalogue(
+                arguments.catalogue,
+                session,
+                arguments.delai,
+                arguments.url_base,
+                arguments.cache,
+                arguments.hors_ligne,
+            )
+        if catalogue is None:
+            sys.exit(1)
+
+    #################### MODE LOT ######################
+
+    # avec le catalogue, --plage seule désigne directement les épisodes à traiter
+    if arguments.manifeste or (catalogue is not None and arguments.plage):
+        if arguments.manifeste:
+            episodes = lire_manifeste(arguments.manifeste, titre_obligatoire=catalogue is None)
+        else:
+            episodes = sorted(
+                (numero, titre) for numero, (titre, _) in catalogue.items()
+            )
+        if arguments.plage:
+            episodes = filtrer_plage(episodes, arguments.plage)
+        if catalogue is not None:
+            episodes = resoudre_episodes(episodes, catalogue)
+        options_lot = dict(
+            nb_telechargements=arguments.telechargements,
+            delai=arguments.delai,
+            tentatives=arguments.tentatives,
+            url_base=arguments.url_base,
+            reprise=arguments.reprise,
+            avec_mmap=arguments.mmap,
+            repertoire_cache=arguments.cache,
+            hors_ligne=arguments.hors_ligne,
+            nb_processus=arguments.processus,
+            repertoire_intermediaires=arguments.intermediaires,
+            pivots=arguments.pivots,
+            methode_alignement=arguments.alignement,
+            repertoire_incremental=arguments.incremental,
+            compression=COMPRESSIONS[arguments.compression],
+            niveau_compression=arguments.niveau_compression,
+            format_export=arguments.export,
+            fichier_index=arguments.index,
+            repertoire_sortie=arguments.sortie,
+            selection_langues=arguments.selection_langues,
+            fichier_cache_extraction=arguments.cache_extraction,
         )
+        if arguments.asynchrone:
+            resultats = asyncio.run(
+                traiter_lot_asynchrone(
+                    episodes, profondeur_file=arguments.file_attente, **options_lot
+                )
+            )
+        else:
+            resultats = traiter_lot(episodes, **options_lot)
+        if arguments.cache:
+            nettoyer_cache(arguments.cache, arguments.cache_max)
+        if arguments.cache_extraction:
+            nettoyer_cache_extraction(arguments.cache_extraction, arguments.cache_extraction_max)
+        if not any(resultats.values()):
+            sys.exit(1)
+        return
+
+    #################### MODE INTERACTIF ######################
+
+    # Formulaire destiné à l'utilisateur (avec le catalogue, le titre n'est pas demandé)
+    if catalogue is not None:
+        numero_episode = input("Entrez le numéro de l'épisode : ").strip()
+        episode = resoudre_episodes([(numero_episode, None)], catalogue)
+        if not episode:
+            sys.exit(1)
+        numero_episode, titre = episode[0]
     else:
-        print(
-            f"\nSUCCÈS DU PROGRAMME \nFichier ZIP final : \n- Fichier contenant les alignements avec le languedocien : \n{fichier_zip_final_lg}\n"
+        titre = input(
+            "Entrez le titre de l'épisode en anglais en respectant strictement la casse : "
         )
+        numero_episode = input("Entrez le numéro de l'épisode : ")
+
+    # Nettoyer le titre si besoin
+    titre = nettoyer_titre(titre)
+
+    with espace_telechargement(
+        arguments.sortie, arguments.cache, arguments.reprise
+    ) as repertoire_telechargement:
+        # Téléchargement du lang-pack (ou lecture dans le cache)
+        with creer_session(1, arguments.tentatives) as session:
+            fichier_zip = chercher_episode(
+                titre,
+                numero_episode,
+                session=session,
+                delai=arguments.delai,
+                url_base=arguments.url_base,
+                reprise=arguments.reprise,
+                repertoire_cache=arguments.cache,
+                hors_ligne=arguments.hors_ligne,
+                repertoire_telechargement=repertoire_telechargement,
+            )
+        # Gestion erreur
+        if not fichier_zip:
+            print("Erreur : impossible de télécharger ou de lire les fichiers.")
+            return
+
+        with creer_groupe_processus(arguments.processus) as executeur:
+            resultat = traiter_episode(
+                fichier_zip,
+                numero_episode,
+                avec_mmap=arguments.mmap,
+                executeur=executeur,
+                repertoire_intermediaires=arguments.intermediaires,
+                pivots=arguments.pivots,
+                methode_alignement=arguments.alignement,
+                repertoire_incremental=arguments.incremental,
+                compression=COMPRESSIONS[arguments.compression],
+                niveau_compression=arguments.niveau_compression,
+                format_export=arguments.export,
+                fichier_index=arguments.index,
+                repertoire_sortie=arguments.sortie,
+                selection_langues=arguments.selection_langues,
+                fichier_cache_extraction=arguments.cache_extraction,
+            )
+        # Suppression du lang-pack téléchargé, sauf s'il est conservé dans le cache
+        if arguments.cache:
+            nettoyer_cache(arguments.cache, arguments.cache_max)
+        else:
+            os.remove(fichier_zip)
+    if arguments.cache_extraction:
+        nettoyer_cache_extraction(arguments.cache_extraction, arguments.cache_extraction_max)
+    if resultat is None:
+        sys.exit(1)  # arrêt du script si aucun fichier languedocien trouvé
+
+
+def main():
+    global mesures_execution
+    arguments = analyser_arguments()
+    if arguments.rapport:
+        mesures_execution = MesuresExecution()
+    profil = cProfile.Profile() if arguments.profil else None
+    if profil:
+        profil.enable()
+    try:
+        executer(arguments)
+    finally:
+        # le rapport est aussi écrit si l'exécution s'interrompt (épisode sans occitan, erreur...)
+        if profil:
+            profil.disable()
+            profil.dump_stats(arguments.profil)
+        if mesures_execution is not None:
+            ecrire_rapport(arguments.rapport, arguments)
 
 
 if __name__ == "__main__":
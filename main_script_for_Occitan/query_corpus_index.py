@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import time
+
+from extract_align_pepper_carrot import (
+    correspondances,
+    interroger_index,
+    lire_lignes_indexees,
+)
+
+"""
+Interrogation de l'index du corpus construit par extract_align_pepper_carrot.py (option --index) :
+    python3 query_corpus_index.py corpus.sqlite --pivot oc --tierce en --episodes 20-30
+    python3 query_corpus_index.py corpus.sqlite --mot aiga
+    python3 query_corpus_index.py corpus.sqlite --pivot ga --mot "la mar" --compte
+
+Les langues peuvent être indiquées par leur code Pepper&Carrot (oc, en...) ou par leur code du Congrès
+(celui des noms des fichiers alignés). Les critères indiqués se cumulent ; --mot cherche les lignes dont
+le texte pivot contient tous les mots donnés, sans distinction de casse.
+Les lignes trouvées sont relues à leur position dans les zips produits (chemins relatifs au répertoire de l'index).
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recherche des lignes alignées dans l'index du corpus, par paire de langues, épisode, page et mot du texte pivot."
+    )
+    parser.add_argument("index", help="index SQLite produit par extract_align_pepper_carrot.py --index")
+    parser.add_argument("--pivot", help="langue pivot (ex. : oc, ga)")
+    parser.add_argument("--tierce", help="langue tierce (ex. : en, fr)")
+    parser.add_argument("--episodes", help="épisode ou plage d'épisodes 'début-fin' (ex. : 20-30)")
+    parser.add_argument("--page", type=int, help="numéro de page")
+    parser.add_argument(
+        "--mot",
+        action="append",
+        default=[],
+        help="mot devant figurer dans le texte pivot (option répétable)",
+    )
+    parser.add_argument(
+        "--compte", action="store_true", help="n'afficher que le nombre de lignes trouvées"
+    )
+    parser.add_argument(
+        "--positions",
+        action="store_true",
+        help="afficher la position des lignes dans les zips au lieu de leur texte",
+    )
+    arguments = parser.parse_args()
+    if not os.path.exists(arguments.index):
+        parser.error(f"index introuvable : {arguments.index}")
+
+    episodes = None
+    if arguments.episodes:
+        # plage "début-fin" (bornes incluses), comme l'option --plage du script principal
+        debut, _, fin = arguments.episodes.partition("-")
+        episodes = (int(debut), int(fin or debut))
+
+    depart = time.perf_counter()
+    resultats = interroger_index(
+        arguments.index,
+        correspondances.get(arguments.pivot, arguments.pivot),
+        correspondances.get(arguments.tierce, arguments.tierce),
+        episodes,
+        arguments.page,
+        arguments.mot,
+    )
+    duree = time.perf_counter() - depart
+
+    if not arguments.compte:
+        try:
+            if arguments.positions:
+                for langue_pivot, langue_tierce, episode, page, fichier_zip, fichier_csv, position, longueur in resultats:
+                    print(f"{fichier_zip}:{fichier_csv}:{position}+{longueur}\tE{episode:02d} P{page:02d} {langue_pivot}/{langue_tierce}")
+            else:
+                for (langue_pivot, langue_tierce, episode, page, *_), (texte_pivot, texte_tiers) in lire_lignes_indexees(
+                    arguments.index, resultats
+                ):
+                    print(f"E{episode:02d} P{page:02d} {langue_pivot}/{langue_tierce}\t{texte_pivot}\t{texte_tiers}")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # sortie redirigée vers une commande qui s'est arrêtée avant la fin (ex. : '| head') : arrêt sans erreur
+            # (la sortie standard est redirigée vers /dev/null pour que Python ne tente pas de la vider en quittant)
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(0)
+    print(f"{len(resultats)} ligne(s) trouvée(s) en {duree * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+from extract_align_pepper_carrot import SegmentsLangue
+
+"""
+Tests de l'alignement : alignement structurel (ancres sur les id SVG, appariement par position, programmation
+dynamique de Gale et Church, lignes d'un seul côté) et méthode d'origine (--alignement position), dont les
+fichiers alignés doivent rester identiques octet pour octet à ceux du script d'origine.
+    python3 -m pytest tests
+"""
+
+
+def segments(code, blocs):
+    # blocs : [(numéro de page, id du bloc SVG ou None, texte), ...]
+    return SegmentsLangue(code, blocs)
+
+
+class TestAlignementStructurel(unittest.TestCase):
+    def test_ancres_croisees(self):
+        # b et c sont inversés dans la traduction : seule la plus longue suite d'ancres dans le même ordre est gardée
+        pivot = segments("oc", [(1, identifiant, identifiant.upper()) for identifiant in "abcd"])
+        tiers = segments("fr", [(1, identifiant, identifiant.upper()) for identifiant in "acbd"])
+        self.assertEqual(
+            pipeline.ancres_identifiants(pivot, tiers, [0, 1, 2, 3], [0, 1, 2, 3]),
+            [(0, 0), (1, 2), (3, 3)],
+        )
+        # les blocs hors ancres forment des lignes d'un seul côté, sans croisement
+        self.assertEqual(
+            pipeline.aligner_structure(pivot, tiers),
+            [([0], [0]), ([], [1]), ([1], [2]), ([2], []), ([3], [3])],
+        )
+
+    def test_identifiants_en_double_ignores(self):
+        # un id présent deux fois dans la page ne sert pas d'ancre
+        pivot = segments("oc", [(1, "a", "A"), (1, "a", "A2"), (1, "b", "B")])
+        tiers = segments("fr", [(1, "a", "A"), (1, "b", "B")])
+        self.assertEqual(pipeline.ancres_identifiants(pivot, tiers, [0, 1, 2], [0, 1]), [(2, 1)])
+
+    def test_appariement_par_position(self):
+        # autant de blocs de chaque côté, sans ancre : appariés dans l'ordre, quelles que soient leurs longueurs
+        pivot = segments("oc", [(1, None, "a" * 5), (1, None, "b" * 80), (1, None, "c" * 5)])
+        tiers = segments("fr", [(1, None, "x" * 80), (1, None, "y" * 5), (1, None, "z" * 80)])
+        self.assertEqual(
+            pipeline.aligner_structure(pivot, tiers), [([0], [0]), ([1], [1]), ([2], [2])]
+        )
+
+    def test_gale_church_deux_pour_un(self):
+        # une bulle coupée en deux dans le texte pivot
+        self.assertEqual(pipeline.aligner_longueurs([10, 12, 30], [22, 30], 1.0), [(2, 1), (1, 1)])
+        pivot = segments("oc", [(1, None, "x" * 10), (1, None, "y" * 12), (1, None, "z" * 30)])
+        tiers = segments("fr", [(1, None, "u" * 22), (1, None, "v" * 30)])
+        self.assertEqual(pipeline.aligner_structure(pivot, tiers), [([0, 1], [0]), ([2], [1])])
+
+    def test_gale_church_un_pour_deux(self):
+        # une bulle coupée en deux dans la traduction
+        self.assertEqual(pipeline.aligner_longueurs([22, 30], [10, 12, 30], 1.0), [(1, 2), (1, 1)])
+        pivot = segments("oc", [(1, None, "u" * 22), (1, None, "v" * 30)])
+        tiers = segments("fr", [(1, None, "x" * 10), (1, None, "y" * 12), (1, None, "z" * 30)])
+        self.assertEqual(pipeline.aligner_structure(pivot, tiers), [([0], [0, 1]), ([1], [2])])
+
+    def test_lignes_d_un_seul_cote(self):
+        # page 2 absente de la traduction, page 3 absente du texte pivot
+        pivot = segments("oc", [(1, "a", "Bonjorn"), (2, "b", "Adieu")])
+        tiers = segments("fr", [(1, "a", "Bonjour"), (3, "c", "Fin")])
+        appariements = pipeline.aligner_structure(pivot, tiers)
+        self.assertEqual(appariements, [([0], [0]), ([1], []), ([], [1])])
+        lignes = list(pipeline.lignes_alignees("oc-lengadoc-grclass", "fr", pivot, tiers, appariements))
+        self.assertEqual(lignes[1], ["Adieu ", "oc-lengadoc-grclass", ""])
+        self.assertEqual(lignes[2], ["", "Fin ", "fr"])
+
+
+################# MÉTHODE D'ORIGINE ####################
+
+# Lang-pack de test : {langue: {page: [(id du bloc, lignes du texte séparées par '|'), ...]}}
+# (la dernière page n'est pas lue, comme dans les épisodes de Pepper&Carrot)
+PAGES = {
+    "oc": {
+        1: [("a", "Bonjorn, Pepper !"), ("b", "Qué fas|aquí ?"), ("c", 'Lo "gat" dormís')],
+        2: [("d", "Adieu")],
+        3: [("z", "FIN")],
+    },
+    "fr": {
+        1: [
+            ("a", "Bonjour, Pepper !"),
+            ("b", "Que fais-tu|ici ?"),
+            ("x", "Un bloc ajouté"),
+            ("c", 'Le "chat" dort'),
+        ],
+        2: [("d", "Au revoir"), ("e", "  À bientôt  ")],
+        3: [("z", "FIN")],
+    },
+    "ga": {1: [("a", "Adishatz, Pepper !")], 2: [], 3: [("z", "FIN")]},
+}
+
+# Fichiers alignés produits par le script d'origine pour ce lang-pack
+FICHIERS_ORIGINE = {
+    ("E20_oc-lengadoc-grclass_alignements.zip", "oc-lengadoc-grclass_fr_E20.csv"): (
+        'Bonjorn,    Pepper    !  §oc-lengadoc-grclass§Bonjour,    Pepper    !  §fr\r\n'
+        'Qué    fas    aquí    ?  §oc-lengadoc-grclass§Que    fais-tu    ici    ?  §fr\r\n'
+        'Lo       "gat   "    dormís  §oc-lengadoc-grclass§Un    bloc    ajouté  §fr\r\n'
+        'Adieu  §oc-lengadoc-grclass§Le       "chat   "    dort  §fr\r\n'
+        '§Au    revoir  §fr\r\n'
+        '§À    bientôt  §fr\r\n'
+    ),
+    ("E20_oc-gascon-grclass_alignements.zip", "oc-gascon-grclass_fr_E20.csv"): (
+        'Adishatz,    Pepper    !  §oc-gascon-grclass§Bonjour,    Pepper    !  §fr\r\n'
+        '§Que    fais-tu    ici    ?  §fr\r\n'
+        '§Un    bloc    ajouté  §fr\r\n'
+        '§Le       "chat   "    dort  §fr\r\n'
+        '§Au    revoir  §fr\r\n'
+        '§À    bientôt  §fr\r\n'
+    ),
+    ("E20_bivarietat_lg_ga.zip", "oc-lengadoc-grclass_oc-gascon-grclass_E20.csv"): (
+        'Bonjorn,    Pepper    !  §oc-lengadoc-grclass§Adishatz,    Pepper    !  §oc-gascon-grclass\r\n'
+        'Qué    fas    aquí    ?  §oc-lengadoc-grclass§\r\n'
+        'Lo       "gat   "    dormís  §oc-lengadoc-grclass§\r\n'
+        'Adieu  §oc-lengadoc-grclass§\r\n'
+    ),
+}
+
+
+def page_svg(blocs):
+    textes = "".join(
+        f'<text id="{identifiant}" x="0" y="0">'
+        + "".join(f"<tspan>{ligne}</tspan>" for ligne in texte.split("|"))
+        + "</text>"
+        for identifiant, texte in blocs
+    )
+    return f'<svg xmlns="http://www.w3.org/2000/svg"><g>{textes}</g></svg>'
+
+
+class TestAlignementPosition(unittest.TestCase):
+    def test_identique_au_script_d_origine(self):
+        with tempfile.TemporaryDirectory() as repertoire:
+            lang_pack = os.path.join(repertoire, "lang-pack.zip")
+            with zipfile.ZipFile(lang_pack, "w") as zipf:
+                for code_langue, pages in PAGES.items():
+                    for numero_page, blocs in pages.items():
+                        zipf.writestr(f"lang/{code_langue}/E20P{numero_page:02d}.svg", page_svg(blocs))
+            fichiers_zip = pipeline.traiter_episode(
+                lang_pack, "20", methode_alignement="position", repertoire_sortie=repertoire
+            )
+            produits = {}
+            for fichier_zip in fichiers_zip:
+                with zipfile.ZipFile(fichier_zip) as zipf:
+                    for nom_fichier in zipf.namelist():
+                        produits[(os.path.basename(fichier_zip), nom_fichier)] = zipf.read(nom_fichier)
+        for cle, contenu in FICHIERS_ORIGINE.items():
+            self.assertEqual(produits[cle], contenu.encode("utf-8"), cle)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+
+"""
+Tests du cache des lang-packs partagé par plusieurs processus : aucune entrée de l'index n'est perdue
+lorsque plusieurs processus y ajoutent des archives en même temps, et l'éviction épargne les archives
+utilisées récemment.
+    python3 -m pytest tests
+"""
+
+NB_PROCESSUS = 4
+NB_ARCHIVES = 40
+
+
+def ajouter_archives(repertoire_cache, numero_processus):
+    # Ajout au cache de NB_ARCHIVES archives distinctes, chacune sous sa propre clé
+    for numero in range(NB_ARCHIVES):
+        cle = f"ep{numero_processus}-{numero}"
+        fichier_zip = os.path.join(repertoire_cache, f"{os.getpid()}-{numero}.zip")
+        with open(fichier_zip, "wb") as fichier:
+            fichier.write(cle.encode())
+        pipeline.ajouter_au_cache(repertoire_cache, cle, fichier_zip, {})
+
+
+class TestCachePartage(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.repertoire_cache = self.repertoire.name
+
+    def ajouter(self, cle, contenu, dernier_acces=None):
+        fichier_zip = os.path.join(self.repertoire_cache, f"{cle}.zip")
+        with open(fichier_zip, "wb") as fichier:
+            fichier.write(contenu)
+        pipeline.ajouter_au_cache(self.repertoire_cache, cle, fichier_zip, {})
+        if dernier_acces is not None:
+            index = pipeline.lire_index_cache(self.repertoire_cache)
+            index[cle]["dernier_acces"] = dernier_acces
+            pipeline.ecrire_index_cache(self.repertoire_cache, index)
+
+    def test_ajouts_simultanes(self):
+        processus = [
+            multiprocessing.Process(target=ajouter_archives, args=(self.repertoire_cache, numero))
+            for numero in range(NB_PROCESSUS)
+        ]
+        for p in processus:
+            p.start()
+        for p in processus:
+            p.join()
+            self.assertEqual(p.exitcode, 0)
+        index = pipeline.lire_index_cache(self.repertoire_cache)
+        self.assertEqual(len(index), NB_PROCESSUS * NB_ARCHIVES)
+        for entree in index.values():
+            self.assertTrue(os.path.exists(pipeline.chemin_objet_cache(self.repertoire_cache, entree["empreinte"])))
+
+    def test_eviction_epargne_les_archives_recentes(self):
+        ancien = time.time() - 2 * pipeline.DUREE_PROTECTION_CACHE
+        self.ajouter("ep01_Ancien", b"ancien", dernier_acces=ancien)
+        self.ajouter("ep02_Recent", b"recent")
+        pipeline.nettoyer_cache(self.repertoire_cache, taille_max=0)
+        # l'archive utilisée pendant l'exécution est conservée, même au-delà de la taille maximale
+        self.assertEqual(list(pipeline.lire_index_cache(self.repertoire_cache)), ["ep02_Recent"])
+        self.assertEqual(len(os.listdir(os.path.join(self.repertoire_cache, "objets"))), 1)
+
+    def test_ancienne_version_supprimee(self):
+        self.ajouter("ep01_Titre", b"version 1")
+        self.ajouter("ep02_Copie", b"version 1")
+        self.ajouter("ep01_Titre", b"version 2")
+        # la version 1 est encore utilisée par ep02 : elle est conservée
+        self.assertEqual(len(os.listdir(os.path.join(self.repertoire_cache, "objets"))), 2)
+        self.ajouter("ep02_Copie", b"version 2")
+        self.assertEqual(len(os.listdir(os.path.join(self.repertoire_cache, "objets"))), 1)
+
+    def test_archives_orphelines_supprimees(self):
+        self.ajouter("ep01_Titre", b"archive")
+        orpheline = pipeline.chemin_objet_cache(self.repertoire_cache, "0" * 64)
+        with open(orpheline, "wb") as fichier:
+            fichier.write(b"orpheline")
+        pipeline.nettoyer_cache(self.repertoire_cache)
+        self.assertFalse(os.path.exists(orpheline))
+        self.assertEqual(len(os.listdir(os.path.join(self.repertoire_cache, "objets"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
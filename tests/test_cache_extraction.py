@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+
+"""
+Tests du cache de l'extraction (option --cache-extraction) : seules les pages absentes du cache sont
+analysées, le texte lu dans le cache est celui d'une extraction sans cache, et une page identique n'est
+pas reprise du cache lorsque le mode d'extraction change (<flowRoot> jusqu'à l'épisode 12, <text> ensuite).
+    python3 -m pytest tests
+"""
+
+
+def page_svg(texte):
+    # Page contenant un bloc de chaque sorte : le texte extrait dépend du numéro de l'épisode
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        f'<flowRoot id="f"><flowPara>Flux {texte}</flowPara></flowRoot>'
+        f'<text id="t"><tspan>Texte {texte}</tspan></text>'
+        "</svg>"
+    )
+
+
+class TestCacheExtraction(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.lang_pack = os.path.join(self.repertoire.name, "lang-pack.zip")
+        self.fichier_cache = os.path.join(self.repertoire.name, "extraction.sqlite")
+        # la page de 'ga' est identique à celle de 'oc' : elle n'est analysée qu'une fois
+        self.ecrire_lang_pack({"oc": "Bonjorn", "ga": "Bonjorn", "fr": "Bonjour"})
+        self.pages = [(code_langue, f"lang/{code_langue}/E20P00.svg") for code_langue in ("oc", "ga", "fr")]
+
+    def ecrire_lang_pack(self, textes):
+        with zipfile.ZipFile(self.lang_pack, "w") as zipf:
+            for code_langue, texte in textes.items():
+                zipf.writestr(f"lang/{code_langue}/E20P00.svg", page_svg(texte))
+
+    def extraire(self, numero_episode, fichier_cache_extraction=None):
+        return pipeline.extraire_lot_de_pages(
+            self.lang_pack, False, numero_episode, self.pages, fichier_cache_extraction
+        )
+
+    def test_pages_lues_dans_le_cache(self):
+        sans_cache, _, _ = self.extraire("20")
+        self.assertEqual(self.extraire("20", self.fichier_cache), (sans_cache, 0, 2))
+        self.assertEqual(self.extraire("20", self.fichier_cache), (sans_cache, 3, 0))
+        # nouvelle version du lang-pack : seule la page modifiée est analysée
+        self.ecrire_lang_pack({"oc": "Bonjorn", "ga": "Adishatz", "fr": "Bonjour"})
+        sans_cache, _, _ = self.extraire("20")
+        self.assertEqual(self.extraire("20", self.fichier_cache), (sans_cache, 2, 1))
+
+    def test_compteurs_de_l_extraction(self):
+        pipeline.extraire_pages(self.lang_pack, self.pages, "20", fichier_cache_extraction=self.fichier_cache)
+        self.addCleanup(setattr, pipeline, "mesures_execution", None)
+        pipeline.mesures_execution = pipeline.MesuresExecution()
+        pipeline.extraire_pages(self.lang_pack, self.pages, "20", fichier_cache_extraction=self.fichier_cache)
+        self.assertEqual(
+            pipeline.mesures_execution.compteurs, {"pages_lues_dans_le_cache": 3, "svg_analyses": 0}
+        )
+
+    def test_changement_de_mode(self):
+        textes_flowroot, _, _ = self.extraire("12", self.fichier_cache)
+        self.assertEqual(textes_flowroot[0], [("f", "Flux Bonjorn")])
+        # mêmes pages, mais épisode lu dans les blocs <text> : rien n'est repris du cache
+        sans_cache, _, _ = self.extraire("13")
+        self.assertEqual(sans_cache[0], [("t", "Texte Bonjorn")])
+        self.assertEqual(self.extraire("13", self.fichier_cache), (sans_cache, 0, 2))
+        # les deux modes sont ensuite conservés côte à côte
+        self.assertEqual(self.extraire("12", self.fichier_cache), (textes_flowroot, 3, 0))
+        self.assertEqual(self.extraire("13", self.fichier_cache), (sans_cache, 3, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+
+"""
+Tests du catalogue des épisodes (option --catalogue FICHIER, sans accès au réseau) : correction du titre
+indiqué dans le manifeste, ligne de manifeste réduite au numéro, sélection par --plage, et épisodes sans
+traduction en occitan écartés avant tout téléchargement.
+    python3 -m pytest tests
+"""
+
+# Catalogue au format du site (episodes.json)
+CATALOGUE = [
+    {"name": "ep01_Potion-of-Flight", "translated_languages": ["fr", "ga", "oc"]},
+    {"name": "ep05_Preparations", "translated_languages": ["fr", "oc"]},
+    {"name": "ep06_The-Potion-Contest", "translated_languages": ["en", "fr"]},
+    {"name": "ep11_The-Witches-of-Chaosah", "translated_languages": ["ga", "oc"]},
+    "ep12_Autumn-Clearout",
+    {"name": "README.md"},
+]
+
+MANIFESTE = """# épisodes à traiter
+1 Potion of Flight
+5 preparations
+6
+11
+40 Unknown Title
+41
+"""
+
+
+class TestCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.fichier_catalogue = os.path.join(self.repertoire.name, "episodes.json")
+        with open(self.fichier_catalogue, "w", encoding="utf-8") as fichier:
+            json.dump(CATALOGUE, fichier)
+        self.fichier_manifeste = os.path.join(self.repertoire.name, "manifeste.txt")
+        with open(self.fichier_manifeste, "w", encoding="utf-8") as fichier:
+            fichier.write(MANIFESTE)
+
+    def episodes_traites(self, *options):
+        # Épisodes transmis au traitement par lot pour la ligne de commande indiquée
+        with mock.patch.object(
+            sys, "argv", ["extract_align_pepper_carrot.py", "--catalogue", self.fichier_catalogue, *options]
+        ), mock.patch.object(pipeline, "traiter_lot", return_value={"01": ["E01.zip"]}) as traiter_lot:
+            pipeline.executer(pipeline.analyser_arguments())
+        return traiter_lot.call_args.args[0]
+
+    def test_lecture_du_catalogue(self):
+        catalogue = pipeline.charger_catalogue(self.fichier_catalogue)
+        self.assertEqual(sorted(catalogue), ["01", "05", "06", "11", "12"])
+        self.assertEqual(catalogue["05"], ("Preparations", {"fr", "oc"}))
+        # un nom seul, sans liste de langues : l'épisode n'est pas écarté
+        self.assertEqual(catalogue["12"], ("Autumn-Clearout", None))
+
+    def test_manifeste_resolu_avec_le_catalogue(self):
+        self.assertEqual(
+            self.episodes_traites("--manifeste", self.fichier_manifeste),
+            [
+                ("1", "Potion-of-Flight"),
+                ("5", "Preparations"),  # titre corrigé
+                ("11", "The-Witches-of-Chaosah"),  # ligne réduite au numéro
+                ("40", "Unknown Title"),  # absent du catalogue : titre du manifeste
+            ],
+        )
+
+    def test_plage_sans_manifeste(self):
+        # l'épisode 6 n'est pas traduit en occitan : il est écarté
+        self.assertEqual(
+            self.episodes_traites("--plage", "5-12"),
+            [("05", "Preparations"), ("11", "The-Witches-of-Chaosah"), ("12", "Autumn-Clearout")],
+        )
+
+    def test_plage_dans_le_manifeste(self):
+        self.assertEqual(
+            self.episodes_traites("--manifeste", self.fichier_manifeste, "--plage", "2-6"),
+            [("5", "Preparations")],
+        )
+
+    def test_manifeste_sans_catalogue(self):
+        # sans catalogue, le titre reste obligatoire dans le manifeste
+        self.assertEqual(
+            pipeline.lire_manifeste(self.fichier_manifeste),
+            [("1", "Potion of Flight"), ("5", "preparations"), ("40", "Unknown Title")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
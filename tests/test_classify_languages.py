@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "additional_scripts")
+)
+import classify_languages
+
+"""
+Tests du classement par langue (additional_scripts/classify_languages.py) : sur un petit corpus de
+répertoires zippés, l'option --zip produit exactement les mêmes fichiers que les répertoires bilingues.
+    python3 -m pytest tests
+"""
+
+LANGUES2 = ["fr", "en", "ga"]
+
+
+def contenu_csv(langue1, langue2, numero_episode, nb_lignes):
+    return "".join(
+        f"Ligne {numero} de l'épisode {numero_episode}  §{langue1}§Line {numero}  §{langue2}\r\n"
+        for numero in range(nb_lignes)
+    ).encode("utf-8")
+
+
+class TestClassementParLangue(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.corpus = os.path.join(self.repertoire.name, "corpus_corpus")
+        os.makedirs(self.corpus)
+        # un fichier de plusieurs blocs, pour la copie par blocs
+        nb_lignes = {"05": 3, "20": 3, "33": 5000}
+        for numero_episode in nb_lignes:
+            for langue1 in ("oc-lengadoc-grclass", "oc-gascon-grclass"):
+                nom_zip = f"E{numero_episode}_{langue1}_alignements.zip"
+                with zipfile.ZipFile(os.path.join(self.corpus, nom_zip), "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+                    for langue2 in LANGUES2:
+                        zipf.writestr(
+                            f"{langue1}_{langue2}_E{numero_episode}.csv",
+                            contenu_csv(langue1, langue2, numero_episode, nb_lignes[numero_episode]),
+                        )
+
+    def classer(self, repertoire_sortie, en_zip):
+        fichiers_csv = classify_languages.lister_fichiers_csv([self.corpus])
+        classify_languages.creer_repertoires_bilingues(fichiers_csv, repertoire_sortie, en_zip, nb_taches=3)
+
+    def test_zip_identique_aux_repertoires(self):
+        repertoires = os.path.join(self.repertoire.name, "repertoires")
+        zips = os.path.join(self.repertoire.name, "zips")
+        self.classer(repertoires, en_zip=False)
+        self.classer(zips, en_zip=True)
+
+        # {(langue1, 'langue2/fichier'): contenu} pour chacune des deux sorties
+        fichiers_repertoires = {}
+        for racine, _, fichiers in os.walk(repertoires):
+            for fichier in fichiers:
+                chemin = os.path.relpath(os.path.join(racine, fichier), repertoires)
+                repertoire_bilingue, membre = chemin.split(os.sep, 1)
+                with open(os.path.join(racine, fichier), "rb") as f:
+                    fichiers_repertoires[(repertoire_bilingue, membre.replace(os.sep, "/"))] = f.read()
+        fichiers_zips = {}
+        for nom_zip in os.listdir(zips):
+            with zipfile.ZipFile(os.path.join(zips, nom_zip)) as zipf:
+                for info in zipf.infolist():
+                    self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+                    fichiers_zips[(nom_zip[: -len(".zip")], info.filename)] = zipf.read(info)
+
+        self.assertEqual(len(fichiers_repertoires), 2 * 3 * len(LANGUES2))
+        self.assertEqual(fichiers_zips, fichiers_repertoires)
+        grand_fichier = fichiers_zips[("oc-gascon-grclass_bilingue", "fr/oc-gascon-grclass_fr_E33.csv")]
+        self.assertGreater(len(grand_fichier), classify_languages.TAILLE_BLOC)
+        self.assertEqual(grand_fichier, contenu_csv("oc-gascon-grclass", "fr", "33", 5000))
+
+
+if __name__ == "__main__":
+    unittest.main()
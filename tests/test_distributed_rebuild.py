@@ -0,0 +1,134 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from contextlib import closing
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import distributed_rebuild as reparti
+
+"""
+Tests de la file de travaux de distributed_rebuild.py, sur un fichier SQLite temporaire et sans accès au réseau :
+reprise d'un épisode dont le bail a expiré, prolongation du bail pendant le traitement, échec après le nombre
+maximal de tentatives, et regroupement d'une file dont tous les épisodes n'ont pas abouti.
+    python3 -m pytest tests
+"""
+
+BAIL_COURT = 0.2  # en secondes
+
+
+class TestFileDeTravaux(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.fichier_file = os.path.join(self.repertoire.name, "travaux.sqlite")
+        reparti.ajouter_travaux(self.fichier_file, [("5", "Preparations"), ("20", "The_Picnic")])
+        self.connexion = reparti.ouvrir_file(self.fichier_file)
+        self.addCleanup(self.connexion.close)
+
+    def travail(self, numero_episode):
+        return self.connexion.execute(
+            "SELECT etat, travailleur, essais FROM travaux WHERE numero = ?", (numero_episode,)
+        ).fetchone()
+
+    def test_bail_expire_repris_par_un_autre_travailleur(self):
+        self.assertEqual(
+            reparti.prendre_travail(self.connexion, "t1", bail=BAIL_COURT), ("05", "Preparations")
+        )
+        # tant que le bail court, l'épisode reste réservé : t2 prend le suivant
+        self.assertEqual(reparti.prendre_travail(self.connexion, "t2", bail=BAIL_COURT), ("20", "The_Picnic"))
+        self.assertIsNone(reparti.prendre_travail(self.connexion, "t3", bail=BAIL_COURT))
+
+        time.sleep(BAIL_COURT * 1.5)  # t1 et t2 se sont arrêtés sans prévenir
+        self.assertEqual(reparti.prendre_travail(self.connexion, "t3"), ("05", "Preparations"))
+        self.assertEqual(self.travail("05"), ("en_cours", "t3", 2))
+        # t1 ne peut plus ni prolonger son bail ni terminer l'épisode
+        self.assertFalse(reparti.prolonger_bail(self.connexion, "05", "t1"))
+        reparti.terminer_travail(self.connexion, "05", "t1", ["E05_t1.zip"])
+        self.assertEqual(self.travail("05"), ("en_cours", "t3", 2))
+        reparti.terminer_travail(self.connexion, "05", "t3", ["E05_t3.zip"])
+        self.assertEqual(self.travail("05"), ("termine", "t3", 2))
+
+    def test_bail_prolonge_pendant_le_traitement(self):
+        reparti.prendre_travail(self.connexion, "t1", bail=BAIL_COURT)
+        with reparti.bail_entretenu(self.fichier_file, "05", "t1", bail=BAIL_COURT):
+            time.sleep(BAIL_COURT * 3)
+            # le bail a été prolongé : seul l'autre épisode est disponible
+            self.assertEqual(reparti.prendre_travail(self.connexion, "t2"), ("20", "The_Picnic"))
+            self.assertIsNone(reparti.prendre_travail(self.connexion, "t3"))
+        self.assertEqual(self.travail("05"), ("en_cours", "t1", 1))
+
+    def test_echec_apres_le_nombre_maximal_de_tentatives(self):
+        # première tentative : erreur, l'épisode est remis en attente
+        reparti.prendre_travail(self.connexion, "t1", nb_essais=2)
+        reparti.abandonner_travail(self.connexion, "05", "t1", "erreur réseau", nb_essais=2)
+        self.assertEqual(self.travail("05")[0], "attente")
+        # seconde tentative : le travailleur s'arrête, son bail expire
+        reparti.prendre_travail(self.connexion, "t2", bail=BAIL_COURT, nb_essais=2)
+        self.assertEqual(self.travail("05"), ("en_cours", "t2", 2))
+        time.sleep(BAIL_COURT * 1.5)
+        # l'épisode n'est plus retenté : t3 prend l'épisode suivant
+        self.assertEqual(reparti.prendre_travail(self.connexion, "t3", nb_essais=2), ("20", "The_Picnic"))
+        self.assertEqual(self.travail("05")[0], "echec")
+        erreur = self.connexion.execute("SELECT erreur FROM travaux WHERE numero = '05'").fetchone()[0]
+        self.assertIn("bail expiré (travailleur t2)", erreur)
+
+    def test_echec_definitif(self):
+        # pas de traduction en occitan : inutile de retenter
+        reparti.prendre_travail(self.connexion, "t1")
+        reparti.abandonner_travail(self.connexion, "05", "t1", "pas de traduction en occitan", definitif=True)
+        self.assertEqual(self.travail("05"), ("echec", "t1", 1))
+        self.assertEqual(reparti.travaux_restants(self.connexion), 1)
+
+
+class TestRegroupement(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.fichier_file = os.path.join(self.repertoire.name, "travaux.sqlite")
+        self.sortie = os.path.join(self.repertoire.name, "sortie")
+        self.destination = os.path.join(self.repertoire.name, "bilingue")
+        os.makedirs(self.sortie)
+        reparti.ajouter_travaux(self.fichier_file, [("5", "Preparations"), ("20", "The_Picnic")])
+        self.arguments = argparse.Namespace(
+            file=self.fichier_file, sortie=self.sortie, destination=self.destination, zip=False, taches=2
+        )
+
+    def terminer(self, connexion, numero_episode):
+        nom_zip = f"E{numero_episode}_oc-lengadoc-grclass_alignements.zip"
+        with zipfile.ZipFile(os.path.join(self.sortie, nom_zip), "w") as zipf:
+            zipf.writestr(f"oc-lengadoc-grclass_fr_E{numero_episode}.csv", f"E{numero_episode}\r\n")
+        reparti.terminer_travail(connexion, numero_episode, "t1", [nom_zip])
+
+    def test_file_inachevee_refusee(self):
+        with closing(reparti.ouvrir_file(self.fichier_file)) as connexion:
+            reparti.prendre_travail(connexion, "t1")
+            self.terminer(connexion, "05")
+        # l'épisode 20 est encore en attente
+        with self.assertRaises(SystemExit):
+            reparti.regrouper(self.arguments)
+        self.assertFalse(os.path.exists(self.destination))
+
+    def test_episodes_en_echec_ignores(self):
+        with closing(reparti.ouvrir_file(self.fichier_file)) as connexion:
+            reparti.prendre_travail(connexion, "t1")
+            self.terminer(connexion, "05")
+            reparti.prendre_travail(connexion, "t1")
+            # un zip laissé par l'épisode en échec n'est pas regroupé
+            with zipfile.ZipFile(os.path.join(self.sortie, "E20_oc-lengadoc-grclass_alignements.zip"), "w") as zipf:
+                zipf.writestr("oc-lengadoc-grclass_fr_E20.csv", "E20\r\n")
+            reparti.abandonner_travail(connexion, "20", "t1", "pas de traduction en occitan", definitif=True)
+        reparti.regrouper(self.arguments)
+        repertoire_fr = os.path.join(self.destination, "oc-lengadoc-grclass_bilingue", "fr")
+        self.assertEqual(os.listdir(repertoire_fr), ["oc-lengadoc-grclass_fr_E05.csv"])
+        with open(os.path.join(repertoire_fr, "oc-lengadoc-grclass_fr_E05.csv"), "rb") as fichier:
+            self.assertEqual(fichier.read(), b"E05\r\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+from benchmark_pipeline import generer_lang_pack, langues_synthetiques
+
+"""
+Tests de la construction incrémentale (option --incremental) sur des lang-packs synthétiques : après une
+modification du lang-pack ou des options de compression, les zips mis à jour sont identiques à ceux d'une
+construction complète.
+    python3 -m pytest tests
+"""
+
+NUMERO_EPISODE = "20"
+NB_LANGUES = 6
+LANGUE_TIERCE = langues_synthetiques(NB_LANGUES)[-1]  # une langue qui n'est pas un pivot
+
+
+def contenu_zips(fichiers_zip):
+    # {nom du zip: {fichier aligné: (contenu, méthode de compression, taille compressée)}}
+    contenus = {}
+    for fichier_zip in fichiers_zip:
+        with zipfile.ZipFile(fichier_zip) as zipf:
+            contenus[os.path.basename(fichier_zip)] = {
+                info.filename: (zipf.read(info), info.compress_type, info.compress_size)
+                for info in zipf.infolist()
+            }
+    return contenus
+
+
+def remplacer_page(fichier_zip, membre, nouveau_membre):
+    # Copie du lang-pack où la page 'membre' est remplacée par 'nouveau_membre' (ou retirée si None)
+    with zipfile.ZipFile(fichier_zip) as ancien:
+        pages = {nom: ancien.read(nom) for nom in ancien.namelist()}
+    if nouveau_membre is None:
+        del pages[membre]
+    else:
+        pages[membre] = pages[nouveau_membre]
+    with zipfile.ZipFile(fichier_zip, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        for nom, donnees in pages.items():
+            zipf.writestr(nom, donnees)
+
+
+class TestConstructionIncrementale(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        self.lang_pack = os.path.join(self.repertoire.name, "lang-pack.zip")
+        generer_lang_pack(self.lang_pack, NUMERO_EPISODE, nb_langues=NB_LANGUES, nb_pages=3, nb_bulles=6)
+        self.sortie = os.path.join(self.repertoire.name, "incremental")
+        self.etats = os.path.join(self.repertoire.name, "etats")
+
+    def construire(self, repertoire_sortie, repertoire_incremental=None, **options):
+        return pipeline.traiter_episode(
+            self.lang_pack,
+            NUMERO_EPISODE,
+            repertoire_incremental=repertoire_incremental,
+            repertoire_sortie=repertoire_sortie,
+            **options,
+        )
+
+    def verifier_comme_construction_complete(self, fichiers_zip, **options):
+        complete = self.construire(os.path.join(self.repertoire.name, "complete"), **options)
+        self.assertEqual(contenu_zips(fichiers_zip), contenu_zips(complete))
+
+    def test_langue_modifiee(self):
+        self.construire(self.sortie, self.etats)
+        # une page de la langue tierce reprend le texte d'une autre page
+        remplacer_page(
+            self.lang_pack, f"lang/{LANGUE_TIERCE}/E20P00.svg", f"lang/{LANGUE_TIERCE}/E20P01.svg"
+        )
+        fichiers_zip = self.construire(self.sortie, self.etats)
+        self.verifier_comme_construction_complete(fichiers_zip)
+
+    def test_langue_supprimee(self):
+        self.construire(self.sortie, self.etats)
+        for page in range(3):
+            remplacer_page(self.lang_pack, f"lang/{LANGUE_TIERCE}/E20P{page:02d}.svg", None)
+        fichiers_zip = self.construire(self.sortie, self.etats)
+        self.verifier_comme_construction_complete(fichiers_zip)
+
+    def test_lang_pack_inchange(self):
+        fichiers_zip = self.construire(self.sortie, self.etats)
+        dates = [os.path.getmtime(fichier_zip) for fichier_zip in fichiers_zip]
+        # rien n'a changé : les zips ne sont pas réécrits
+        self.assertEqual(self.construire(self.sortie, self.etats), fichiers_zip)
+        self.assertEqual([os.path.getmtime(fichier_zip) for fichier_zip in fichiers_zip], dates)
+
+    def test_changement_de_compression(self):
+        self.construire(self.sortie, self.etats)
+        options = {"compression": zipfile.ZIP_LZMA}
+        fichiers_zip = self.construire(self.sortie, self.etats, **options)
+        for membres in contenu_zips(fichiers_zip).values():
+            self.assertEqual({compression for _, compression, _ in membres.values()}, {zipfile.ZIP_LZMA})
+        self.verifier_comme_construction_complete(fichiers_zip, **options)
+
+    def test_changement_de_niveau_de_compression(self):
+        self.construire(self.sortie, self.etats, niveau_compression=1)
+        options = {"niveau_compression": 9}
+        fichiers_zip = self.construire(self.sortie, self.etats, **options)
+        self.verifier_comme_construction_complete(fichiers_zip, **options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+from benchmark_pipeline import generer_lang_pack
+
+"""
+Tests de query_corpus_index.py : la sortie envoyée à une commande qui s'arrête avant la fin (ex. : '| head')
+se termine sans erreur.
+    python3 -m pytest tests
+"""
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan", "query_corpus_index.py"
+)
+
+
+class TestRequeteIndex(unittest.TestCase):
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+        lang_pack = os.path.join(self.repertoire.name, "lang-pack.zip")
+        generer_lang_pack(lang_pack, "20", nb_langues=20, nb_pages=6, nb_bulles=20)
+        self.index = os.path.join(self.repertoire.name, "index.sqlite")
+        pipeline.traiter_episode(
+            lang_pack, "20", fichier_index=self.index, repertoire_sortie=self.repertoire.name
+        )
+
+    def test_sortie_interrompue(self):
+        for options in ([], ["--positions"]):
+            processus = subprocess.Popen(
+                [sys.executable, SCRIPT, self.index, *options],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            # comme '| head -1' : une seule ligne lue, puis fermeture du tube
+            self.assertTrue(processus.stdout.readline())
+            processus.stdout.close()
+            erreurs = processus.stderr.read()
+            processus.stderr.close()
+            self.assertEqual(processus.wait(), 0, erreurs)
+            self.assertNotIn(b"Traceback", erreurs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main_script_for_Occitan")
+)
+import extract_align_pepper_carrot as pipeline
+
+"""
+Tests du téléchargement des lang-packs contre un serveur HTTP local qui sert des lang-packs de test :
+téléchargements simultanés, nouvelles tentatives après une erreur serveur, délai d'expiration,
+revalidation du cache (304) et reprise d'un téléchargement interrompu (Range), y compris lorsque le lang-pack
+a changé sur le serveur entre l'interruption et la reprise (If-Range).
+    python3 -m pytest tests
+"""
+
+
+def creer_lang_pack(titre):
+    # Lang-pack minimal : une page SVG par langue
+    contenu = io.BytesIO()
+    with zipfile.ZipFile(contenu, "w") as zipf:
+        for code_langue in ("oc", "fr"):
+            zipf.writestr(
+                f"lang/{code_langue}/E05P01.svg",
+                f'<svg xmlns="http://www.w3.org/2000/svg"><text id="t1">{titre} {code_langue}</text></svg>',
+            )
+    return contenu.getvalue()
+
+
+class ServeurLangPacks(BaseHTTPRequestHandler):
+    # Sert self.server.fichiers {chemin: contenu}, avec ETag / If-None-Match et les requêtes Range ;
+    # self.server.erreurs {chemin: nombre de réponses 503 à renvoyer d'abord} ; self.server.attente (en secondes)
+    # self.server.coupure : si indiqué, la connexion est coupée après ce nombre d'octets (une seule fois)
+    # self.server.debut_plage : si indiqué, premier octet renvoyé pour une requête Range, quel que soit celui demandé
+    def log_message(self, *arguments):
+        pass
+
+    def do_GET(self):
+        serveur = self.server
+        with serveur.verrou:
+            serveur.requetes.append((self.path, dict(self.headers)))
+            serveur.en_cours += 1
+            serveur.max_en_cours = max(serveur.max_en_cours, serveur.en_cours)
+        try:
+            time.sleep(serveur.attente)
+            self.repondre()
+        finally:
+            with serveur.verrou:
+                serveur.en_cours -= 1
+
+    def repondre(self):
+        serveur = self.server
+        contenu = serveur.fichiers.get(self.path)
+        if contenu is None:
+            self.send_error(404)
+            return
+        with serveur.verrou:
+            if serveur.erreurs.get(self.path):
+                serveur.erreurs[self.path] -= 1
+                self.send_error(503)
+                return
+        etag = f'"{hash(contenu) & 0xFFFFFFFF:08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        debut = 0
+        # If-Range : la suite n'est renvoyée que si le fichier n'a pas changé, sinon le fichier entier
+        if self.headers.get("Range") and self.headers.get("If-Range", etag) == etag:
+            debut = int(self.headers["Range"].split("=")[1].split("-")[0])
+            if serveur.debut_plage is not None:
+                debut = serveur.debut_plage
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {debut}-{len(contenu) - 1}/{len(contenu)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(contenu) - debut))
+        self.end_headers()
+        if serveur.coupure is not None:
+            coupure, serveur.coupure = serveur.coupure, None
+            self.wfile.write(contenu[debut : debut + coupure])
+            self.close_connection = True
+            return
+        self.wfile.write(contenu[debut:])
+
+
+class TestTelechargement(unittest.TestCase):
+    def setUp(self):
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", 0), ServeurLangPacks)
+        self.serveur.verrou = threading.Lock()
+        self.serveur.requetes = []
+        self.serveur.en_cours = self.serveur.max_en_cours = 0
+        self.serveur.erreurs = {}
+        self.serveur.attente = 0
+        self.serveur.coupure = self.serveur.debut_plage = None
+        self.serveur.fichiers = {}
+        self.episodes = [(f"{numero:02d}", f"Titre-{numero}") for numero in range(1, 5)]
+        for numero, titre in self.episodes:
+            cle = f"ep{numero}_{titre}"
+            self.serveur.fichiers[f"/0_sources/{cle}/zip/{cle}_lang-pack.zip"] = creer_lang_pack(titre)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.url_base = f"http://127.0.0.1:{self.serveur.server_address[1]}/0_sources"
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(self.repertoire.cleanup)
+
+    def tearDown(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def chemin(self, numero, titre):
+        cle = f"ep{numero}_{titre}"
+        return f"/0_sources/{cle}/zip/{cle}_lang-pack.zip"
+
+    def chercher(self, numero, titre, session=None, **options):
+        return pipeline.chercher_episode(
+            titre,
+            numero,
+            session or pipeline.creer_session(1, 0),
+            url_base=self.url_base,
+            repertoire_telechargement=self.repertoire.name,
+            **options,
+        )
+
+    def test_telechargements_simultanes(self):
+        self.serveur.attente = 0.3
+        resultats = list(
+            pipeline.telecharger_episodes(
+                self.episodes,
+                nb_telechargements=4,
+                tentatives=0,
+                url_base=self.url_base,
+                repertoire_telechargement=self.repertoire.name,
+            )
+        )
+        # rendus dans l'ordre de la liste, téléchargés en même temps
+        self.assertEqual([numero for numero, _, _ in resultats], [numero for numero, _ in self.episodes])
+        self.assertGreater(self.serveur.max_en_cours, 1)
+        for numero, titre, fichier_zip in resultats:
+            with open(fichier_zip, "rb") as fichier:
+                self.assertEqual(fichier.read(), self.serveur.fichiers[self.chemin(numero, titre)])
+
+    def test_nouvelle_tentative_apres_erreur_serveur(self):
+        numero, titre = self.episodes[0]
+        self.serveur.erreurs[self.chemin(numero, titre)] = 2
+        session = pipeline.creer_session(1, tentatives=3, facteur_attente=0)
+        fichier_zip = self.chercher(numero, titre, session)
+        self.assertTrue(fichier_zip and zipfile.is_zipfile(fichier_zip))
+        self.assertEqual(len(self.serveur.requetes), 3)
+
+    def test_erreur_serveur_persistante(self):
+        numero, titre = self.episodes[0]
+        self.serveur.erreurs[self.chemin(numero, titre)] = 10
+        session = pipeline.creer_session(1, tentatives=1, facteur_attente=0)
+        self.assertIsNone(self.chercher(numero, titre, session))
+        self.assertFalse(os.listdir(self.repertoire.name))  # aucun fichier partiel laissé
+
+    def test_delai_expiration(self):
+        numero, titre = self.episodes[0]
+        self.serveur.attente = 2
+        debut = time.perf_counter()
+        self.assertIsNone(self.chercher(numero, titre, delai=0.3))
+        self.assertLess(time.perf_counter() - debut, 1.5)
+
+    def test_revalidation_du_cache(self):
+        numero, titre = self.episodes[0]
+        repertoire_cache = os.path.join(self.repertoire.name, "cache")
+        premier = self.chercher(numero, titre, repertoire_cache=repertoire_cache)
+        second = self.chercher(numero, titre, repertoire_cache=repertoire_cache)
+        # la seconde requête est conditionnelle et le serveur répond 304 : l'archive du cache est reprise
+        self.assertEqual(premier, second)
+        self.assertIn("If-None-Match", self.serveur.requetes[1][1])
+        self.assertEqual(len(os.listdir(os.path.join(repertoire_cache, "objets"))), 1)
+
+    def interrompre(self, numero, titre, fichier_zip, octets=100):
+        # Téléchargement coupé par le serveur après quelques octets : il reste un fichier '.part'
+        # (petits blocs : le début du lang-pack de test est écrit sur le disque avant la coupure)
+        taille_bloc = pipeline.TAILLE_BLOC
+        pipeline.TAILLE_BLOC = 10
+        self.addCleanup(setattr, pipeline, "TAILLE_BLOC", taille_bloc)
+        self.serveur.coupure = octets
+        with self.assertRaises(pipeline.requests.exceptions.RequestException):
+            pipeline.telecharger_fichier(
+                pipeline.creer_session(1, 0), self.url(numero, titre), fichier_zip, reprise=True
+            )
+        self.assertEqual(os.path.getsize(f"{fichier_zip}.part"), octets)
+
+    def url(self, numero, titre):
+        return self.url_base + self.chemin(numero, titre)[len("/0_sources"):]
+
+    def test_reprise_avec_range(self):
+        numero, titre = self.episodes[0]
+        contenu = self.serveur.fichiers[self.chemin(numero, titre)]
+        fichier_zip = os.path.join(self.repertoire.name, "lang-pack.zip")
+        self.interrompre(numero, titre, fichier_zip)
+        pipeline.telecharger_fichier(
+            pipeline.creer_session(1, 0), self.url(numero, titre), fichier_zip, reprise=True
+        )
+        self.assertEqual(self.serveur.requetes[1][1].get("Range"), "bytes=100-")
+        self.assertIn("If-Range", self.serveur.requetes[1][1])
+        with open(fichier_zip, "rb") as fichier:
+            self.assertEqual(fichier.read(), contenu)
+        self.assertEqual(os.listdir(self.repertoire.name), ["lang-pack.zip"])
+
+    def test_reprise_apres_modification_du_lang_pack(self):
+        numero, titre = self.episodes[0]
+        fichier_zip = os.path.join(self.repertoire.name, "lang-pack.zip")
+        self.interrompre(numero, titre, fichier_zip)
+        # le lang-pack est republié entre l'interruption et la reprise : le serveur renvoie le nouveau fichier entier
+        nouveau_contenu = creer_lang_pack(f"{titre} (nouvelle version)")
+        self.serveur.fichiers[self.chemin(numero, titre)] = nouveau_contenu
+        pipeline.telecharger_fichier(
+            pipeline.creer_session(1, 0), self.url(numero, titre), fichier_zip, reprise=True
+        )
+        with open(fichier_zip, "rb") as fichier:
+            self.assertEqual(fichier.read(), nouveau_contenu)
+
+    def test_reprise_avec_plage_inattendue(self):
+        numero, titre = self.episodes[0]
+        contenu = self.serveur.fichiers[self.chemin(numero, titre)]
+        fichier_zip = os.path.join(self.repertoire.name, "lang-pack.zip")
+        self.interrompre(numero, titre, fichier_zip)
+        # la plage renvoyée ne prolonge pas le fichier partiel : le téléchargement reprend de zéro
+        self.serveur.debut_plage = 50
+        pipeline.telecharger_fichier(
+            pipeline.creer_session(1, 0), self.url(numero, titre), fichier_zip, reprise=True
+        )
+        self.assertNotIn("Range", self.serveur.requetes[2][1])
+        with open(fichier_zip, "rb") as fichier:
+            self.assertEqual(fichier.read(), contenu)
+
+    def test_reprise_sans_validateur(self):
+        numero, titre = self.episodes[0]
+        contenu = self.serveur.fichiers[self.chemin(numero, titre)]
+        fichier_zip = os.path.join(self.repertoire.name, "lang-pack.zip")
+        # fichier partiel d'origine inconnue (sans les en-têtes de sa version) : il n'est pas complété
+        with open(f"{fichier_zip}.part", "wb") as partiel:
+            partiel.write(b"x" * 100)
+        pipeline.telecharger_fichier(
+            pipeline.creer_session(1, 0), self.url(numero, titre), fichier_zip, reprise=True
+        )
+        self.assertNotIn("Range", self.serveur.requetes[0][1])
+        with open(fichier_zip, "rb") as fichier:
+            self.assertEqual(fichier.read(), contenu)
+
+if __name__ == "__main__":
+    unittest.main()